@@ -0,0 +1,68 @@
+"""Startup time of the exporter, every sample runs in a fresh interpreter.
+
+python src/benchmarks/startup.py [--repeat 20] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CONFIG = os.path.join(os.path.dirname(_SRC), "config.yaml")
+
+SCENARIOS = {
+    "interpreter": "pass",
+    "import": "import mocktrics_exporter.main",
+    "configuration": "from mocktrics_exporter import configuration\n"
+    f"configuration.load({_CONFIG!r})",
+    "api": "from mocktrics_exporter import api\napi.create_app()",
+}
+
+
+def measure(statement: str, repeat: int) -> list[float]:
+    environment = {**os.environ, "PYTHONPATH": _SRC}
+    # The first run compiles and caches bytecode, it is not part of the samples
+    subprocess.run([sys.executable, "-c", statement], env=environment, check=True)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], env=environment, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", help="Samples per scenario", type=int, default=20)
+    parser.add_argument("--json", help="Print the results as JSON", action="store_true")
+    parser.add_argument("scenario", help="Scenarios to run, all by default", nargs="*")
+    args = parser.parse_args()
+    for name in args.scenario:
+        if name not in SCENARIOS:
+            parser.error(f"Unknown scenario {name}, choose from {', '.join(SCENARIOS)}")
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        samples = measure(SCENARIOS[name], args.repeat)
+        results[name] = {
+            "min_ms": min(samples) * 1000,
+            "median_ms": statistics.median(samples) * 1000,
+            "max_ms": max(samples) * 1000,
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, result in results.items():
+        print(
+            f"{name:<16}min {result['min_ms']:7.1f} ms  median {result['median_ms']:7.1f} ms  "
+            f"max {result['max_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Scrape latency, memory, API, persistence and cold start benchmarks.
+
+python src/benchmarks/suite.py [--sizes 1000,10000] [--output results.json] [--compare old.json]
+
+Every case runs in a fresh interpreter, so memory is measured without the leftovers of
+other cases. Results are written as JSON, ``--compare`` prints the change against the
+results of another run, for example of the previous release.
+"""
+
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import startup
+
+_SRC = startup._SRC
+
+KINDS = ["static", "ramp", "square", "sine", "gaussian", "histogram"]
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+BENCHMARKS = ["scrape", "api", "persistence", "cold_start"]
+SERIES_PER_METRIC = 1000
+
+_VALUES: dict[str, dict] = {
+    "static": {"value": 1.5},
+    "ramp": {"period": 60, "peak": 100},
+    "square": {"period": 60, "magnitude": 10, "duty_cycle": 50},
+    "sine": {"period": 60, "amplitude": 10, "offset": 20},
+    "gaussian": {"mean": 10, "sigma": 2, "seed": 1},
+    "histogram": {"rate": 10, "mean": 0.2, "sigma": 0.05},
+}
+
+
+def rss() -> int:
+    """Resident memory of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak instead of current, kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def timed(function, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _summary(samples: list[float]) -> dict:
+    return {
+        "min_ms": min(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def build(kind: str, series: int, per_metric: int = SERIES_PER_METRIC, registry=None) -> list:
+    """Metrics of ``per_metric`` series each, ``series`` in total."""
+    import pydantic
+
+    from mocktrics_exporter import valueModels
+    from mocktrics_exporter.metrics import Metric
+
+    adapter: pydantic.TypeAdapter = pydantic.TypeAdapter(valueModels.MetricValue)
+    metrics = []
+    for first in range(0, series, per_metric):
+        values = [
+            adapter.validate_python({"kind": kind, **_VALUES[kind], "labels": [str(n)]})
+            for n in range(first, min(series, first + per_metric))
+        ]
+        metric = Metric(
+            f"bench_{kind}_{first // per_metric}",
+            values,
+            f"{kind} benchmark",
+            ["series"],
+            type="histogram" if kind == "histogram" else "gauge",
+            registry=registry,
+        )
+        metrics.append(metric)
+    return metrics
+
+
+def case_scrape(kind: str, series: int, repeat: int) -> dict:
+    from prometheus_client import CollectorRegistry
+
+    from mocktrics_exporter import clock, exposition
+
+    registry = CollectorRegistry(auto_describe=False)
+    # Imports and first use caches are not part of the memory of the series
+    build(kind, 1)
+    before = rss()
+    start = time.perf_counter()
+    for metric in build(kind, series, registry=registry):
+        metric.register()
+    created = time.perf_counter() - start
+    held = rss() - before
+
+    def collect():
+        with clock.clock.frozen():
+            return [family.samples for family in registry.collect()]
+
+    def render():
+        with clock.clock.frozen():
+            return exposition.generate_text(registry)
+
+    samples = sum(len(family) for family in collect())
+    payload = render()
+    return {
+        "series": series,
+        "samples": samples,
+        "create_s": created,
+        "rss_bytes": held,
+        "rss_bytes_per_series": held / series,
+        "payload_bytes": len(payload),
+        "collect": _summary(timed(collect, repeat)),
+        "render": _summary(timed(render, repeat)),
+    }
+
+
+def case_api(count: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    from mocktrics_exporter import api
+
+    metric = {
+        "documentation": "api benchmark",
+        "labels": ["series"],
+        "values": [{"kind": "sine", **_VALUES["sine"], "labels": [str(n)]} for n in range(10)],
+    }
+    with TestClient(api.create_app()) as client:
+        start = time.perf_counter()
+        for n in range(count):
+            client.post("/metric", json={**metric, "name": f"bench_api_{n}"}).raise_for_status()
+        created = time.perf_counter() - start
+        start = time.perf_counter()
+        for n in range(count):
+            client.delete(f"/metric/bench_api_{n}").raise_for_status()
+        deleted = time.perf_counter() - start
+    return {
+        "requests": count,
+        "create_per_s": count / created,
+        "delete_per_s": count / deleted,
+    }
+
+
+def _populate(path: str, count: int) -> float:
+    from mocktrics_exporter.persistence import Persistence
+
+    # Metrics of 10 series, the size API created metrics usually have
+    metrics = build("sine", count * 10, per_metric=10)
+    database = Persistence(path)
+    start = time.perf_counter()
+    for metric in metrics:
+        database.add_metric(metric)
+    return time.perf_counter() - start
+
+
+def case_persistence(count: int, repeat: int) -> dict:
+    from mocktrics_exporter.persistence import Persistence
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        added = _populate(path, count)
+        database = Persistence(path)
+        loaded = timed(database.get_metrics, repeat)
+        return {
+            "metrics": count,
+            "add_metric_per_s": count / added,
+            "get_metrics": _summary(loaded),
+            "get_metrics_per_s": count / statistics.median(loaded),
+        }
+
+
+def case_cold_start(count: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        _populate(path, count)
+        statement = (
+            "from mocktrics_exporter import dependencies\n"
+            "from mocktrics_exporter.persistence import Persistence\n"
+            f"database = Persistence({path!r})\n"
+            "for metric in database.get_metrics():\n"
+            "    dependencies.metrics_collection.add_metric(metric)\n"
+        )
+        return {"metrics": count, **_summary(startup.measure(statement, repeat))}
+
+
+def run_case(case: dict) -> dict:
+    match case["benchmark"]:
+        case "scrape":
+            return case_scrape(case["kind"], case["series"], case["repeat"])
+        case "api":
+            return case_api(case["count"])
+        case "persistence":
+            return case_persistence(case["count"], case["repeat"])
+        case "cold_start":
+            return case_cold_start(case["count"], case["repeat"])
+    raise ValueError(f"Unknown benchmark {case['benchmark']}")
+
+
+def spawn(case: dict) -> dict:
+    environment = {**os.environ, "PYTHONPATH": _SRC}
+    result = subprocess.run(
+        [sys.executable, __file__, "--case", json.dumps(case)],
+        env=environment,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"error": f"Exited with {result.returncode}, see stderr"}
+    return json.loads(result.stdout)
+
+
+def cases(args: argparse.Namespace) -> dict[str, dict]:
+    result = {}
+    for benchmark in args.benchmark or BENCHMARKS:
+        if benchmark == "scrape":
+            for kind in args.kinds:
+                for series in args.sizes:
+                    result[f"scrape/{kind}/{series}"] = {
+                        "benchmark": "scrape",
+                        "kind": kind,
+                        "series": series,
+                        "repeat": args.repeat,
+                    }
+        else:
+            result[benchmark] = {"benchmark": benchmark, "count": args.count, "repeat": args.repeat}
+    return result
+
+
+def _flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict) -> None:
+    current, previous = _flatten(results["results"]), _flatten(baseline["results"])
+    meta = baseline["meta"]
+    print(f"Compared with {meta.get('version')} from {meta.get('date')}", file=sys.stderr)
+    for key, value in current.items():
+        if key in previous and previous[key]:
+            print(
+                f"{key:<56}{previous[key]:>14.4g} {value:>14.4g} {value / previous[key]:>8.2f}x",
+                file=sys.stderr,
+            )
+
+
+def _version() -> str:
+    try:
+        return importlib.metadata.version("mocktrics-exporter")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _sizes(value: str) -> list[int]:
+    return [int(size) for size in value.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", help="Series per scrape case", type=_sizes, default=SIZES)
+    parser.add_argument(
+        "--kinds",
+        help="Value kinds of the scrape cases",
+        type=lambda v: v.split(","),
+        default=KINDS,
+    )
+    parser.add_argument(
+        "--count", help="Metrics created by the other benchmarks", type=int, default=1000
+    )
+    parser.add_argument("--repeat", help="Samples per measurement", type=int, default=5)
+    parser.add_argument("--output", help="Write the results to this file", default=None)
+    parser.add_argument("--compare", help="Results of an earlier run to compare with")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("benchmark", help="Benchmarks to run, all by default", nargs="*")
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+    for name in args.benchmark:
+        if name not in BENCHMARKS:
+            parser.error(f"Unknown benchmark {name}, choose from {', '.join(BENCHMARKS)}")
+
+    results: dict[str, dict] = {
+        "meta": {
+            "version": _version(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": {},
+    }
+    for name, case in cases(args).items():
+        print(f"Running {name}", file=sys.stderr)
+        results["results"][name] = spawn(case)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,28 @@
 import logging
+import time
+from typing import Literal
 
-from fastapi import FastAPI, Query, Request
-from fastapi.responses import JSONResponse
+import numpy
+import pydantic
+from fastapi import APIRouter, FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response
 
-from mocktrics_exporter import configuration, dependencies, metrics, valueModels
+from mocktrics_exporter import (
+    backfill,
+    clock,
+    configuration,
+    dependencies,
+    exposition,
+    metaMetrics,
+    metrics,
+    valueModels,
+)
+from mocktrics_exporter.metricCollection import MetricsCollection
+from mocktrics_exporter.middleware import MetricsMiddleware
 
-api = FastAPI(redirect_slashes=False)
+router = APIRouter()
+
+SERIES_MAX_POINTS = 11000
 
 
 class _HealthcheckFilter(logging.Filter):
@@ -17,15 +34,37 @@ class _HealthcheckFilter(logging.Filter):
         return not any(fragment in message for fragment in self._HEALTH_PATH_FRAGMENTS)
 
 
-logging.getLogger("uvicorn.access").addFilter(_HealthcheckFilter())
+_healthcheck_filter = _HealthcheckFilter()
+
+
+def create_app(debug: bool = False) -> FastAPI:
+    app = FastAPI(redirect_slashes=False)
+    app.include_router(router)
+    if debug:
+        from mocktrics_exporter import debug as debug_endpoints
+
+        app.include_router(debug_endpoints.router)
+    app.add_middleware(MetricsMiddleware)
+    # The same filter instance is only added once
+    logging.getLogger("uvicorn.access").addFilter(_healthcheck_filter)
+    return app
 
 
-@api.get("/healthz")
+@router.get("/healthz")
 def healthcheck() -> JSONResponse:
     return JSONResponse(content={"status": "ok"})
 
 
-@api.post("/metric")
+@router.get("/metrics")
+def get_own_metrics(request: Request) -> Response:
+    """The exporter's own metrics as recorded by the API process."""
+    format = exposition.negotiate(request.headers.get("accept"))
+    return Response(
+        content=format.render(metaMetrics.metrics.registry), media_type=format.content_type
+    )
+
+
+@router.post("/metric")
 def post_metric(metric: configuration.Metric) -> JSONResponse:
 
     try:
@@ -51,6 +90,8 @@ def post_metric(metric: configuration.Metric) -> JSONResponse:
                 metric.documentation,
                 metric.labels,
                 metric.unit,
+                metric.type,
+                metric.buckets,
             )
         )
         return JSONResponse(
@@ -58,11 +99,16 @@ def post_metric(metric: configuration.Metric) -> JSONResponse:
             content={"success": True, "name": name, "action": "created"},
         )
 
+    except metrics.Metric.ValueTypeException as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+    except MetricsCollection.NotOwnedException as e:
+        # Nothing is stored, the metric is created through the replica serving it
+        return JSONResponse(status_code=421, content={"success": False, "error": str(e)})
     except Exception as e:
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
 
-@api.post("/metric/{id}/value")
+@router.post("/metric/{id}/value")
 def post_metric_value(id: str, value: valueModels.MetricValue) -> JSONResponse:
 
     try:
@@ -83,6 +129,8 @@ def post_metric_value(id: str, value: valueModels.MetricValue) -> JSONResponse:
                 "error": "Labelset already exists",
             },
         )
+    except metrics.Metric.ValueTypeException as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
     except IndexError:
         return JSONResponse(
             status_code=404,
@@ -98,14 +146,14 @@ def post_metric_value(id: str, value: valueModels.MetricValue) -> JSONResponse:
     )
 
 
-@api.get("/metric/all")
+@router.get("/metric/all")
 def get_metric_all() -> JSONResponse:
     return JSONResponse(
         content=[metric.to_dict() for metric in dependencies.metrics_collection.get_metrics()]
     )
 
 
-@api.get("/metric/{name}")
+@router.get("/metric/{name}")
 def get_metric_by_id(name: str) -> JSONResponse:
     try:
         metric = dependencies.metrics_collection.get_metric(name)
@@ -120,7 +168,75 @@ def get_metric_by_id(name: str) -> JSONResponse:
     return JSONResponse(content=metric.to_dict())
 
 
-@api.delete("/metric/{id}")
+@router.get("/metric/{name}/series")
+def get_metric_series(
+    name: str,
+    start: str,
+    end: str = "now",
+    step: str = "15s",
+    format: Literal["json", "binary"] = "json",
+) -> Response:
+    try:
+        metric = dependencies.metrics_collection.get_metric(name)
+    except IndexError:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": "Requested metric does not exist"},
+        )
+    try:
+        now = time.time()
+        start_time = backfill.parse_timestamp(start, now)
+        end_time = backfill.parse_timestamp(end, now)
+        step_seconds = backfill.parse_step(step)
+        if step_seconds <= 0:
+            raise ValueError("Step must be positive")
+        if end_time < start_time:
+            raise ValueError("End must not be before start")
+    except (ValueError, TypeError) as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+    count = int((end_time - start_time) // step_seconds) + 1
+    if count > SERIES_MAX_POINTS:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"Range exceeds {SERIES_MAX_POINTS} points, increase step",
+            },
+        )
+
+    timestamps = start_time + numpy.arange(count, dtype=numpy.float64) * step_seconds
+    models = metric.values
+    values = valueModels.evaluate(
+        models, clock.clock.from_unix(timestamps), integrate=metric.type == "counter"
+    )
+
+    if format == "binary":
+        return Response(
+            content=values.astype("<f8").tobytes(),
+            media_type="application/octet-stream",
+            headers={
+                "X-Mocktrics-Series": str(len(models)),
+                "X-Mocktrics-Points": str(count),
+                "X-Mocktrics-Start": repr(start_time),
+                "X-Mocktrics-Step": str(step_seconds),
+            },
+        )
+    return JSONResponse(
+        content={
+            "name": name,
+            "start": start_time,
+            "end": end_time,
+            "step": step_seconds,
+            "timestamps": timestamps.tolist(),
+            "series": [
+                {"labels": dict(zip(metric.labels, value.labels)), "values": row.tolist()}
+                for value, row in zip(models, values)
+            ],
+        }
+    )
+
+
+@router.delete("/metric/{id}")
 def delete_metric(id: str, request: Request):
     try:
         dependencies.metrics_collection.delete_metric(id)
@@ -134,7 +250,7 @@ def delete_metric(id: str, request: Request):
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
 
-@api.delete("/metric/{id}/value")
+@router.delete("/metric/{id}/value")
 def delete_metric_value(id: str, request: Request, labels: list[str] = Query(...)):
     try:
         metric = dependencies.metrics_collection.get_metric(id)
@@ -151,11 +267,7 @@ def delete_metric_value(id: str, request: Request, labels: list[str] = Query(...
                 "error": "Value label count does not match metric label count",
             },
         )
-    for value in metric.values:
-        if all([label in value.labels for label in labels]):
-            metric.values.remove(value)
-            break
-    else:
+    if not dependencies.metrics_collection.delete_metric_value(id, labels):
         return JSONResponse(
             status_code=404,
             content={
@@ -164,3 +276,61 @@ def delete_metric_value(id: str, request: Request, labels: list[str] = Query(...
             },
         )
     return JSONResponse(content={"success": True, "name": id, "action": "deleted"})
+
+
+class ClockSeek(pydantic.BaseModel):
+    time: float | str | None = None
+    advance: str | int | None = None
+
+
+class ClockSpeed(pydantic.BaseModel):
+    speed: float
+
+
+def _clock_changed() -> JSONResponse:
+    if dependencies.workers is not None:
+        dependencies.workers.set_clock(clock.clock.state())
+    return JSONResponse(content={"success": True, **clock.clock.to_dict()})
+
+
+@router.get("/clock")
+def get_clock() -> JSONResponse:
+    return JSONResponse(content=clock.clock.to_dict())
+
+
+@router.post("/clock/pause")
+def pause_clock() -> JSONResponse:
+    clock.clock.pause()
+    return _clock_changed()
+
+
+@router.post("/clock/resume")
+def resume_clock() -> JSONResponse:
+    clock.clock.resume()
+    return _clock_changed()
+
+
+@router.post("/clock/seek")
+def seek_clock(seek: ClockSeek) -> JSONResponse:
+    if (seek.time is None) == (seek.advance is None):
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "Either time or advance is required"},
+        )
+    try:
+        if seek.time is not None:
+            clock.clock.seek(clock.parse_epoch(seek.time))
+        elif seek.advance is not None:
+            clock.clock.advance(valueModels.parse_duration(seek.advance))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+    return _clock_changed()
+
+
+@router.post("/clock/speed")
+def set_clock_speed(speed: ClockSpeed) -> JSONResponse:
+    try:
+        clock.clock.set_speed(speed.speed)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+    return _clock_changed()
@@ -3,10 +3,184 @@ import argparse
 _parser = argparse.ArgumentParser(description="parser")
 
 _parser.add_argument("-f", "--config-file", help="Configuration file path", type=str, default=None)
+_parser.add_argument(
+    "--config-cache",
+    help="Directory caching parsed configuration files, unchanged files skip parsing",
+    type=str,
+    default=None,
+)
+_parser.add_argument(
+    "--config-parse-processes",
+    help="Processes parsing included configuration files (0 uses one per CPU, 1 parses them "
+    "in this process)",
+    type=int,
+    default=0,
+)
+_parser.add_argument(
+    "--config-reload-interval",
+    help="Seconds between checks of the configuration file for changes, applied without a "
+    "restart (0 only reloads on SIGHUP)",
+    type=float,
+    default=0.0,
+)
 _parser.add_argument("-a", "--api-port", help="Port for the api and UI", type=int, default=8080)
 _parser.add_argument("-m", "--metrics-port", help="Port for metrics", type=int, default=8000)
 _parser.add_argument(
     "-p", "--persistence_path", help="Path for storage database", type=str, default=None
 )
+_parser.add_argument(
+    "--scrape-cache-interval",
+    help="Seconds a rendered scrape payload is reused across scrapers (0 disables caching)",
+    type=float,
+    default=1.0,
+)
+_parser.add_argument(
+    "-w",
+    "--workers",
+    help="Number of worker processes sharing the metrics port (0 serves from the API process)",
+    type=int,
+    default=0,
+)
+_parser.add_argument(
+    "--shard-index", help="Shard served by this exporter (0 based)", type=int, default=0
+)
+_parser.add_argument(
+    "--shard-count", help="Total amount of shards (1 disables sharding)", type=int, default=1
+)
+_parser.add_argument(
+    "--shard-by",
+    help="Whether whole metrics or individual series are distributed across shards",
+    choices=["metric", "series"],
+    default="series",
+)
+_parser.add_argument(
+    "--remote-write-url", help="Push series to this remote write endpoint", type=str, default=None
+)
+_parser.add_argument(
+    "--remote-write-interval",
+    help="Seconds between samples pushed through remote write",
+    type=float,
+    default=15.0,
+)
+_parser.add_argument(
+    "--remote-write-shards",
+    help="Amount of concurrent remote write senders",
+    type=int,
+    default=1,
+)
+_parser.add_argument(
+    "--remote-write-batch-size",
+    help="Maximum amount of samples per remote write request",
+    type=int,
+    default=2000,
+)
+_parser.add_argument(
+    "--remote-write-queue-capacity",
+    help="Amount of batches queued per remote write shard before samples are dropped",
+    type=int,
+    default=10,
+)
+_parser.add_argument(
+    "--remote-write-retries",
+    help="Amount of retries for failed remote write requests",
+    type=int,
+    default=3,
+)
+_parser.add_argument(
+    "--virtual-targets",
+    help="Number of virtual scrape targets served on /targets/{n}/metrics",
+    type=int,
+    default=0,
+)
+_parser.add_argument(
+    "--virtual-target-label",
+    help="Label added to every series of a virtual target, holding the target number",
+    type=str,
+    default="target",
+)
+_parser.add_argument(
+    "--virtual-target-phase-offset",
+    help="Seconds value models of virtual target n are shifted by, multiplied by n",
+    type=float,
+    default=0.0,
+)
+_parser.add_argument(
+    "--virtual-targets-file-sd",
+    help="Path to write a Prometheus file_sd JSON file describing the virtual targets",
+    type=str,
+    default=None,
+)
+_parser.add_argument(
+    "--virtual-targets-address",
+    help="host:port written to the file_sd targets (defaults to localhost and the metrics port)",
+    type=str,
+    default=None,
+)
+_parser.add_argument(
+    "--clock-speed",
+    help="Speed of the clock value models are evaluated at, 3600 runs an hour per second",
+    type=float,
+    default=1.0,
+)
+_parser.add_argument(
+    "--clock-epoch",
+    help="Start the clock and every value model at this unix or ISO 8601 time, "
+    "making runs reproducible",
+    type=str,
+    default=None,
+)
+_parser.add_argument(
+    "--clone-file",
+    help="Text or OpenMetrics exposition (optionally .gz) to create read only metrics from",
+    action="append",
+    default=[],
+)
+_parser.add_argument(
+    "--clone-noise",
+    help="Gaussian noise added to cloned values, as a fraction of each value (0 keeps them "
+    "static)",
+    type=float,
+    default=0.0,
+)
+_parser.add_argument(
+    "--recordings-dir",
+    help="Directory replay values read their recordings from, paths are relative to it and "
+    "files outside of it are rejected (replay values are disabled without it)",
+    type=str,
+    default=None,
+)
+_parser.add_argument(
+    "--seed",
+    help="Scenario seed for random value models without a seed of their own",
+    type=int,
+    default=None,
+)
+_parser.add_argument(
+    "--debug-endpoints",
+    help="Serve /debug/profile, /debug/heap and /debug/stats on the API port",
+    action="store_true",
+)
+_parser.add_argument(
+    "--metric-stats-top",
+    help="Export series, memory, payload size and evaluation time of the metrics costing "
+    "scrapes the most as meta-metrics (0 disables them)",
+    type=int,
+    default=0,
+)
+_parser.add_argument(
+    "--tracemalloc-frames",
+    help="Trace allocations from startup with this many frames each, for /debug/heap (0 "
+    "disables tracing)",
+    type=int,
+    default=0,
+)
+
+# Defaults until the command line is parsed, importing the package never reads argv
+arguments = _parser.parse_args([])
+
 
-arguments, _ = _parser.parse_known_args()
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse ``argv`` (``sys.argv`` by default) into the shared ``arguments`` namespace."""
+    parsed, _ = _parser.parse_known_args(argv)
+    vars(arguments).update(vars(parsed))
+    return arguments
@@ -0,0 +1,252 @@
+import argparse
+import functools
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import IO, Callable, Iterator, cast
+
+import numpy
+from prometheus_client.utils import floatToGoString
+
+from mocktrics_exporter import clock, configuration, dependencies, metrics, valueModels
+from mocktrics_exporter.arguments import arguments
+from mocktrics_exporter.persistence import Persistence
+
+_parser = argparse.ArgumentParser(
+    prog="mocktrics-exporter backfill",
+    description="Write historical samples as OpenMetrics, suitable for "
+    "'promtool tsdb create-blocks-from openmetrics'",
+)
+_parser.add_argument("-f", "--config-file", help="Configuration file path", type=str, default=None)
+_parser.add_argument(
+    "--config-cache", help="Directory caching parsed configuration files", type=str, default=None
+)
+_parser.add_argument(
+    "--config-parse-processes",
+    help="Processes parsing included configuration files (0 uses one per CPU)",
+    type=int,
+    default=0,
+)
+_parser.add_argument(
+    "-p", "--persistence_path", help="Path for storage database", type=str, default=None
+)
+_parser.add_argument(
+    "--start",
+    help="First timestamp: unix seconds, ISO 8601, 'now' or a duration ago like --start=-7d",
+    type=str,
+    required=True,
+)
+_parser.add_argument("--end", help="Last timestamp, same formats as --start", default="now")
+_parser.add_argument("--step", help="Duration between samples", type=str, default="15s")
+_parser.add_argument(
+    "-o", "--output", help="Output file, '-' writes to stdout", type=str, default="-"
+)
+_parser.add_argument(
+    "--chunk-size", help="Samples evaluated and written at once", type=int, default=10000
+)
+_parser.add_argument(
+    "--recordings-dir",
+    help="Directory replay values read their recordings from (replay values are disabled "
+    "without it)",
+    type=str,
+    default=None,
+)
+_parser.add_argument(
+    "--seed",
+    help="Scenario seed for random value models without a seed of their own",
+    type=int,
+    default=None,
+)
+
+
+@dataclass(slots=True)
+class Family:
+    name: str
+    documentation: str
+    unit: str
+    labels: list[str]
+    values: list[valueModels.MetricValue]
+    type: str = "gauge"
+    buckets: list[float] = field(default_factory=list)
+
+
+def parse_timestamp(value: str, now: float | None = None) -> float:
+    if now is None:
+        now = time.time()
+    value = value.strip()
+    if value == "now":
+        return now
+    if value.startswith("-"):
+        return now - valueModels.parse_duration(value[1:])
+    return clock.parse_epoch(value)
+
+
+def parse_step(value: str) -> int:
+    return valueModels.parse_duration(int(value) if value.isdigit() else value)
+
+
+def families() -> list[Family]:
+    result = [
+        Family(
+            metric.name,
+            metric.documentation,
+            metric.unit,
+            metric.labels,
+            metric.values,
+            metric.type,
+            metric.buckets if metric.buckets is not None else list(metrics.DEFAULT_BUCKETS),
+        )
+        for metric in configuration.configuration.metrics
+    ]
+    if dependencies.database is not None:
+        names = {family.name for family in result}
+        result.extend(
+            Family(
+                metric.name,
+                metric.documentation,
+                metric.unit,
+                metric.labels,
+                metric.values,
+                metric.type,
+                metric.buckets,
+            )
+            for metric in dependencies.database.get_metrics()
+            if metric.name not in names
+        )
+    return result
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format(values: numpy.ndarray) -> list[str]:
+    if numpy.isfinite(values).all():
+        return list(map(repr, values.tolist()))
+    return [
+        (
+            repr(value)
+            if math.isfinite(value)
+            else "NaN" if math.isnan(value) else "+Inf" if value > 0 else "-Inf"
+        )
+        for value in values.tolist()
+    ]
+
+
+def _bucket(
+    histogram: valueModels.HistogramValue, share: float, elapsed: numpy.ndarray
+) -> numpy.ndarray:
+    return numpy.floor(histogram.get_values(elapsed) * share)
+
+
+def _sum(histogram: valueModels.HistogramValue, elapsed: numpy.ndarray) -> numpy.ndarray:
+    return histogram.get_values(elapsed) * histogram.expected()
+
+
+def _series(
+    family: Family, name: str, value: valueModels.MetricValue
+) -> list[tuple[str, Callable[[numpy.ndarray], numpy.ndarray]]]:
+    """Sample prefix and evaluation of every series a value is exposed as."""
+    labels = [
+        f'{label}="{_escape(label_value)}"'
+        for label, label_value in zip(family.labels, value.labels)
+    ]
+    prefix = f"{{{','.join(labels)}}} "
+    match family.type:
+        case "counter":
+            return [(f"{name}_total{prefix}", cast(valueModels.RateValue, value).get_integrals)]
+        case "histogram":
+            histogram = cast(valueModels.HistogramValue, value)
+            shares = histogram.cdf(numpy.array(family.buckets, dtype=numpy.float64)).tolist()
+            bounds = [floatToGoString(bound) for bound in family.buckets] + ["+Inf"]
+            series: list[tuple[str, Callable[[numpy.ndarray], numpy.ndarray]]] = [
+                (
+                    f"{name}_bucket{{{','.join(labels + [le])}}} ",
+                    functools.partial(_bucket, histogram, share),
+                )
+                for le, share in zip((f'le="{bound}"' for bound in bounds), shares + [1.0])
+            ]
+            series.append((f"{name}_count{prefix}", histogram.get_values))
+            series.append((f"{name}_sum{prefix}", functools.partial(_sum, histogram)))
+            return series
+    return [(f"{name}{prefix}", value.get_values)]
+
+
+def generate(
+    families: list[Family], start: float, end: float, step: float, chunk_size: int = 10000
+) -> Iterator[str]:
+    """Yield an OpenMetrics exposition of every series from ``start`` to ``end``.
+
+    Families are written one after another and every series is written completely, in
+    increasing timestamp order, before the next one starts. Values are evaluated
+    ``chunk_size`` timestamps at a time, so memory use does not depend on the range.
+    """
+    if step <= 0:
+        raise ValueError("Step must be positive")
+    if end < start:
+        raise ValueError("End must not be before start")
+    count = int((end - start) // step) + 1
+    disable_units = configuration.configuration.disable_units
+
+    for family in families:
+        unit = "" if disable_units else family.unit
+        name = family.name
+        if family.type == "counter":
+            name = name.removesuffix("_total")
+        if unit and not name.endswith("_" + unit):
+            name += "_" + unit
+        header = f"# HELP {name} {_escape(family.documentation)}\n# TYPE {name} {family.type}\n"
+        if unit:
+            header += f"# UNIT {name} {unit}\n"
+        yield header
+
+        for value in family.values:
+            for prefix, evaluate in _series(family, name, value):
+                for chunk in range(0, count, chunk_size):
+                    elapsed = numpy.arange(chunk, min(count, chunk + chunk_size)) * float(step)
+                    samples = _format(evaluate(elapsed))
+                    timestamps = _format(elapsed + start)
+                    yield "".join(
+                        f"{prefix}{sample} {timestamp}\n"
+                        for sample, timestamp in zip(samples, timestamps)
+                    )
+
+    yield "# EOF\n"
+
+
+def write(
+    output: IO[str],
+    families: list[Family],
+    start: float,
+    end: float,
+    step: float,
+    chunk_size: int = 10000,
+) -> None:
+    for chunk in generate(families, start, end, step, chunk_size):
+        output.write(chunk)
+
+
+def main(argv: list[str]) -> None:
+    args = _parser.parse_args(argv)
+    # Read by the value models while loading the configuration and the database
+    arguments.recordings_dir = args.recordings_dir
+    arguments.seed = args.seed
+    valueModels.load_plugins()
+    if args.config_file:
+        configuration.configuration = configuration.load(
+            args.config_file, args.config_cache, args.config_parse_processes
+        )
+    if args.persistence_path:
+        dependencies.database = Persistence(args.persistence_path)
+
+    now = time.time()
+    start = parse_timestamp(args.start, now)
+    end = parse_timestamp(args.end, now)
+    step = parse_step(args.step)
+
+    if args.output == "-":
+        write(sys.stdout, families(), start, end, step, args.chunk_size)
+    else:
+        with open(args.output, "w", buffering=1 << 20) as output:
+            write(output, families(), start, end, step, args.chunk_size)
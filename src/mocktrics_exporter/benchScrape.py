@@ -0,0 +1,295 @@
+import argparse
+import collections
+import gzip
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from wsgiref.simple_server import WSGIServer
+
+from mocktrics_exporter import (
+    configReload,
+    dependencies,
+    exposition,
+    metaMetrics,
+    metrics,
+    valueModels,
+)
+
+_parser = argparse.ArgumentParser(
+    prog="mocktrics-exporter bench-scrape",
+    description="Scrape an exporter with concurrent scrapers and report latency, throughput "
+    "and payload sizes",
+)
+_parser.add_argument(
+    "--url",
+    help="Metrics endpoint to scrape, an exporter is started in this process if not given",
+    type=str,
+    default=None,
+)
+_parser.add_argument(
+    "-f", "--config-file", help="Configuration of the in-process exporter", type=str, default=None
+)
+_parser.add_argument(
+    "--scrape-cache-interval",
+    help="Seconds a payload of the in-process exporter is reused across scrapers",
+    type=float,
+    default=1.0,
+)
+_parser.add_argument("-n", "--scrapers", help="Concurrent scrapers", type=int, default=10)
+_parser.add_argument(
+    "--interval",
+    help="Seconds between the scrapes of each scraper (0 scrapes back to back)",
+    type=float,
+    default=15.0,
+)
+_parser.add_argument("--duration", help="Seconds to scrape for", type=float, default=60.0)
+_parser.add_argument("--gzip", help="Request gzip compressed payloads", action="store_true")
+_parser.add_argument(
+    "--format", help="Exposition format to request", choices=["text", "openmetrics"], default="text"
+)
+_parser.add_argument("--timeout", help="Seconds before a scrape fails", type=float, default=10.0)
+_parser.add_argument(
+    "--expect-samples",
+    help="Samples every payload must have, the most common count of the run if not given",
+    type=int,
+    default=None,
+)
+_parser.add_argument("--json", help="Print the results as JSON", action="store_true")
+
+_FORMATS = {"text": exposition.TEXT, "openmetrics": exposition.OPENMETRICS}
+# The exporter's own meta-metrics change between scrapes, they are not counted
+_META_PREFIX = (metaMetrics.Metrics._metrics_base_name + "_").encode()
+
+
+def count_samples(payload: bytes) -> int:
+    """Sample lines of a text or OpenMetrics payload, without the exporter's meta-metrics."""
+    if not payload:
+        return 0
+    lines = payload.count(b"\n") + (not payload.endswith(b"\n"))
+    comments = payload.count(b"\n#") + payload.startswith(b"#")
+    meta = payload.count(b"\n" + _META_PREFIX) + payload.startswith(_META_PREFIX)
+    return lines - comments - meta
+
+
+class Scraper:
+    """Scrapes over one keep-alive connection, like a Prometheus scrape loop."""
+
+    def __init__(self, url: str, format: exposition.Format, compress: bool, timeout: float):
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Invalid scrape url: {url}")
+        self._url = parsed
+        self._path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        self._headers = {
+            "Accept": format.content_type,
+            "Accept-Encoding": "gzip" if compress else "identity",
+            "User-Agent": "mocktrics-exporter-bench-scrape",
+        }
+        self.timeout = timeout
+        self._connection: http.client.HTTPConnection | None = None
+        self.latencies: list[float] = []
+        self.failed = 0
+        self.late = 0
+        self.wire_bytes = 0
+        self.bytes = 0
+        self.samples: collections.Counter = collections.Counter()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        connection = (
+            http.client.HTTPSConnection
+            if self._url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection(self._url.hostname or "", self._url.port, timeout=self.timeout)
+
+    def scrape(self) -> None:
+        if self._connection is None:
+            self._connection = self._connect()
+        start = time.perf_counter()
+        try:
+            self._connection.request("GET", self._path, headers=self._headers)
+            response = self._connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            self._connection.close()
+            self._connection = None
+            self.failed += 1
+            return
+        latency = time.perf_counter() - start
+        if response.will_close:
+            self._connection.close()
+            self._connection = None
+        if response.status != 200:
+            self.failed += 1
+            return
+
+        payload = body
+        if response.getheader("Content-Encoding") == "gzip":
+            payload = gzip.decompress(body)
+        self.latencies.append(latency)
+        self.wire_bytes += len(body)
+        self.bytes += len(payload)
+        self.samples[count_samples(payload)] += 1
+
+    def run(self, start: float, interval: float, deadline: float) -> None:
+        """Scrape every ``interval`` seconds from ``start``, a late scrape skips its slot."""
+        next_scrape = start
+        while True:
+            now = time.monotonic()
+            if next_scrape >= deadline:
+                break
+            if next_scrape > now:
+                time.sleep(next_scrape - now)
+            self.scrape()
+            next_scrape += interval
+            if interval > 0 and next_scrape < time.monotonic():
+                self.late += 1
+                next_scrape = time.monotonic()
+        if self._connection is not None:
+            self._connection.close()
+
+
+@dataclass(slots=True)
+class Result:
+    duration: float
+    scrapers: int
+    latencies: list[float] = field(default_factory=list)
+    failed: int = 0
+    late: int = 0
+    wire_bytes: int = 0
+    bytes: int = 0
+    samples: collections.Counter = field(default_factory=collections.Counter)
+    expected_samples: int | None = None
+
+    @property
+    def mismatched(self) -> int:
+        return sum(
+            count for samples, count in self.samples.items() if samples != self.expected_samples
+        )
+
+    def to_dict(self) -> dict:
+        scrapes = len(self.latencies)
+        latencies = sorted(self.latencies)
+        # Nearest rank, exact for small runs too
+        percentile = (
+            (lambda q: latencies[min(scrapes - 1, int(q * scrapes))]) if scrapes else (lambda q: 0)
+        )
+        return {
+            "duration_s": self.duration,
+            "scrapers": self.scrapers,
+            "scrapes": scrapes,
+            "failed": self.failed,
+            "late": self.late,
+            "scrapes_per_s": scrapes / self.duration,
+            "latency_ms": {
+                "p50": percentile(0.5) * 1000,
+                "p99": percentile(0.99) * 1000,
+                "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+                "max": latencies[-1] * 1000 if latencies else 0.0,
+            },
+            "wire_bytes": self.wire_bytes,
+            "wire_bytes_per_scrape": self.wire_bytes / max(1, scrapes),
+            "wire_bytes_per_s": self.wire_bytes / self.duration,
+            "bytes_per_scrape": self.bytes / max(1, scrapes),
+            "expected_samples": self.expected_samples,
+            "mismatched": self.mismatched,
+        }
+
+
+def run(
+    url: str,
+    scrapers: int,
+    interval: float,
+    duration: float,
+    format: exposition.Format = exposition.TEXT,
+    compress: bool = False,
+    timeout: float = 10.0,
+    expected_samples: int | None = None,
+) -> Result:
+    if scrapers < 1:
+        raise ValueError("Scraper count must be atleast 1")
+    if interval < 0 or duration <= 0:
+        raise ValueError("Interval can not be negative and duration must be positive")
+    instances = [Scraper(url, format, compress, timeout) for _ in range(scrapers)]
+    start = time.monotonic()
+    deadline = start + duration
+    threads = [
+        # Spread over the interval like the targets of a Prometheus server
+        threading.Thread(
+            target=scraper.run,
+            args=(start + interval * index / scrapers, interval, deadline),
+            daemon=True,
+        )
+        for index, scraper in enumerate(instances)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = Result(time.monotonic() - start, scrapers)
+    for scraper in instances:
+        result.latencies += scraper.latencies
+        result.failed += scraper.failed
+        result.late += scraper.late
+        result.wire_bytes += scraper.wire_bytes
+        result.bytes += scraper.bytes
+        result.samples.update(scraper.samples)
+    if expected_samples is None and result.samples:
+        expected_samples = result.samples.most_common(1)[0][0]
+    result.expected_samples = expected_samples
+    return result
+
+
+def serve(config_file: str | None, cache_interval: float) -> WSGIServer:
+    """Start an exporter serving ``config_file`` on a free local port of this process."""
+    valueModels.load_plugins()
+    if config_file:
+        configReload.ConfigReloader(config_file, dependencies.metrics_collection).load()
+    app = exposition.make_wsgi_app(
+        exposition.ExpositionCache(metrics.Metric._registry, cache_interval)
+    )
+    return exposition.serve(app, 0, "127.0.0.1")
+
+
+def report(result: dict) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"scrapes   {result['scrapes']} by {result['scrapers']} scrapers in "
+        f"{result['duration_s']:.1f} s, {result['scrapes_per_s']:.1f}/s "
+        f"({result['failed']} failed, {result['late']} late)\n"
+        f"latency   p50 {latency['p50']:.1f} ms  p99 {latency['p99']:.1f} ms  "
+        f"mean {latency['mean']:.1f} ms  max {latency['max']:.1f} ms\n"
+        f"bytes     {result['wire_bytes_per_scrape'] / 1024:.1f} KiB per scrape on the wire, "
+        f"{result['bytes_per_scrape'] / 1024:.1f} KiB decoded, "
+        f"{result['wire_bytes_per_s'] / 1024 / 1024:.2f} MiB/s\n"
+        f"samples   {result['expected_samples']} per scrape, {result['mismatched']} scrapes "
+        "mismatched\n"
+    )
+
+
+def main(argv: list[str]) -> None:
+    args = _parser.parse_args(argv)
+    url = args.url
+    if url is None:
+        server = serve(args.config_file, args.scrape_cache_interval)
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    result = run(
+        url,
+        args.scrapers,
+        args.interval,
+        args.duration,
+        _FORMATS[args.format],
+        args.gzip,
+        args.timeout,
+        args.expect_samples,
+    ).to_dict()
+
+    sys.stdout.write(json.dumps(result, indent=2) + "\n" if args.json else report(result))
+    if result["failed"] or result["mismatched"]:
+        sys.exit(1)
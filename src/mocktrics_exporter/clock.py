@@ -0,0 +1,151 @@
+import contextlib
+import datetime
+import threading
+import time
+from typing import Iterator
+
+import numpy
+
+
+def parse_epoch(value: str | float) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    timestamp = datetime.datetime.fromisoformat(value.strip())
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return timestamp.timestamp()
+
+
+class _Frozen(threading.local):
+    # A class default, reading a missing thread local attribute is slow
+    time: float | None = None
+
+
+class Clock:
+    """The time value models are evaluated at.
+
+    Virtual time runs ``speed`` times as fast as ``time.monotonic()`` and can be paused or
+    moved. Without an ``epoch`` it starts at the monotonic time, with one it starts at
+    ``epoch`` and every value model starts its period at ``epoch`` too, so a run with the
+    same epoch and clock operations produces the same series.
+    """
+
+    def __init__(self, speed: float = 1.0, epoch: float | None = None) -> None:
+        if speed <= 0:
+            raise ValueError("Clock speed must be positive")
+        self.epoch = epoch
+        self._speed = speed
+        self._shift = 0.0
+        self._paused_at: float | None = None
+        self._lock = threading.Lock()
+        self._frozen = _Frozen()
+        if epoch is not None:
+            self._shift = epoch - time.monotonic() * speed
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def _now(self) -> float:
+        if self._paused_at is not None:
+            return self._paused_at
+        return time.monotonic() * self._speed + self._shift
+
+    def now(self) -> float:
+        frozen = self._frozen.time
+        if frozen is not None:
+            return frozen
+        return self._now()
+
+    def origin(self) -> float:
+        """Start time of a value model created now."""
+        if self.epoch is not None:
+            return self.epoch
+        return self.now()
+
+    @contextlib.contextmanager
+    def frozen(self) -> Iterator[float]:
+        """Read the clock once and return that time on this thread until exiting."""
+        previous = self._frozen.time
+        self._frozen.time = now = self.now() if previous is None else previous
+        try:
+            yield now
+        finally:
+            self._frozen.time = previous
+
+    def pause(self) -> None:
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = self._now()
+
+    def resume(self) -> None:
+        with self._lock:
+            if self._paused_at is not None:
+                self._shift = self._paused_at - time.monotonic() * self._speed
+                self._paused_at = None
+
+    def seek(self, target: float) -> None:
+        with self._lock:
+            if self._paused_at is not None:
+                self._paused_at = target
+            else:
+                self._shift = target - time.monotonic() * self._speed
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            if self._paused_at is not None:
+                self._paused_at += seconds
+            else:
+                self._shift += seconds
+
+    def set_speed(self, speed: float) -> None:
+        if speed <= 0:
+            raise ValueError("Clock speed must be positive")
+        with self._lock:
+            if self._paused_at is None:
+                self._shift = self._now() - time.monotonic() * speed
+            self._speed = speed
+
+    def from_unix(self, timestamps: numpy.ndarray) -> numpy.ndarray:
+        """Virtual times the clock shows (or showed) at unix ``timestamps``.
+
+        Pauses and seeks are not recorded, past times assume the current speed.
+        """
+        speed = 0.0 if self.paused else self._speed
+        return self._now() + (timestamps - time.time()) * speed
+
+    def to_unix(self, moment: float) -> float:
+        """Unix timestamp the clock shows (or showed) virtual ``moment`` at, the inverse of
+        ``from_unix``. While paused every moment maps to the current time.
+        """
+        if self.paused:
+            return time.time()
+        return time.time() + (moment - self._now()) / self._speed
+
+    def state(self) -> tuple[float, float, float | None]:
+        with self._lock:
+            return self._speed, self._shift, self._paused_at
+
+    def set_state(self, state: tuple[float, float, float | None]) -> None:
+        with self._lock:
+            self._speed, self._shift, self._paused_at = state
+
+    def to_dict(self) -> dict:
+        return {
+            "time": self.now(),
+            "speed": self._speed,
+            "paused": self.paused,
+            "epoch": self.epoch,
+        }
+
+
+# Replaced by main() once the command line is parsed
+clock = Clock()
@@ -0,0 +1,143 @@
+import gzip
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import IO, Iterable, Iterator
+
+from mocktrics_exporter import valueModels
+from mocktrics_exporter.metrics import Metric
+
+# Prometheus treats an empty label as absent, metrics without labels get this one
+EMPTY_LABEL = "clone"
+
+_sample = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{((?:[^"}]|"(?:[^"\\]|\\.)*")*)\})?\s+(\S+)')
+_label = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"')
+_escape = re.compile(r"\\(.)")
+_escapes = {"n": "\n", "\\": "\\", '"': '"'}
+_FAMILY_SUFFIXES = {"_total", "_created", "_bucket", "_sum", "_count", "_gcount", "_gsum", "_info"}
+
+
+@dataclass(slots=True)
+class Series:
+    name: str
+    documentation: str = ""
+    unit: str = ""
+    labels: dict[str, None] = field(default_factory=dict)
+    samples: dict[tuple[tuple[str, str], ...], float] = field(default_factory=dict)
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _escape.sub(lambda match: _escapes.get(match.group(1), match.group(0)), value)
+
+
+def parse_sample(line: str) -> tuple[str, tuple[tuple[str, str], ...], float]:
+    match = _sample.match(line)
+    if match is None:
+        raise ValueError(f"Invalid sample: {line}")
+    name, body, value = match.groups()
+    labels: tuple[tuple[str, str], ...] = ()
+    if body:
+        labels = tuple(_label.findall(body))
+        if "\\" in body:
+            labels = tuple((label, _unescape(label_value)) for label, label_value in labels)
+    return name, labels, float(value)
+
+
+def _in_family(name: str, family: str) -> bool:
+    return name == family or (
+        name.startswith(family) and name.removeprefix(family) in _FAMILY_SUFFIXES
+    )
+
+
+def parse(lines: Iterable[str]) -> Iterator[Series]:
+    """Parse a text or OpenMetrics exposition into one ``Series`` per sample name.
+
+    Lines are consumed one at a time, the series of a family are yielded as soon as the
+    family ends.
+    """
+    family: str | None = None
+    documentation = unit = ""
+    series: dict[str, Series] = {}
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            parts = line.split(None, 3)
+            if len(parts) < 3 or parts[1] not in ("HELP", "TYPE", "UNIT"):
+                continue
+            if parts[2] != family:
+                yield from series.values()
+                series.clear()
+                family = parts[2]
+                documentation = unit = ""
+            if parts[1] == "HELP":
+                documentation = _unescape(parts[3]) if len(parts) > 3 else ""
+            elif parts[1] == "UNIT" and len(parts) > 3:
+                unit = parts[3]
+            continue
+
+        try:
+            name, labels, value = parse_sample(line)
+        except (ValueError, IndexError) as e:
+            logging.warning(f"Skipping sample: {e}")
+            continue
+        if family is not None and not _in_family(name, family):
+            yield from series.values()
+            series.clear()
+            family = None
+            documentation = unit = ""
+        entry = series.get(name)
+        if entry is None:
+            entry = series[name] = Series(name, documentation, unit)
+        for label, _ in labels:
+            entry.labels[label] = None
+        entry.samples[labels] = value
+
+    yield from series.values()
+
+
+def _value(
+    labels: list[str], value: float, noise: float
+) -> valueModels.StaticValue | valueModels.GaussianValue:
+    if noise > 0 and math.isfinite(value) and value != 0:
+        return valueModels.GaussianValue(mean=value, sigma=abs(value) * noise, labels=labels)
+    return valueModels.StaticValue(value=value, labels=labels)
+
+
+def to_metric(series: Series, noise: float = 0.0) -> Metric:
+    label_names = list(series.labels) or [EMPTY_LABEL]
+    values: list[valueModels.MetricValue] = []
+    for labels, value in series.samples.items():
+        label_values = dict(labels)
+        values.append(_value([label_values.get(name, "") for name in label_names], value, noise))
+
+    unit = series.unit if series.unit and series.name.endswith("_" + series.unit) else ""
+    documentation = series.documentation.replace("\n", " ")[:1000]
+    # The exposition already has one sample per label set, skip the pairwise checks
+    return Metric(series.name, values, documentation, label_names, unit, validate=False)
+
+
+def load(file: IO[str], noise: float = 0.0) -> Iterator[Metric]:
+    names: set[str] = set()
+    for series in parse(file):
+        if series.name in names:
+            logging.warning(f"Skipping metric {series.name}: samples are not grouped")
+            continue
+        try:
+            Metric.validate_name(series.name)
+        except ValueError as e:
+            logging.warning(f"Skipping metric {series.name}: {e}")
+            continue
+        names.add(series.name)
+        yield to_metric(series, noise)
+
+
+def open_exposition(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8", buffering=1 << 20)
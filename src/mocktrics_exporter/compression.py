@@ -0,0 +1,127 @@
+from mocktrics_exporter.protobuf import encode_varint
+
+try:
+    import snappy as _snappy  # python-snappy
+except ImportError:
+    _snappy = None
+
+# Snappy works on independent 64 KiB fragments, keeping every copy offset below 65536
+_BLOCK_SIZE = 1 << 16
+
+_LITERAL = 0
+_COPY_1 = 1
+_COPY_2 = 2
+_COPY_4 = 3
+
+
+def _emit_literal(literal: bytes, out: bytearray) -> None:
+    if not literal:
+        return
+    n = len(literal) - 1
+    if n < 60:
+        out.append(n << 2 | _LITERAL)
+    else:
+        size = (n.bit_length() + 7) // 8
+        out.append((59 + size) << 2 | _LITERAL)
+        out += n.to_bytes(size, "little")
+    out += literal
+
+
+def _emit_copy(offset: int, length: int, out: bytearray) -> None:
+    while length >= 68:
+        out.append((64 - 1) << 2 | _COPY_2)
+        out += offset.to_bytes(2, "little")
+        length -= 64
+    if length > 64:
+        out.append((60 - 1) << 2 | _COPY_2)
+        out += offset.to_bytes(2, "little")
+        length -= 60
+    if length < 12 and offset < 2048:
+        out.append((offset >> 8) << 5 | (length - 4) << 2 | _COPY_1)
+        out.append(offset & 0xFF)
+    else:
+        out.append((length - 1) << 2 | _COPY_2)
+        out += offset.to_bytes(2, "little")
+
+
+def _compress_block(block: bytes, out: bytearray) -> None:
+    table: dict[bytes, int] = {}
+    size = len(block)
+    literal_start = position = 0
+    while position + 4 <= size:
+        end = position + 4
+        key = block[position:end]
+        candidate = table.get(key)
+        table[key] = position
+        if candidate is None:
+            position += 1
+            continue
+        length = 4
+        while position + length < size and block[candidate + length] == block[position + length]:
+            length += 1
+        _emit_literal(block[literal_start:position], out)
+        _emit_copy(position - candidate, length, out)
+        position += length
+        literal_start = position
+    _emit_literal(block[literal_start:], out)
+
+
+def _read_varint(data: bytes, position: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def snappy_compress(data: bytes) -> bytes:
+    """Compress ``data`` with the snappy block format used by Prometheus remote write."""
+    if _snappy is not None:
+        return _snappy.compress(data)
+    out = bytearray(encode_varint(len(data)))
+    for start in range(0, len(data), _BLOCK_SIZE):
+        end = start + _BLOCK_SIZE
+        _compress_block(data[start:end], out)
+    return bytes(out)
+
+
+def snappy_decompress(data: bytes) -> bytes:
+    if _snappy is not None:
+        return _snappy.decompress(data)
+    length, position = _read_varint(data, 0)
+    out = bytearray()
+    while position < len(data):
+        tag = data[position]
+        position += 1
+        kind = tag & 0x3
+        if kind == _LITERAL:
+            n = tag >> 2
+            if n >= 60:
+                size = n - 59
+                end = position + size
+                n = int.from_bytes(data[position:end], "little")
+                position = end
+            end = position + n + 1
+            out += data[position:end]
+            position = end
+            continue
+        if kind == _COPY_1:
+            copy_length = (tag >> 2 & 0x7) + 4
+            offset = (tag >> 5) << 8 | data[position]
+            position += 1
+        else:
+            end = position + (2 if kind == _COPY_2 else 4)
+            copy_length = (tag >> 2) + 1
+            offset = int.from_bytes(data[position:end], "little")
+            position = end
+        if offset == 0 or offset > len(out):
+            raise ValueError("Invalid snappy copy offset")
+        start = len(out) - offset
+        for index in range(copy_length):
+            out.append(out[start + index])
+    if len(out) != length:
+        raise ValueError("Snappy decompressed length mismatch")
+    return bytes(out)
@@ -0,0 +1,229 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from mocktrics_exporter import configuration, metaMetrics
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.valueModels import MetricValue
+
+if TYPE_CHECKING:
+    from mocktrics_exporter.metricCollection import MetricsCollection
+
+
+@dataclass(slots=True)
+class Changes:
+    added: list[Metric] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Metric name to the label sets of removed values and the added values
+    values: dict[str, tuple[list[list[str]], list[MetricValue]]] = field(default_factory=dict)
+
+
+def _metric(model: configuration.Metric) -> Metric:
+    # The collection changes the values of its metrics, keep them apart from the model's
+    return Metric(
+        model.name,
+        list(model.values),
+        model.documentation,
+        model.labels,
+        model.unit,
+        model.type,
+        model.buckets,
+    )
+
+
+def _labels(value: dict) -> tuple[str, ...]:
+    return tuple(value["labels"])
+
+
+class ConfigReloader:
+    """Keeps the metrics of a configuration file in sync with the file.
+
+    A reload compares every metric of the file with its previous version and only
+    validates and applies the difference, values that did not change are kept and their
+    series continue where they were. Reloads run on ``trigger()``, for example on SIGHUP,
+    and when the file changes if ``interval`` is set.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        collection: "MetricsCollection",
+        cache_dir: str | None = None,
+        interval: float = 0.0,
+        processes: int = 0,
+    ) -> None:
+        if interval < 0:
+            raise ValueError("Config reload interval can not be negative")
+        self.path = path
+        self.interval = interval
+        self._collection = collection
+        self._cache_dir = cache_dir
+        self._processes = processes
+        self._include: Any = []
+        # Metrics of the file as parsed, unchanged ones are never validated again
+        self._documents: dict[str, dict] = {}
+        self._models: dict[str, configuration.Metric] = {}
+        self._stat: tuple[tuple[str, int, int], ...] | None = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _file_stat(self) -> tuple[tuple[str, int, int], ...]:
+        # Globs are expanded again, a new included file is a change too
+        files = [self.path]
+        if self._include:
+            files += configuration.includes(self.path, self._include)
+        stats = []
+        for file in files:
+            stat = os.stat(file)
+            stats.append((file, stat.st_mtime_ns, stat.st_size))
+        return tuple(stats)
+
+    def _read(self) -> Any:
+        # Taken first, a change while reading is picked up by the next check. Changed
+        # include globs change the files checked, which reloads once more
+        self._stat = self._file_stat()
+        document = configuration.read(self.path, self._cache_dir, self._processes)
+        self._include = document.get("include") if isinstance(document, dict) else None
+        return document
+
+    def load(self) -> None:
+        """Load the file and add its metrics."""
+        with self._lock:
+            document = self._read()
+            loaded = configuration.Configuration.model_validate(document)
+            self._collection.add_metrics(
+                [_metric(model) for model in loaded.metrics], read_only=True
+            )
+            configuration.configuration = loaded
+            self._documents = {raw["name"]: raw for raw in document.get("metrics") or []}
+            self._models = {model.name: model for model in loaded.metrics}
+
+    def diff(self, document: Any) -> tuple[Changes, dict[str, dict], dict]:
+        """Changes to apply for ``document``, raises without changing anything if invalid."""
+        if not isinstance(document, dict):
+            raise ValueError("Configuration must be a mapping")
+        settings = configuration.Configuration.model_validate(
+            {key: value for key, value in document.items() if key != "metrics"}
+        )
+        if settings.disable_units != configuration.configuration.disable_units:
+            logging.warning("Changing disable_units needs a restart, keeping the current value")
+
+        raws = document.get("metrics") or []
+        if not isinstance(raws, list):
+            raise ValueError("Configuration metrics must be a list")
+        documents: dict[str, dict] = {}
+        models: dict[str, configuration.Metric] = {}
+        for raw in raws:
+            previous = self._documents.get(raw.get("name", "")) if isinstance(raw, dict) else None
+            if previous is not None and previous == raw:
+                name = raw["name"]
+            else:
+                model = configuration.Metric.model_validate(raw)
+                name = model.name
+                models[name] = model
+            if name in documents:
+                raise ValueError(f"Metric {name} is defined more than once")
+            documents[name] = raw
+
+        changes = Changes(removed=[name for name in self._documents if name not in documents])
+        existing = {metric.name for metric in self._collection.get_metrics()}
+        for name, model in models.items():
+            # Validates the metric as a whole before anything is applied
+            metric = _metric(model)
+            previous = self._documents.get(name)
+            if previous is None:
+                if name in existing:
+                    raise ValueError(f"Metric {name} already exists")
+                changes.added.append(metric)
+                continue
+            raw = documents[name]
+            if {k: v for k, v in previous.items() if k != "values"} != {
+                k: v for k, v in raw.items() if k != "values"
+            }:
+                changes.removed.append(name)
+                changes.added.append(metric)
+                continue
+            before = {_labels(value): value for value in previous.get("values") or []}
+            after = {_labels(value): value for value in raw.get("values") or []}
+            removed = [list(key) for key, value in before.items() if after.get(key) != value]
+            added = [
+                value
+                for value, (key, raw_value) in zip(model.values, after.items())
+                if before.get(key) != raw_value
+            ]
+            if removed or added:
+                changes.values[name] = (removed, added)
+        return changes, documents, models
+
+    def apply(self, changes: Changes) -> None:
+        present = {metric.name for metric in self._collection.get_metrics()}
+        for name in changes.removed:
+            # Metrics of other shards were never added
+            if name in present:
+                self._collection.delete_metric(name, force=True)
+        for name, (removed, added) in changes.values.items():
+            if name in present:
+                self._collection.replace_metric_values(name, removed, added)
+        if changes.added:
+            self._collection.add_metrics(changes.added, read_only=True)
+
+    def reload(self) -> bool:
+        """Apply the changes of the file, nothing is applied when any of it is invalid."""
+        with self._lock:
+            try:
+                changes, documents, models = self.diff(self._read())
+                self.apply(changes)
+            except Exception as e:
+                logging.error(f"Config reload of {self.path} failed, nothing was changed: {e}")
+                metaMetrics.metrics.config_reloads.labels("failure").inc()
+                return False
+
+            for name in changes.removed:
+                self._models.pop(name, None)
+            self._models.update(models)
+            self._documents = documents
+            configuration.configuration = configuration.Configuration.model_construct(
+                disable_units=configuration.configuration.disable_units,
+                include=[self._include] if isinstance(self._include, str) else self._include or [],
+                metrics=[self._models[name] for name in documents],
+            )
+            metaMetrics.metrics.config_reloads.labels("success").inc()
+            logging.info(
+                f"Config reloaded: {len(changes.added)} metrics added, "
+                f"{len(changes.removed)} removed, {len(changes.values)} with changed values"
+            )
+            return True
+
+    def trigger(self) -> None:
+        """Reload as soon as possible, safe to call from a signal handler."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            triggered = self._wake.wait(self.interval if self.interval > 0 else None)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            if not triggered:
+                try:
+                    if self._file_stat() == self._stat:
+                        continue
+                except OSError:
+                    # Being replaced, the next check picks it up
+                    continue
+            self.reload()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-reload", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -1,16 +1,25 @@
+import concurrent.futures
+import glob
+import hashlib
+import itertools
+import json
 import logging
+import multiprocessing
+import os
+import tempfile
+from typing import Any, Literal
 
 import pydantic
-import yaml
 
 from mocktrics_exporter import valueModels
-from mocktrics_exporter.arguments import arguments
 
 
 class Metric(pydantic.BaseModel):
     name: str
     documentation: str
     unit: str = ""
+    type: Literal["gauge", "counter", "histogram"] = "gauge"
+    buckets: list[float] | None = None
     labels: list[str] = []
     values: list[valueModels.MetricValue]
 
@@ -18,14 +27,157 @@ class Metric(pydantic.BaseModel):
 class Configuration(pydantic.BaseModel):
 
     disable_units: bool = False
+    # Globs of further files defining metrics, relative to the including file
+    include: list[str] = pydantic.Field(default_factory=list)
     metrics: list[Metric] = pydantic.Field(default_factory=list)
 
+    @pydantic.field_validator("include", mode="before")
+    def convert_include(cls, v):
+        return [v] if isinstance(v, str) else v
 
-if arguments.config_file:
-    with open(arguments.config_file, "r") as file:
-        config = yaml.safe_load(file)
-        logging.info(f"Config loaded: {config}")
-else:
-    config = {}
 
-configuration = Configuration.model_validate(config)
+MSGPACK_SUFFIXES = (".msgpack", ".mpk")
+
+
+def parse(path: str, data: bytes) -> Any:
+    """Configuration document of a YAML, JSON or msgpack file, picked by its suffix."""
+    if path.endswith(".json"):
+        return json.loads(data)
+    if path.endswith(MSGPACK_SUFFIXES):
+        try:
+            import msgpack
+        except ImportError:
+            raise ValueError(
+                "msgpack configuration files need the msgpack package, "
+                "install mocktrics-exporter[msgpack]"
+            )
+        return msgpack.unpackb(data)
+
+    # Only needed when there is a YAML file to read
+    import yaml
+
+    # The libyaml loader is several times faster than the pure Python one
+    return yaml.load(data, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def _cached(cache_dir: str, key: str) -> Any:
+    # Plain JSON, an entry can at most hold a document that is validated like any other
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json"), "rb") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable configuration cache entry {key}: {e}")
+        return None
+
+
+def _store(cache_dir: str, key: str, document: Any) -> None:
+    try:
+        data = json.dumps(document, separators=(",", ":"))
+    except (TypeError, ValueError):
+        data = None
+    # YAML and msgpack have types JSON changes or lacks (dates, bytes, non string keys),
+    # those documents are parsed every time instead
+    if data is None or json.loads(data) != document:
+        logging.debug(f"Configuration cache entry {key} not stored, not representable as JSON")
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written next to the entry and renamed, concurrent instances never read a partial file
+    with tempfile.NamedTemporaryFile("w", dir=cache_dir, delete=False) as file:
+        file.write(data)
+    os.replace(file.name, os.path.join(cache_dir, f"{key}.json"))
+
+
+def read_file(path: str, cache_dir: str | None = None) -> Any:
+    """Parsed, not yet validated document of one configuration file.
+
+    With a ``cache_dir`` the document is cached under the hash of the file, an unchanged
+    file skips parsing. Values are validated on every load, they start when they are
+    created.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if cache_dir is None:
+        document = parse(path, data)
+    else:
+        key = hashlib.sha256(data).hexdigest()
+        document = _cached(cache_dir, key)
+        if document is None:
+            document = parse(path, data)
+            _store(cache_dir, key, document)
+        else:
+            logging.debug(f"Config {path} restored from cache entry {key}")
+    logging.debug(f"Config loaded from {path}")
+    return document or {}
+
+
+def includes(path: str, patterns: Any) -> list[str]:
+    """Files matched by the ``include`` globs of the configuration file ``path``."""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        raise ValueError("Configuration include must be a glob or a list of globs")
+    base = os.path.dirname(os.path.abspath(path))
+    files: dict[str, None] = {}
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.join(base, pattern), recursive=True))
+        if not matches:
+            logging.warning(f"Config include {pattern} matches no files")
+        for match in matches:
+            if os.path.isfile(match) and not os.path.samefile(match, path):
+                files[match] = None
+    return list(files)
+
+
+def _read_files(files: list[str], cache_dir: str | None, processes: int) -> list[Any]:
+    processes = min(processes or os.cpu_count() or 1, len(files))
+    if processes <= 1:
+        return [read_file(file, cache_dir) for file in files]
+    # Parsing holds the GIL, separate processes parse the files side by side. Reloads run
+    # next to the server threads, a forked child could inherit a lock one of them holds
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(processes, mp_context=context) as pool:
+        return list(
+            pool.map(
+                read_file,
+                files,
+                itertools.repeat(cache_dir),
+                chunksize=max(1, len(files) // (processes * 4)),
+            )
+        )
+
+
+def read(path: str, cache_dir: str | None = None, processes: int = 0) -> Any:
+    """Parsed, not yet validated document of a configuration file and its includes.
+
+    Included files are parsed by up to ``processes`` processes (one per CPU by default),
+    their metrics are appended to the ones of ``path`` in the order of the globs.
+    """
+    document = read_file(path, cache_dir)
+    if not isinstance(document, dict) or not document.get("include"):
+        return document
+
+    files = includes(path, document["include"])
+    metrics = list(document.get("metrics") or [])
+    sources = {metric.get("name"): path for metric in metrics if isinstance(metric, dict)}
+    for file, included in zip(files, _read_files(files, cache_dir, processes)):
+        if not isinstance(included, dict) or set(included) - {"metrics"}:
+            raise ValueError(f"Included configuration {file} can only define metrics")
+        for metric in included.get("metrics") or []:
+            name = metric.get("name") if isinstance(metric, dict) else None
+            if name is not None and name in sources:
+                raise ValueError(f"Metric {name} is defined in both {sources[name]} and {file}")
+            sources[name] = file
+            metrics.append(metric)
+    logging.debug(f"Config included {len(files)} files")
+    return {**document, "metrics": metrics}
+
+
+def load(path: str, cache_dir: str | None = None, processes: int = 0) -> Configuration:
+    return Configuration.model_validate(read(path, cache_dir, processes))
+
+
+# Empty until main() loads the configuration file
+configuration = Configuration()
@@ -0,0 +1,222 @@
+import collections
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from mocktrics_exporter import dependencies, metricStats
+
+router = APIRouter(prefix="/debug")
+
+MAX_SECONDS = 300.0
+
+_PACKAGE = os.path.dirname(os.path.abspath(__file__))
+# Below every stack of the main thread, it owns no allocations itself
+_ENTRY = os.path.join(_PACKAGE, "main.py")
+# Innermost Python frames of threads blocked waiting for work
+_IDLE = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+# One profile or heap window at a time, both change process wide state
+_lock = threading.Lock()
+
+Frame = tuple[str, int, str]
+
+
+def sample(seconds: float, interval: float, idle: bool = False) -> collections.Counter:
+    """Stacks of every other thread, sampled every ``interval`` seconds, outermost first."""
+    own = threading.get_ident()
+    samples: collections.Counter = collections.Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack: list[Frame] = []
+            current: types.FrameType | None = frame
+            while current is not None:
+                code = current.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                current = current.f_back
+            if not idle and (os.path.basename(stack[0][0]), stack[0][2]) in _IDLE:
+                continue
+            stack.reverse()
+            samples[tuple(stack)] += 1
+        time.sleep(interval)
+    return samples
+
+
+class SampledProfile:
+    """Samples in the layout of ``cProfile``, every sample counts as a call of ``interval``."""
+
+    def __init__(self, samples: collections.Counter, interval: float) -> None:
+        stats: dict[Frame, list] = {}
+        callers: dict[Frame, dict[Frame, list]] = {}
+        for stack, count in samples.items():
+            seconds = count * interval
+            for frame in set(stack):
+                entry = stats.setdefault(frame, [0, 0, 0.0, 0.0])
+                entry[0] += count
+                entry[1] += count
+                entry[3] += seconds
+            stats[stack[-1]][2] += seconds
+            for caller, callee in set(zip(stack, stack[1:])):
+                edge = callers.setdefault(callee, {}).setdefault(caller, [0, 0, 0.0, 0.0])
+                edge[0] += count
+                edge[1] += count
+                edge[3] += seconds
+                if callee == stack[-1]:
+                    edge[2] += seconds
+        self.stats = {
+            frame: (
+                *entry,
+                {caller: tuple(edge) for caller, edge in callers.get(frame, {}).items()},
+            )
+            for frame, entry in stats.items()
+        }
+
+    def create_stats(self) -> None:
+        pass
+
+
+def collapsed(samples: collections.Counter) -> str:
+    """Stacks in the collapsed format of ``flamegraph.pl`` and speedscope."""
+    lines = []
+    for stack, count in samples.most_common():
+        frames = ";".join(f"{name} ({os.path.basename(file)}:{line})" for file, line, name in stack)
+        lines.append(f"{frames} {count}\n")
+    return "".join(lines)
+
+
+def module(filename: str) -> str:
+    if filename.startswith(_PACKAGE + os.sep):
+        return "mocktrics_exporter." + os.path.splitext(os.path.basename(filename))[0]
+    _, found, rest = filename.partition("site-packages" + os.sep)
+    if found:
+        return os.path.splitext(rest.split(os.sep)[0])[0]
+    return "other"
+
+
+def heap(snapshot: tracemalloc.Snapshot, limit: int) -> dict:
+    """Allocations of a snapshot, each attributed to the innermost frame of this package."""
+    groups: dict[str, list[int]] = {}
+    # Grouped by traceback first, the traces of one call site are attributed once
+    for stat in snapshot.statistics("traceback"):
+        frames = [frame.filename for frame in stat.traceback]
+        owner = next(
+            (
+                filename
+                for filename in reversed(frames)
+                if filename.startswith(_PACKAGE + os.sep) and filename != _ENTRY
+            ),
+            frames[-1] if frames else "",
+        )
+        group = groups.setdefault(module(owner), [0, 0])
+        group[0] += stat.size
+        group[1] += stat.count
+    lines = snapshot.statistics("lineno")
+    return {
+        "size": sum(group[0] for group in groups.values()),
+        "modules": [
+            {"module": name, "size": size, "count": count}
+            for name, (size, count) in sorted(groups.items(), key=lambda item: -item[1][0])[:limit]
+        ],
+        "lines": [
+            {"line": str(stat.traceback[0]), "size": stat.size, "count": stat.count}
+            for stat in lines[:limit]
+        ],
+    }
+
+
+def _busy() -> JSONResponse:
+    return JSONResponse(
+        status_code=409, content={"success": False, "error": "Another capture is running"}
+    )
+
+
+@router.get("/profile")
+def get_profile(
+    seconds: float = Query(10.0, gt=0, le=MAX_SECONDS),
+    interval: float = Query(0.005, ge=0.001, le=1.0),
+    format: Literal["text", "pstats", "collapsed"] = "text",
+    idle: bool = False,
+    limit: int = Query(50, ge=1),
+) -> Response:
+    if not _lock.acquire(blocking=False):
+        return _busy()
+    try:
+        samples = sample(seconds, interval, idle)
+    finally:
+        _lock.release()
+
+    if format == "collapsed":
+        return PlainTextResponse(collapsed(samples))
+    profile = SampledProfile(samples, interval)
+    if format == "pstats":
+        return Response(
+            marshal.dumps(profile.stats),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="profile.pstats"'},
+        )
+    output = io.StringIO()
+    # Stats reads anything with create_stats() and stats, like a profiler
+    stats = pstats.Stats(profile, stream=output)  # type: ignore[arg-type]
+    stats.sort_stats("cumulative").print_stats(limit)
+    return PlainTextResponse(output.getvalue())
+
+
+@router.get("/heap")
+def get_heap(
+    seconds: float = Query(10.0, ge=0, le=MAX_SECONDS),
+    limit: int = Query(20, ge=1),
+) -> JSONResponse:
+    if not _lock.acquire(blocking=False):
+        return _busy()
+    try:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            # Only allocations made, and still held, after this point are seen
+            tracemalloc.start(25)
+            time.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+    finally:
+        _lock.release()
+
+    return JSONResponse(
+        content={
+            "since_startup": tracing,
+            "traced": current,
+            "peak": peak,
+            **heap(snapshot, limit),
+        }
+    )
+
+
+@router.get("/stats")
+def get_stats(
+    top: int = Query(10, ge=1),
+    sort: metricStats.SortKey = "evaluation_seconds",
+) -> JSONResponse:
+    stats = metricStats.measure_all(dependencies.metrics_collection.get_metrics())
+    return JSONResponse(
+        content={
+            "totals": metricStats.totals(stats),
+            "top": [entry.to_dict() for entry in metricStats.top(stats, sort, top)],
+            "metrics": [entry.to_dict() for entry in stats],
+        }
+    )
@@ -1,8 +1,23 @@
-from mocktrics_exporter.arguments import arguments
+import argparse
+from typing import TYPE_CHECKING
+
 from mocktrics_exporter.metricCollection import MetricsCollection
 from mocktrics_exporter.persistence import Persistence
+from mocktrics_exporter.sharding import Sharding
+
+if TYPE_CHECKING:
+    from mocktrics_exporter.workers import WorkerPool
 
 metrics_collection = MetricsCollection()
 database: Persistence | None = None
-if arguments.persistence_path:
-    database = Persistence(arguments.persistence_path)
+workers: "WorkerPool | None" = None
+sharding: Sharding | None = None
+
+
+def setup(arguments: argparse.Namespace) -> None:
+    """Create the shard filter and open the database the command line asks for."""
+    global database, sharding
+    if arguments.shard_count > 1:
+        sharding = Sharding(arguments.shard_index, arguments.shard_count, arguments.shard_by)
+    if arguments.persistence_path:
+        database = Persistence(arguments.persistence_path)
@@ -0,0 +1,263 @@
+import gzip
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from socketserver import ThreadingMixIn
+from typing import Callable
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.openmetrics import exposition as openmetrics_exposition
+from prometheus_client.utils import floatToGoString
+
+from mocktrics_exporter import clock, interning, metaMetrics, protobuf
+
+
+@dataclass(frozen=True, slots=True)
+class Format:
+    name: str
+    content_type: str
+    render: Callable[[CollectorRegistry], bytes]
+
+
+_TEXT_TYPES = {
+    "info": "gauge",
+    "stateset": "gauge",
+    "gaugehistogram": "histogram",
+    "unknown": "untyped",
+}
+_OPENMETRICS_SUFFIXES = ("_created", "_gsum", "_gcount")
+
+
+def _sample_line(sample) -> str:
+    name = interning.metric_name(sample.name)
+    timestamp = ""
+    if sample.timestamp is not None:
+        timestamp = f" {int(float(sample.timestamp) * 1000):d}"
+    if not sample.labels:
+        return f"{name} {floatToGoString(sample.value)}{timestamp}\n"
+    labels = ",".join(
+        [interning.pair(label, value) for label, value in sorted(sample.labels.items())]
+    )
+    return f"{name}{{{labels}}} {floatToGoString(sample.value)}{timestamp}\n"
+
+
+def generate_text(registry: CollectorRegistry) -> bytes:
+    """The Prometheus text format as written by ``prometheus_client``.
+
+    Escaped label pairs are cached, label values repeat on every scrape.
+    """
+    output = []
+    for family in registry.collect():
+        name = family.name
+        if family.type == "counter":
+            name += "_total"
+        elif family.type == "info":
+            name += "_info"
+        name = interning.metric_name(name)
+        type = _TEXT_TYPES.get(family.type, family.type)
+        documentation = family.documentation.replace("\\", r"\\").replace("\n", r"\n")
+
+        output.append(f"# HELP {name} {documentation}\n")
+        output.append(f"# TYPE {name} {type}\n")
+
+        openmetrics_samples: dict[str, list[str]] = {}
+        for sample in family.samples:
+            suffix = sample.name.removeprefix(family.name)
+            if suffix in _OPENMETRICS_SUFFIXES:
+                openmetrics_samples.setdefault(suffix, []).append(_sample_line(sample))
+            else:
+                output.append(_sample_line(sample))
+
+        for suffix, lines in sorted(openmetrics_samples.items()):
+            name = interning.metric_name(family.name + suffix)
+            output.append(f"# HELP {name} {documentation}\n")
+            output.append(f"# TYPE {name} gauge\n")
+            output.extend(lines)
+    return "".join(output).encode("utf-8")
+
+
+TEXT = Format("text", "text/plain; version=0.0.4; charset=utf-8", generate_text)
+OPENMETRICS = Format(
+    "openmetrics",
+    openmetrics_exposition.CONTENT_TYPE_LATEST,
+    openmetrics_exposition.generate_latest,
+)
+PROTOBUF = Format(
+    "protobuf",
+    protobuf.PROTOBUF_CONTENT_TYPE,
+    lambda registry: protobuf.encode_metric_families(registry.collect()),
+)
+
+
+def _parse_media_range(media_range: str) -> tuple[str, dict[str, str], float]:
+    media_type, *raw_params = [part.strip() for part in media_range.split(";")]
+    params = {}
+    for param in raw_params:
+        key, _, value = param.partition("=")
+        params[key.strip().lower()] = value.strip().strip('"')
+    try:
+        quality = float(params.pop("q", "1"))
+    except ValueError:
+        quality = 0.0
+    return media_type.lower(), params, quality
+
+
+def _match(media_type: str, params: dict[str, str]) -> Format | None:
+    match media_type:
+        case "application/vnd.google.protobuf":
+            if (
+                params.get("proto") == "io.prometheus.client.MetricFamily"
+                and params.get("encoding") == "delimited"
+            ):
+                return PROTOBUF
+        case "application/openmetrics-text":
+            return OPENMETRICS
+        case "text/plain" | "text/*" | "*/*":
+            return TEXT
+    return None
+
+
+def negotiate(accept: str | None) -> Format:
+    if not accept:
+        return TEXT
+    best, best_quality = TEXT, 0.0
+    for media_range in accept.split(","):
+        media_type, params, quality = _parse_media_range(media_range)
+        candidate = _match(media_type, params)
+        if candidate is not None and quality > best_quality:
+            best, best_quality = candidate, quality
+    return best
+
+
+def gzip_accepted(accept_encoding: str | None) -> bool:
+    if not accept_encoding:
+        return False
+    for coding in accept_encoding.split(","):
+        name, _, quality = coding.partition(";")
+        if name.strip().lower() == "gzip" and quality.strip() not in ("q=0", "q=0.0"):
+            return True
+    return False
+
+
+class ExpositionCache:
+    """Rendered payloads per format (and gzip), shared by all scrapes within one time bucket."""
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY, interval: float = 1.0) -> None:
+        self._registry = registry
+        self._interval = interval
+        self._entries: dict[tuple[str, bool], tuple[int, bytes]] = {}
+        self._locks: dict[tuple[str, bool], threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _bucket(self) -> int:
+        return int(time.monotonic() // self._interval)
+
+    def _lock(self, key: tuple[str, bool]) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _render(self, format: Format) -> bytes:
+        start = time.perf_counter()
+        # Every series of a scrape is evaluated at the same clock time
+        with clock.clock.frozen(), metaMetrics.scrape() as stats:
+            payload = format.render(self._registry)
+        metaMetrics.metrics.observe_scrape(
+            format.name, time.perf_counter() - start, len(payload), stats
+        )
+        return payload
+
+    def _cached(self, format: Format, compress: bool) -> tuple[bytes, bool]:
+        key = (format.name, compress)
+        with self._lock(key):
+            bucket = self._bucket()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == bucket:
+                return entry[1], True
+            if compress:
+                payload = gzip.compress(self._cached(format, False)[0])
+            else:
+                payload = self._render(format)
+            self._entries[key] = (bucket, payload)
+            return payload, False
+
+    def evict(self) -> bool:
+        """Drop the payloads of past time buckets, returns whether any payload is left."""
+        bucket = self._bucket() if self._interval > 0 else None
+        for key, entry in list(self._entries.items()):
+            # A payload rendered meanwhile replaced the entry, that one is kept
+            if entry[0] != bucket and self._entries.get(key) is entry:
+                self._entries.pop(key, None)
+        return bool(self._entries)
+
+    def get(self, format: Format, compress: bool = False) -> bytes:
+        if self._interval <= 0:
+            payload = self._render(format)
+            return gzip.compress(payload) if compress else payload
+
+        payload, hit = self._cached(format, compress)
+        metaMetrics.metrics.record_scrape_cache(hit)
+        return payload
+
+
+def make_wsgi_app(cache: ExpositionCache) -> Callable:
+
+    def app(environ, start_response):
+        if environ.get("PATH_INFO") == "/favicon.ico":
+            start_response("200 OK", [])
+            return [b""]
+
+        format = negotiate(environ.get("HTTP_ACCEPT"))
+        compress = gzip_accepted(environ.get("HTTP_ACCEPT_ENCODING"))
+        payload = cache.get(format, compress)
+
+        headers = [("Content-Type", format.content_type), ("Content-Length", str(len(payload)))]
+        if compress:
+            headers.append(("Content-Encoding", "gzip"))
+        start_response("200 OK", headers)
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return [b""]
+        return [payload]
+
+    return app
+
+
+class _SilentHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _ReusePortWSGIServer(_ThreadingWSGIServer):
+
+    def server_bind(self):
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def serve(app: Callable, port: int, addr: str = "0.0.0.0", reuse_port: bool = False) -> WSGIServer:
+    server = make_server(
+        addr,
+        port,
+        app,
+        server_class=_ReusePortWSGIServer if reuse_port else _ThreadingWSGIServer,
+        handler_class=_SilentHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def start_http_server(
+    port: int,
+    addr: str = "0.0.0.0",
+    registry: CollectorRegistry = REGISTRY,
+    cache_interval: float = 1.0,
+    reuse_port: bool = False,
+) -> WSGIServer:
+    return serve(make_wsgi_app(ExpositionCache(registry, cache_interval)), port, addr, reuse_port)
@@ -0,0 +1,83 @@
+import sys
+import threading
+from typing import Iterable
+
+from prometheus_client.openmetrics.exposition import (
+    escape_label_name,
+    escape_metric_name,
+)
+
+# Label names and values repeat across metrics built from the same template, every
+# distinct string is kept once and shared by all values using it.
+_strings: dict[str, str] = {}
+_pairs: dict[tuple[str, str], str] = {}
+_metric_names: dict[str, str] = {}
+_lock = threading.Lock()
+
+# Strings of deleted values stay in the table until it doubled since the last sweep
+SWEEP_MINIMUM = 4096
+# References of a string only the table uses: its key and value, the loop variable and
+# the argument of getrefcount
+_UNUSED_REFERENCES = 4
+
+_bytes = 0
+_saved = 0
+_sweep_at = SWEEP_MINIMUM
+
+
+def intern(value: str) -> str:
+    global _bytes, _saved
+    with _lock:
+        interned = _strings.get(value)
+        if interned is None:
+            interned = _strings[value] = value
+            _bytes += sys.getsizeof(value)
+            if len(_strings) >= _sweep_at:
+                _sweep()
+        elif interned is not value:
+            _saved += sys.getsizeof(value)
+    return interned
+
+
+def _sweep() -> int:
+    global _bytes, _sweep_at
+    # Both keep the strings they were built from alive, the next scrape rebuilds them
+    _pairs.clear()
+    _metric_names.clear()
+    unused = [string for string in _strings if sys.getrefcount(string) <= _UNUSED_REFERENCES]
+    for string in unused:
+        del _strings[string]
+        _bytes -= sys.getsizeof(string)
+    _sweep_at = max(SWEEP_MINIMUM, 2 * len(_strings))
+    return len(unused)
+
+
+def sweep() -> int:
+    """Drop the strings nothing but the table uses anymore, returns how many were dropped."""
+    with _lock:
+        return _sweep()
+
+
+def intern_labels(labels: Iterable[str]) -> list[str]:
+    return [intern(label) for label in labels]
+
+
+def pair(name: str, value: str) -> str:
+    """``name="value"`` as written by the text exposition format, escaped once."""
+    rendered = _pairs.get((name, value))
+    if rendered is None:
+        escaped = value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+        rendered = _pairs[(intern(name), intern(value))] = f'{escape_label_name(name)}="{escaped}"'
+    return rendered
+
+
+def metric_name(name: str) -> str:
+    escaped = _metric_names.get(name)
+    if escaped is None:
+        escaped = _metric_names[name] = escape_metric_name(name)
+    return escaped
+
+
+def stats() -> tuple[int, int, int]:
+    """Interned strings, their size in bytes and bytes saved by sharing them."""
+    return len(_strings), _bytes, _saved
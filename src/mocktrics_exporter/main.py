@@ -1,41 +1,159 @@
-import asyncio
 import logging
+import signal
+import sys
+from typing import Callable
 
-import uvicorn
-from prometheus_client import start_http_server
+import prometheus_client
 
-from mocktrics_exporter import configuration, dependencies, metrics
-from mocktrics_exporter.api import api
-from mocktrics_exporter.arguments import arguments
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+from mocktrics_exporter import (
+    clock,
+    clone,
+    configReload,
+    dependencies,
+    exposition,
+    metaMetrics,
+    metricStats,
+    remoteWrite,
+    targets,
+    valueModels,
+    workers,
 )
+from mocktrics_exporter.arguments import arguments, parse_arguments
+
+# FastAPI and uvicorn are imported by the code paths serving the API, the backfill
+# subcommand and tooling importing this module never load them
+
+
+def metrics_app() -> Callable:
+    app = exposition.make_wsgi_app(
+        exposition.ExpositionCache(interval=arguments.scrape_cache_interval)
+    )
+    if arguments.virtual_targets > 0:
+        app = virtual_targets().make_wsgi_app(app)
+    return app
+
+
+def virtual_targets() -> targets.VirtualTargets:
+    return targets.VirtualTargets(
+        dependencies.metrics_collection,
+        arguments.virtual_targets,
+        arguments.virtual_target_label,
+        arguments.virtual_target_phase_offset,
+        arguments.scrape_cache_interval,
+    )
 
 
 def main() -> None:
 
-    for config_metric in configuration.configuration.metrics:
-
-        dependencies.metrics_collection.add_metric(
-            metrics.Metric(
-                config_metric.name,
-                config_metric.values,
-                config_metric.documentation,
-                config_metric.labels,
-                config_metric.unit,
-            ),
-            read_only=True,
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if sys.argv[1:2] == ["backfill"]:
+        from mocktrics_exporter import backfill
+
+        backfill.main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["bench-scrape"]:
+        from mocktrics_exporter import benchScrape
+
+        benchScrape.main(sys.argv[2:])
+        return
+
+    parse_arguments(sys.argv[1:])
+    clock.clock = clock.Clock(
+        arguments.clock_speed,
+        clock.parse_epoch(arguments.clock_epoch) if arguments.clock_epoch is not None else None,
+    )
+    if arguments.tracemalloc_frames > 0:
+        import tracemalloc
+
+        tracemalloc.start(arguments.tracemalloc_frames)
+    valueModels.load_plugins()
+    dependencies.setup(arguments)
+
+    # Registered before anything is served, even without metrics to count yet
+    meta = metaMetrics.metrics
+    if dependencies.sharding is not None:
+        sharding = dependencies.sharding
+        meta.shard_info.labels(str(sharding.index), str(sharding.count), sharding.by).set(1)
+
+    reloader = None
+    if arguments.config_file:
+        reloader = configReload.ConfigReloader(
+            arguments.config_file,
+            dependencies.metrics_collection,
+            arguments.config_cache,
+            arguments.config_reload_interval,
+            arguments.config_parse_processes,
         )
+        reloader.load()
+
+    for path in arguments.clone_file:
+        with clone.open_exposition(path) as file:
+            names = dependencies.metrics_collection.add_metrics(
+                list(clone.load(file, arguments.clone_noise)), read_only=True
+            )
+        logging.info(f"Cloned {len(names)} metrics from {path}")
 
     if dependencies.database is not None:
         for database_metric in dependencies.database.get_metrics():
-            dependencies.metrics_collection.add_metric(database_metric)
+            # Metrics of other shards stay in the database for the replicas serving them
+            if dependencies.sharding is None or dependencies.sharding.owns_metric(
+                database_metric.name
+            ):
+                dependencies.metrics_collection.add_metric(database_metric)
+
+    if arguments.virtual_targets > 0 and arguments.virtual_targets_file_sd:
+        virtual_targets().write_file_sd(
+            arguments.virtual_targets_file_sd,
+            arguments.virtual_targets_address or f"localhost:{arguments.metrics_port}",
+        )
+
+    # Collected after the metrics, a scrape has evaluated them when they are measured
+    if arguments.metric_stats_top > 0:
+        prometheus_client.REGISTRY.register(
+            metricStats.TopMetricsCollector(
+                dependencies.metrics_collection, arguments.metric_stats_top
+            )
+        )
+
+    # Workers are forked before any background thread starts, a forked thread's locks
+    # would stay held in the workers
+    if arguments.workers > 0:
+        dependencies.workers = workers.WorkerPool(
+            arguments.workers, arguments.metrics_port, metrics_app
+        )
+        dependencies.workers.start()
+    else:
+        exposition.serve(metrics_app(), arguments.metrics_port)
+
+    if reloader is not None:
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda signum, frame: reloader.trigger())
+        reloader.start()
+
+    if arguments.remote_write_url:
+        remoteWrite.RemoteWriter(
+            arguments.remote_write_url,
+            dependencies.metrics_collection,
+            arguments.remote_write_interval,
+            arguments.remote_write_shards,
+            arguments.remote_write_batch_size,
+            arguments.remote_write_queue_capacity,
+            arguments.remote_write_retries,
+        ).start()
+
+    import asyncio
+
+    import uvicorn
 
-    start_http_server(arguments.metrics_port)
+    from mocktrics_exporter import api
 
-    config = uvicorn.Config(api, port=arguments.api_port, host="0.0.0.0")
+    config = uvicorn.Config(
+        api.create_app(arguments.debug_endpoints), port=arguments.api_port, host="0.0.0.0"
+    )
     server = uvicorn.Server(config)
 
     asyncio.run(server.serve())
@@ -1,5 +1,69 @@
+import contextlib
+import threading
+from dataclasses import dataclass, field
+from typing import Iterator
+
 import prometheus_client
 
+from mocktrics_exporter import interning
+
+
+@dataclass(slots=True)
+class ScrapeStats:
+    """Evaluation seconds and series per value kind, added up over one scrape."""
+
+    evaluation: dict[str, float] = field(default_factory=dict)
+    series: dict[str, int] = field(default_factory=dict)
+
+    def add(self, kind: str, series: int, seconds: float) -> None:
+        self.evaluation[kind] = self.evaluation.get(kind, 0.0) + seconds
+        self.series[kind] = self.series.get(kind, 0) + series
+
+
+class _Current(threading.local):
+    stats: ScrapeStats | None = None
+
+
+_current = _Current()
+
+
+def scrape_stats() -> ScrapeStats | None:
+    """Stats of the scrape rendered on this thread, ``None`` outside of one."""
+    return _current.stats
+
+
+@contextlib.contextmanager
+def scrape() -> Iterator[ScrapeStats]:
+    previous = _current.stats
+    _current.stats = stats = ScrapeStats()
+    try:
+        yield stats
+    finally:
+        _current.stats = previous
+
+
+@contextlib.contextmanager
+def unaccounted() -> Iterator[None]:
+    """Collect without counting towards a scrape, for renders of the exporter's own."""
+    previous = _current.stats
+    _current.stats = None
+    try:
+        yield
+    finally:
+        _current.stats = previous
+
+
+class _OwnMetrics:
+    """The exporter's own metrics, without the metrics it serves."""
+
+    def __init__(self, metrics: "Metrics") -> None:
+        self._metrics = metrics
+
+    def collect(self) -> Iterator[prometheus_client.Metric]:
+        for metric in vars(self._metrics).values():
+            if isinstance(metric, prometheus_client.metrics.MetricWrapperBase):
+                yield from metric.collect()
+
 
 class Metrics:
 
@@ -33,9 +97,219 @@ class Metrics:
             registry=registry,
         )
 
+        self.config_reloads = prometheus_client.Counter(
+            name=self._metrics_base_name + "_config_reloads",
+            documentation="Total amount of configuration file reloads by result",
+            labelnames=["result"],
+            registry=registry,
+        )
+
+        self.shard_series = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_shard_series",
+            documentation="Total amount of series materialized by this exporter's shard",
+            registry=registry,
+        )
+
+        self.shard_series_skipped = prometheus_client.Counter(
+            name=self._metrics_base_name + "_shard_series_skipped",
+            documentation="Total amount of series skipped for belonging to another shard",
+            registry=registry,
+        )
+
+        self.shard_info = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_shard_info",
+            documentation="Shard served by this exporter",
+            labelnames=["index", "count", "by"],
+            registry=registry,
+        )
+
+        self.remote_write_samples_sent = prometheus_client.Counter(
+            name=self._metrics_base_name + "_remote_write_samples_sent",
+            documentation="Total amount of samples successfully sent through remote write",
+            registry=registry,
+        )
+
+        self.remote_write_samples_failed = prometheus_client.Counter(
+            name=self._metrics_base_name + "_remote_write_samples_failed",
+            documentation="Total amount of samples that could not be sent through remote write",
+            registry=registry,
+        )
+
+        self.remote_write_samples_dropped = prometheus_client.Counter(
+            name=self._metrics_base_name + "_remote_write_samples_dropped",
+            documentation="Total amount of samples dropped because a remote write queue was full",
+            registry=registry,
+        )
+
+        self.remote_write_bytes_sent = prometheus_client.Counter(
+            name=self._metrics_base_name + "_remote_write_bytes_sent",
+            documentation="Total amount of compressed bytes sent through remote write",
+            registry=registry,
+        )
+
+        self.remote_write_retries = prometheus_client.Counter(
+            name=self._metrics_base_name + "_remote_write_retries",
+            documentation="Total amount of retried remote write requests",
+            registry=registry,
+        )
+
+        self.remote_write_duration = prometheus_client.Histogram(
+            name=self._metrics_base_name + "_remote_write_duration_seconds",
+            documentation="Duration of remote write requests",
+            registry=registry,
+        )
+
+        self.scrape_duration = prometheus_client.Histogram(
+            name=self._metrics_base_name + "_scrape_duration_seconds",
+            documentation="Duration of rendering a scrape payload by format",
+            labelnames=["format"],
+            registry=registry,
+        )
+
+        self.scrape_payload_bytes = prometheus_client.Histogram(
+            name=self._metrics_base_name + "_scrape_payload_bytes",
+            documentation="Size of rendered, uncompressed scrape payloads by format",
+            labelnames=["format"],
+            buckets=[1024 * 4**exponent for exponent in range(11)],
+            registry=registry,
+        )
+
+        self.scrape_evaluation_duration = prometheus_client.Histogram(
+            name=self._metrics_base_name + "_scrape_evaluation_duration_seconds",
+            documentation="Time a scrape spent evaluating the values of each kind, "
+            "metrics mixing kinds count as mixed",
+            labelnames=["kind"],
+            buckets=[0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+            registry=registry,
+        )
+
+        self.scrape_series = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_scrape_series",
+            documentation="Total amount of series in the last rendered scrape",
+            registry=registry,
+        )
+
+        self.scrape_kind_series = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_scrape_kind_series",
+            documentation="Amount of series per value kind in the last rendered scrape",
+            labelnames=["kind"],
+            registry=registry,
+        )
+        self._scrape_kinds: set[str] = set()
+
+        self.scrape_cache_requests = prometheus_client.Counter(
+            name=self._metrics_base_name + "_scrape_cache_requests",
+            documentation="Total amount of scrapes by whether a cached payload was served",
+            labelnames=["result"],
+            registry=registry,
+        )
+        self._scrape_cache_lock = threading.Lock()
+        self._scrape_cache_hits = 0
+        self._scrape_cache_misses = 0
+        self.scrape_cache_hit_ratio = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_scrape_cache_hit_ratio",
+            documentation="Share of scrapes served from the payload cache",
+            registry=registry,
+        )
+        self.scrape_cache_hit_ratio.set_function(self._scrape_cache_hit_ratio)
+
+        self.api_request_duration = prometheus_client.Histogram(
+            name=self._metrics_base_name + "_api_request_duration_seconds",
+            documentation="Duration of API requests by method, route template and status code",
+            labelnames=["method", "route", "status"],
+            registry=registry,
+        )
+
+        self.api_request_bytes = prometheus_client.Histogram(
+            name=self._metrics_base_name + "_api_request_bytes",
+            documentation="Size of API request bodies by method and route template",
+            labelnames=["method", "route"],
+            buckets=[64 * 4**exponent for exponent in range(10)],
+            registry=registry,
+        )
+
+        self.api_response_bytes = prometheus_client.Histogram(
+            name=self._metrics_base_name + "_api_response_bytes",
+            documentation="Size of API response bodies by method and route template",
+            labelnames=["method", "route"],
+            buckets=[64 * 4**exponent for exponent in range(10)],
+            registry=registry,
+        )
+
+        self.api_requests_in_flight = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_api_requests_in_flight",
+            documentation="Amount of API requests currently being served",
+            registry=registry,
+        )
+
+        self.label_intern_strings = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_label_intern_strings",
+            documentation="Amount of distinct label names and values held by the intern table",
+            registry=registry,
+        )
+        self.label_intern_strings.set_function(lambda: interning.stats()[0])
+
+        self.label_intern_bytes = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_label_intern_bytes",
+            documentation="Memory used by the strings of the label intern table",
+            registry=registry,
+        )
+        self.label_intern_bytes.set_function(lambda: interning.stats()[1])
+
+        self.label_intern_bytes_saved = prometheus_client.Gauge(
+            name=self._metrics_base_name + "_label_intern_bytes_saved",
+            documentation="Memory of duplicate label strings replaced by their interned copy",
+            registry=registry,
+        )
+        self.label_intern_bytes_saved.set_function(lambda: interning.stats()[2])
+
+        # Only these, the API port serves them next to workers serving the metrics port
+        self.registry = prometheus_client.CollectorRegistry(auto_describe=False)
+        self.registry.register(_OwnMetrics(self))
+
+    def observe_scrape(
+        self, format: str, seconds: float, payload_bytes: int, stats: ScrapeStats
+    ) -> None:
+        self.scrape_duration.labels(format).observe(seconds)
+        self.scrape_payload_bytes.labels(format).observe(payload_bytes)
+        for kind, evaluation in stats.evaluation.items():
+            self.scrape_evaluation_duration.labels(kind).observe(evaluation)
+        self.scrape_series.set(sum(stats.series.values()))
+        for kind in self._scrape_kinds - stats.series.keys():
+            self.scrape_kind_series.labels(kind).set(0)
+        for kind, series in stats.series.items():
+            self.scrape_kind_series.labels(kind).set(series)
+        self._scrape_kinds.update(stats.series)
+
+    def record_scrape_cache(self, hit: bool) -> None:
+        self.scrape_cache_requests.labels("hit" if hit else "miss").inc()
+        with self._scrape_cache_lock:
+            if hit:
+                self._scrape_cache_hits += 1
+            else:
+                self._scrape_cache_misses += 1
+
+    def _scrape_cache_hit_ratio(self) -> float:
+        with self._scrape_cache_lock:
+            return self._scrape_cache_hits / max(
+                1, self._scrape_cache_hits + self._scrape_cache_misses
+            )
+
     @staticmethod
     def get_value(metric: prometheus_client.Gauge | prometheus_client.Counter) -> float:
         return list(metric.collect())[0].samples[0].value
 
 
-metrics = Metrics()
+metrics: Metrics
+_lock = threading.Lock()
+
+
+def __getattr__(name: str) -> Metrics:
+    # Registered on first use, importing the module leaves the default registry alone
+    global metrics
+    if name != "metrics":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _lock:
+        if "metrics" not in globals():
+            metrics = Metrics()
+    return metrics
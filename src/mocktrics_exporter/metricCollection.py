@@ -1,8 +1,10 @@
 import logging
 from dataclasses import dataclass
+from typing import cast
 
 from mocktrics_exporter import dependencies, metaMetrics
 from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.sharding import Sharding
 from mocktrics_exporter.valueModels import MetricValue
 
 
@@ -14,35 +16,109 @@ class MetricsCollection:
         metric: Metric
         read_only: bool
 
+    class NotOwnedException(Exception):
+        pass
+
     def __init__(self):
         self._metrics: list[MetricsCollection.Metrics] = []
-        self.update_metrics()
+        # Series of every metric, kept up to date by each change instead of counted again
+        self._series = 0
 
     def add_metric(self, metric: Metric, read_only: bool = False) -> str:
         if metric.name in [metric.name for metric in self._metrics]:
             raise KeyError("Metric id already exists")
         id = metric.name
+        sharding = dependencies.sharding
+        if sharding is not None and not sharding.owns_metric(id):
+            raise self.NotOwnedException(f"Metric {id} is served by shard {sharding.shard(id)}")
+        if not read_only and dependencies.database is not None:
+            if metric.name not in [m.name for m in dependencies.database.get_metrics()]:
+                dependencies.database.add_metric(metric)
+        if sharding is not None:
+            metric = self._shard(metric)
         self._metrics.append(self.Metrics(id, metric, read_only))
+        self._series += len(metric.runtimes())
         if read_only:
             metaMetrics.metrics.metric_config.inc()
         else:
             metaMetrics.metrics.metric_created.inc()
         self.update_metrics()
         logging.info(f"Adding metric: {id}: {metric}")
-        if not read_only and dependencies.database is not None:
-            if metric.name not in [m.name for m in dependencies.database.get_metrics()]:
-                dependencies.database.add_metric(metric)
         metric.register()
+        if dependencies.workers is not None:
+            dependencies.workers.add_metric(metric, read_only)
 
         return id
 
+    def add_metrics(self, metrics: list[Metric], read_only: bool = False) -> list[str]:
+        """Add many metrics at once, with one database lookup and one meta-metrics update."""
+        names = {metric.name for metric in self._metrics}
+        for metric in metrics:
+            if metric.name in names:
+                raise KeyError(f"Metric id {metric.name} already exists")
+            names.add(metric.name)
+        if not read_only and dependencies.database is not None:
+            stored = {m.name for m in dependencies.database.get_metrics()}
+            for metric in metrics:
+                if metric.name not in stored:
+                    dependencies.database.add_metric(metric)
+        added = []
+        for metric in metrics:
+            if dependencies.sharding is not None:
+                if not dependencies.sharding.owns_metric(metric.name):
+                    continue
+                metric = self._shard(metric)
+            self._metrics.append(self.Metrics(metric.name, metric, read_only))
+            self._series += len(metric.runtimes())
+            metric.register()
+            added.append(metric)
+        if read_only:
+            metaMetrics.metrics.metric_config.inc(len(added))
+        else:
+            metaMetrics.metrics.metric_created.inc(len(added))
+        self.update_metrics()
+        logging.info(f"Adding {len(added)} metrics")
+        if dependencies.workers is not None:
+            dependencies.workers.add_metrics(added, read_only)
+        return [metric.name for metric in metrics]
+
+    def _shard(self, metric: Metric) -> Metric:
+        """``metric`` with the series of this shard only, the given metric is left as is."""
+        sharding = cast(Sharding, dependencies.sharding)
+        owned = sharding.owned_values(metric.name, metric.values)
+        skipped = len(metric.values) - len(owned)
+        if not skipped:
+            return metric
+        metaMetrics.metrics.shard_series_skipped.inc(skipped)
+        return Metric(
+            metric.name,
+            owned,
+            metric.documentation,
+            metric.labels,
+            metric.unit,
+            metric.type,
+            metric.buckets,
+            # Only a registry of the metric itself, the class one does not pickle to workers
+            registry=metric.__dict__.get("_registry"),
+            validate=False,
+        )
+
     def add_metric_value(self, id: str, value: MetricValue) -> None:
         metric = [metric for metric in self._metrics if metric.name == id][0].metric
-        metric.add_value(value)
+        owned = dependencies.sharding is None or dependencies.sharding.owns_value(id, value)
+        if owned:
+            metric.add_value(value)
+            self._series += 1
+            self.update_metrics()
+        else:
+            metric.validate_values(metric.values + [value])
+            metaMetrics.metrics.shard_series_skipped.inc()
         if dependencies.database is not None:
             dependencies.database.add_metric_value(
                 value, dependencies.database.get_metric_id(metric.name)
             )
+        if owned and dependencies.workers is not None:
+            dependencies.workers.add_metric_value(id, value)
 
     def get_metrics(self) -> list[Metric]:
         return [metric.metric for metric in self._metrics]
@@ -50,27 +126,70 @@ class MetricsCollection:
     def get_metric(self, id: str) -> Metric:
         return [metric.metric for metric in self._metrics if metric.name == id][0]
 
-    def delete_metric(self, id: str) -> None:
+    def delete_metric(self, id: str, force: bool = False) -> None:
         metric = [metric for metric in self._metrics if metric.name == id][0]
-        if metric.read_only:
+        if metric.read_only and not force:
             raise AttributeError("Metric is read only and cant be altered or removed")
         metric.metric.unregister()
         logging.debug(f"Unregistering metric: {metric.name}")
         self._metrics.remove(metric)
-        metaMetrics.metrics.metric_deleted.inc()
+        self._series -= len(metric.metric.runtimes())
+        if metric.read_only:
+            metaMetrics.metrics.metric_config.dec()
+        else:
+            metaMetrics.metrics.metric_deleted.inc()
         self.update_metrics()
         logging.info(f"Removing metric: {id}: {metric.name}")
-        if dependencies.database is not None:
+        if not metric.read_only and dependencies.database is not None:
             dependencies.database.delete_metric(metric.metric)
+        if dependencies.workers is not None:
+            dependencies.workers.delete_metric(id)
 
-    def delete_metric_value(self, id: str, labels: list[str]) -> None:
-        metric = [metric for metric in self._metrics if metric.name == id][0].metric
+    def delete_metric_value(self, id: str, labels: list[str]) -> bool:
+        """Remove the value with ``labels``, returns whether the metric had one."""
+        entry = [metric for metric in self._metrics if metric.name == id][0]
+        metric = entry.metric
         for value in metric.values:
             if all([label in value.labels for label in labels]):
-                metric.values.remove(value)
-                if dependencies.database is not None:
+                metric.remove_value(value)
+                self._series -= 1
+                self.update_metrics()
+                if not entry.read_only and dependencies.database is not None:
+                    dependencies.database.delete_metric_value(metric, value)
+                if dependencies.workers is not None:
+                    dependencies.workers.delete_metric_value(id, labels)
+                return True
+        return False
+
+    def replace_metric_values(
+        self, id: str, removed: list[list[str]], added: list[MetricValue]
+    ) -> None:
+        """Remove the values with ``removed`` label sets and add ``added`` in one step.
+
+        Every other value is kept as it is, read only metrics can be changed too.
+        """
+        entry = [metric for metric in self._metrics if metric.name == id][0]
+        metric = entry.metric
+        if dependencies.sharding is not None:
+            owned = dependencies.sharding.owned_values(id, added)
+            metaMetrics.metrics.shard_series_skipped.inc(len(added) - len(owned))
+            added = owned
+        keys = {tuple(labels) for labels in removed}
+        kept = [value for value in metric.values if tuple(value.labels) not in keys]
+        metric.validate_values(kept + added)
+        if not entry.read_only and dependencies.database is not None:
+            metric_id = dependencies.database.get_metric_id(id)
+            for value in metric.values:
+                if tuple(value.labels) in keys:
                     dependencies.database.delete_metric_value(metric, value)
-                break
+            for value in added:
+                dependencies.database.add_metric_value(value, metric_id)
+        self._series += len(kept) + len(added) - len(metric.runtimes())
+        metric.replace_values(kept + added)
+        self.update_metrics()
+        if dependencies.workers is not None:
+            dependencies.workers.replace_metric_values(id, removed, added)
 
     def update_metrics(self) -> None:
         metaMetrics.metrics.metric_count.set(len(self._metrics))
+        metaMetrics.metrics.shard_series.set(self._series)
@@ -0,0 +1,137 @@
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Iterable, Literal, cast
+
+from prometheus_client import CollectorRegistry
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from mocktrics_exporter import clock, exposition, metaMetrics, valueModels
+from mocktrics_exporter.metricCollection import MetricsCollection
+from mocktrics_exporter.metrics import Metric
+
+SortKey = Literal["evaluation_seconds", "bytes", "payload_bytes", "series"]
+
+
+@dataclass(slots=True)
+class MetricStats:
+    name: str
+    series: int
+    # Objects of the metric, its values and their caches. Label strings are shared
+    # through the intern table and replay recordings between values, neither is counted
+    bytes: int
+    payload_bytes: int
+    # Average per scrape since the metric was created, 0 until it is scraped
+    evaluation_seconds: float
+    evaluations: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def held_bytes(metric: Metric) -> int:
+    runtimes = metric.runtimes()
+    size = sys.getsizeof(metric) + sys.getsizeof(metric.__dict__) + sys.getsizeof(runtimes)
+    for runtime in runtimes:
+        size += sys.getsizeof(runtime) + sys.getsizeof(runtime.labels)
+        # Plugin values are their own runtime
+        if isinstance(runtime, valueModels.PluginValue):
+            size += sys.getsizeof(runtime.__dict__)
+            size += sum(sys.getsizeof(field) for field in runtime.__dict__.values())
+            if runtime.__pydantic_private__:
+                size += sys.getsizeof(runtime.__pydantic_private__)
+    size += sum(sys.getsizeof(labels) for labels in metric._collector.label_values())
+    return size
+
+
+def payload_bytes(metric: Metric) -> int:
+    """Size of the metric in the text format, as it is rendered now."""
+    registry = CollectorRegistry(auto_describe=False)
+    registry.register(cast(Collector, metric._collector))
+    # Not a scrape, the averages of the metric only count real ones
+    with clock.clock.frozen(), metaMetrics.unaccounted():
+        return len(exposition.generate_text(registry))
+
+
+def measure(metric: Metric) -> MetricStats:
+    return MetricStats(
+        name=metric.name,
+        series=len(metric.runtimes()),
+        bytes=held_bytes(metric),
+        payload_bytes=payload_bytes(metric),
+        evaluation_seconds=metric.evaluation_seconds / max(1, metric.evaluations),
+        evaluations=metric.evaluations,
+    )
+
+
+def measure_all(metrics: Iterable[Metric]) -> list[MetricStats]:
+    return [measure(metric) for metric in metrics]
+
+
+def top(stats: list[MetricStats], key: SortKey, limit: int) -> list[MetricStats]:
+    return sorted(stats, key=lambda entry: getattr(entry, key), reverse=True)[:limit]
+
+
+def totals(stats: list[MetricStats]) -> dict:
+    return {
+        "metrics": len(stats),
+        "series": sum(entry.series for entry in stats),
+        "bytes": sum(entry.bytes for entry in stats),
+        "payload_bytes": sum(entry.payload_bytes for entry in stats),
+        "evaluation_seconds": sum(entry.evaluation_seconds for entry in stats),
+    }
+
+
+class TopMetricsCollector:
+    """Stats of the ``limit`` metrics costing a scrape the most evaluation time.
+
+    Measuring renders every metric once more, so the stats are refreshed at most every
+    ``interval`` seconds instead of on every scrape.
+    """
+
+    _base_name = "mocktrics_exporter_metric"
+
+    def __init__(self, collection: MetricsCollection, limit: int, interval: float = 60.0):
+        if limit < 1:
+            raise ValueError("Metric stats limit must be atleast 1")
+        self._collection = collection
+        self.limit = limit
+        self.interval = interval
+        self._stats: list[MetricStats] = []
+        self._measured = -float("inf")
+        self._lock = threading.Lock()
+
+    def stats(self) -> list[MetricStats]:
+        with self._lock:
+            if time.monotonic() - self._measured >= self.interval:
+                self._stats = top(
+                    measure_all(self._collection.get_metrics()), "evaluation_seconds", self.limit
+                )
+                self._measured = time.monotonic()
+            return self._stats
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        families = {
+            field: GaugeMetricFamily(f"{self._base_name}_{field}", documentation, labels=["metric"])
+            for field, documentation in (
+                ("series", "Series of the metrics costing scrapes the most"),
+                ("bytes", "Approximate memory held by the metrics costing scrapes the most"),
+                (
+                    "payload_bytes",
+                    "Text format payload size of the metrics costing scrapes the most",
+                ),
+                (
+                    "evaluation_seconds",
+                    "Average evaluation time per scrape of the metrics costing scrapes the most",
+                ),
+            )
+        }
+        for entry in self.stats():
+            for field, family in families.items():
+                family.add_metric([entry.name], getattr(entry, field))
+        yield from families.values()
@@ -1,11 +1,22 @@
+import math
 import re
-from copy import copy
-from typing import cast
+import time
+from typing import Literal, cast
 
-from prometheus_client import REGISTRY, registry
-from prometheus_client.core import GaugeMetricFamily
+import numpy
+from prometheus_client import REGISTRY, CollectorRegistry, registry
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+)
+from prometheus_client.utils import floatToGoString
 
-from mocktrics_exporter import configuration, valueModels
+from mocktrics_exporter import clock, configuration, interning, metaMetrics, valueModels
+
+MetricType = Literal["gauge", "counter", "histogram"]
+
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
 
 
 class Metric:
@@ -19,22 +30,56 @@ class Metric:
         documentation: str = "",
         labels: list[str] = [],
         unit: str = "",
+        type: MetricType = "gauge",
+        buckets: list[float] | None = None,
+        registry: CollectorRegistry | None = None,
+        validate: bool = True,
     ) -> None:
 
+        if registry is not None:
+            self._registry = registry
+
         self.validate_name(name)
         self.name = name
         self.validate_documentation(documentation)
         self.documentation = documentation
         self.validate_labels(labels)
-        self.labels = labels
+        self.labels = interning.intern_labels(labels)
         self.validate_unit(unit)
         self.unit = unit
-
-        self.validate_values(values)
-        self.values = values
+        self.type = type
+        if buckets is None:
+            buckets = DEFAULT_BUCKETS if type == "histogram" else []
+        self.validate_buckets(buckets)
+        self.buckets = buckets
+        # Bumped by every change of the values, caches built from them are keyed by it
+        self.version = 0
+        self._kind: tuple[int, str] = (-1, "")
+        self._cdf: tuple[int, numpy.ndarray] = (-1, numpy.empty((0, 0)))
+        # Scrapes that evaluated the metric and the time they spent on it
+        self.evaluations = 0
+        self.evaluation_seconds = 0.0
+
+        if validate:
+            self.validate_values(values)
+        valueModels.bind(name, values)
+        # Only the compiled values are kept, their models are built again when asked for
+        self._runtimes = valueModels.compile_values(values)
 
         self._collector = self.Collector(self)
 
+    @property
+    def values(self) -> list[valueModels.MetricValue]:
+        values = valueModels.restore(self._runtimes)
+        valueModels.bind(self.name, values)
+        return values
+
+    @values.setter
+    def values(self, values: list[valueModels.MetricValue]) -> None:
+        valueModels.bind(self.name, values)
+        self._runtimes = valueModels.compile_values(values)
+        self.version += 1
+
     @staticmethod
     def validate_name(name: str):
         if len(name) < 1 or len(name) > 200:
@@ -71,26 +116,61 @@ class Metric:
             if pattern.match(unit) is None:
                 raise ValueError("Metric unit must only contain _, a-z or A-Z")
 
+    @staticmethod
+    def validate_buckets(buckets: list[float]):
+        if any(not math.isfinite(bound) for bound in buckets):
+            raise ValueError("Histogram buckets must be finite, +Inf is always added")
+        if any(lower >= upper for lower, upper in zip(buckets, buckets[1:])):
+            raise ValueError("Histogram buckets must be in increasing order")
+
     def validate_values(self, values: list[valueModels.MetricValue]):
-        v = []
+        v = set()
         for value in values:
-            s = set(value.labels)
+            s = frozenset(value.labels)
             if s in v:
                 raise self.DuplicateValueLabelsetException(
                     "Matric values can not have duplicate labels"
                 )
-            v.append(s)
+            v.add(s)
         for value in values:
             if len(self.labels) != len(value.labels):
                 raise self.ValueLabelsetSizeException(
                     "Value label count must match metric label count"
                 )
+        for value in values:
+            if isinstance(value, valueModels.HistogramValue):
+                if self.type != "histogram":
+                    raise self.ValueTypeException("Histogram values need a histogram metric")
+            elif self.type == "histogram":
+                raise self.ValueTypeException("Histogram metrics only take histogram values")
+            elif self.type == "counter":
+                if isinstance(value, valueModels.PluginValue):
+                    raise self.ValueTypeException(
+                        f"Counter metrics can not take {value.kind} values"
+                    )
+                if value.minimum() < 0:
+                    raise self.ValueTypeException("Counter rates can not be negative")
 
     def add_value(self, value: valueModels.MetricValue) -> None:
-        v = copy(self.values)
-        v.append(value)
-        self.validate_values(v)
-        self.values.append(value)
+        self.validate_values(self.values + [value])
+        valueModels.bind(self.name, [value])
+        self._runtimes.extend(valueModels.compile_values([value]))
+        self.version += 1
+
+    def remove_value(self, value: valueModels.MetricValue) -> None:
+        """Remove ``value``, one of the models returned by ``values``."""
+        [runtime] = valueModels.compile_values([value])
+        for index, kept in enumerate(self._runtimes):
+            if kept is runtime:
+                del self._runtimes[index]
+                self.version += 1
+                return
+        raise ValueError("Value is not a value of the metric")
+
+    def replace_values(self, values: list[valueModels.MetricValue]) -> None:
+        valueModels.bind(self.name, values)
+        self._runtimes = valueModels.compile_values(values)
+        self.version += 1
 
     def register(self):
         self._registry.register(cast(registry.Collector, self._collector))
@@ -107,11 +187,41 @@ class Metric:
     class MetricCreationException(Exception):
         pass
 
+    class ValueTypeException(ValueError):
+        pass
+
+    def bucket_cdf(self) -> numpy.ndarray:
+        """Share of observations per bucket of every value, one row per value."""
+        version = self.version
+        if self._cdf[0] != version:
+            values = cast(list[valueModels.HistogramValue], self.values)
+            bounds = numpy.array(self.buckets, dtype=numpy.float64)
+            cdf = numpy.empty((len(values), len(bounds)))
+            for row, value in enumerate(values):
+                cdf[row] = value.cdf(bounds)
+            self._cdf = (version, cdf)
+        return self._cdf[1]
+
+    def runtimes(self) -> list[valueModels.Runtime]:
+        """Compiled values, in the order of the values."""
+        return self._runtimes
+
+    def kind(self) -> str:
+        """Kind of every value, ``mixed`` if they differ."""
+        version = self.version
+        if self._kind[0] != version:
+            kinds = {runtime.kind for runtime in self._runtimes}
+            kind = kinds.pop() if len(kinds) == 1 else "mixed"
+            self._kind = (version, kind)
+        return self._kind[1]
+
     def to_dict(self):
         return {
             "name": self.name,
             "documentation": self.documentation,
             "unit": self.unit,
+            "type": self.type,
+            "buckets": self.buckets,
             "labels": self.labels,
             "values": [value.model_dump() for value in self.values],
         }
@@ -122,6 +232,8 @@ class Metric:
                 self.name == metric.name
                 and self.documentation == metric.documentation
                 and self.unit == metric.unit
+                and self.type == metric.type
+                and self.buckets == metric.buckets
                 and self.labels == metric.labels
             ):
                 return False
@@ -147,22 +259,92 @@ class Metric:
     class Collector:
 
         _metricFamily = GaugeMetricFamily
-
-        def __init__(self, metric: "Metric"):
+        _counterFamily = CounterMetricFamily
+        _histogramFamily = HistogramMetricFamily
+
+        def __init__(
+            self,
+            metric: "Metric",
+            extra_labels: dict[str, str] | None = None,
+            offset: float = 0.0,
+        ):
             self._metric = metric
+            self._offset = offset
+            self._extra_labels = {
+                interning.intern(name): interning.intern(value)
+                for name, value in (extra_labels or {}).items()
+                if name not in metric.labels
+            }
+            self._label_values: tuple[int, list[list[str]]] = (-1, [])
+
+        def label_values(self) -> list[list[str]]:
+            """Label values of every series, rebuilt when the values change."""
+            version = self._metric.version
+            if self._label_values[0] != version:
+                extra = list(self._extra_labels.values())
+                runtimes = self._metric.runtimes()
+                self._label_values = (
+                    version,
+                    [runtime.labels + extra for runtime in runtimes],
+                )
+            return self._label_values[1]
+
+        def _family(self):
+            name = self._metric.name
+            documentation = self._metric.documentation
+            labels = self._metric.labels + list(self._extra_labels)
+            unit = self._metric.unit if not configuration.configuration.disable_units else ""
+            match self._metric.type:
+                case "counter":
+                    return self._counterFamily(name, documentation, labels=labels, unit=unit)
+                case "histogram":
+                    return self._histogramFamily(name, documentation, labels=labels, unit=unit)
+            return self._metricFamily(name, documentation, None, labels, unit)
+
+        def describe(self):
+            # Registering only needs the names, without this the registry collects them
+            yield self._family()
 
         def collect(self):
 
-            c = self._metricFamily(
-                self._metric.name,
-                self._metric.documentation,
-                None,
-                self._metric.labels,
-                self._metric.unit if not configuration.configuration.disable_units else "",
-            )
-
-            for value in self._metric.values:
-
-                c.add_metric(value.labels, value.get_value())
-
-            yield c
+            family = self._family()
+            label_values = self.label_values()
+            now = clock.clock.now() + self._offset
+            # Timed per metric, never per series
+            stats = metaMetrics.scrape_stats()
+            start = time.perf_counter() if stats is not None else 0.0
+
+            match self._metric.type:
+                case "counter":
+                    rates = cast(list[valueModels.RateRuntime], self._metric.runtimes())
+                    for series, rate in zip(label_values, rates):
+                        family.add_metric(series, rate.integral_at(now))
+                case "histogram":
+                    self._collect_histogram(family, now, label_values)
+                case _:
+                    samples = valueModels.evaluate_at(self._metric.runtimes(), now)
+                    for series, sample in zip(label_values, samples):
+                        family.add_metric(series, sample)
+            if stats is not None and label_values:
+                elapsed = time.perf_counter() - start
+                stats.add(self._metric.kind(), len(label_values), elapsed)
+                self._metric.evaluations += 1
+                self._metric.evaluation_seconds += elapsed
+            yield family
+
+        def _collect_histogram(
+            self, c: HistogramMetricFamily, now: float, label_values: list[list[str]]
+        ):
+            runtimes = cast(list[valueModels.HistogramRuntime], self._metric.runtimes())
+            counts = numpy.array([runtime.value_at(now) for runtime in runtimes])
+            # All bucket counts of the metric in one go, floored so they stay monotonic
+            buckets = numpy.floor(counts[:, None] * self._metric.bucket_cdf()).tolist()
+            bounds = [floatToGoString(bound) for bound in self._metric.buckets] + ["+Inf"]
+            for series, runtime, count, row in zip(
+                label_values, runtimes, counts.tolist(), buckets
+            ):
+                c.add_metric(
+                    series,
+                    list(zip(bounds, row + [count])),
+                    count * runtime.expected,
+                )
@@ -0,0 +1,60 @@
+import time
+
+from mocktrics_exporter import metaMetrics
+
+# Requests no route matched share one label, paths are never used as label values
+UNMATCHED_ROUTE = "unmatched"
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+def route_template(scope: dict) -> str:
+    return str(getattr(scope.get("route"), "path_format", UNMATCHED_ROUTE))
+
+
+class MetricsMiddleware:
+    """Records duration, request and response size of every API request.
+
+    Requests are labelled by method, route template (``/metric/{id}/value``) and status
+    code, so the label values are bounded by the routes of the app. A plain ASGI
+    middleware, bodies are counted as they are streamed and never buffered.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        meta = metaMetrics.metrics
+        start = time.perf_counter()
+        status = 500
+        request_bytes = response_bytes = 0
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message) -> None:
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        meta.api_requests_in_flight.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            meta.api_requests_in_flight.dec()
+            method = scope["method"] if scope["method"] in _METHODS else "other"
+            route = route_template(scope)
+            meta.api_request_duration.labels(method, route, str(status)).observe(
+                time.perf_counter() - start
+            )
+            meta.api_request_bytes.labels(method, route).observe(request_bytes)
+            meta.api_response_bytes.labels(method, route).observe(response_bytes)
@@ -1,10 +1,31 @@
+import json
 import logging
 import sqlite3
 from typing import cast
 
+import pydantic
+
 from mocktrics_exporter import valueModels
 from mocktrics_exporter.metrics import Metric
 
+# Values of plugin kinds are stored as "plugin" with their kind and serialization
+VALUE_KINDS = valueModels.BUILTIN_KINDS + ("plugin",)
+
+
+def _value_base_schema(name: str = "value_base") -> str:
+    kinds = ",".join(f"'{kind}'" for kind in VALUE_KINDS)
+    return f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            metric_id INT NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ({kinds})),
+            FOREIGN KEY (metric_id)
+                REFERENCES metrics(id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+        )
+        """
+
 
 class Persistence:
 
@@ -21,10 +42,16 @@ class Persistence:
             with self._connection:
                 self.cursor.execute(
                     """
-                INSERT INTO metrics (name, documentation, unit)
-                VALUES (?, ?, ?)
+                INSERT INTO metrics (name, documentation, unit, type, buckets)
+                VALUES (?, ?, ?, ?, ?)
                 """,
-                    (metric.name, metric.documentation, metric.unit),
+                    (
+                        metric.name,
+                        metric.documentation,
+                        metric.unit,
+                        metric.type,
+                        ", ".join(map(repr, metric.buckets)),
+                    ),
                 )
                 metric_id = self.cursor.lastrowid
                 if metric_id is None:
@@ -74,7 +101,9 @@ class Persistence:
                 m.name,
                 m.documentation,
                 m.unit,
-                GROUP_CONCAT(ml.name, ', ' ORDER BY ml.position) AS labels
+                GROUP_CONCAT(ml.name, ', ' ORDER BY ml.position) AS labels,
+                m.type,
+                m.buckets
             FROM metrics AS m
             LEFT JOIN metric_labels AS ml
                 ON ml.metric_id = m.id
@@ -111,6 +140,19 @@ class Persistence:
                     ).fetchall()[0]
 
                     match kind[1]:
+                        case "plugin":
+                            model = valueModels.plugin(value[1])
+                            if model is None:
+                                logging.warning(
+                                    f"Skipping {value[1]} value of metric {metric[1]}: "
+                                    "value kind is not installed"
+                                )
+                                continue
+                            values.append(
+                                model.model_validate(
+                                    {**json.loads(value[2]), "labels": kind[2].split(", ")}
+                                )
+                            )
                         case "static":
                             values.append(
                                 valueModels.StaticValue(
@@ -156,9 +198,38 @@ class Persistence:
                                     kind=kind[1],
                                     mean=value[1],
                                     sigma=value[2],
+                                    seed=value[3],
                                     labels=kind[2].split(", "),
                                 )
                             )
+                        case "histogram":
+                            values.append(
+                                valueModels.HistogramValue(
+                                    kind=kind[1],
+                                    rate=value[1],
+                                    distribution=value[2],
+                                    mean=value[3],
+                                    sigma=value[4],
+                                    labels=kind[2].split(", "),
+                                )
+                            )
+                        case "replay":
+                            try:
+                                replay = valueModels.ReplayValue(
+                                    kind=kind[1],
+                                    path=value[1],
+                                    step=value[2],
+                                    mode=value[3],
+                                    interpolate=bool(value[4]),
+                                    labels=kind[2].split(", "),
+                                )
+                            except pydantic.ValidationError as e:
+                                logging.warning(
+                                    f"Skipping replay value of metric {metric[1]}: "
+                                    f"recording can not be loaded: {e.errors()[0]['msg']}"
+                                )
+                                continue
+                            values.append(replay)
 
                 result.append(
                     Metric(
@@ -167,6 +238,8 @@ class Persistence:
                         unit=metric[3],
                         values=values,
                         labels=metric[4].split(", "),
+                        type=metric[5],
+                        buckets=[float(bound) for bound in metric[6].split(", ") if bound],
                     )
                 )
 
@@ -192,7 +265,7 @@ class Persistence:
             INSERT INTO value_base (kind, metric_id)
             VALUES (?, ?)
             """,
-                (value.kind, metric_id),
+                ("plugin" if isinstance(value, valueModels.PluginValue) else value.kind, metric_id),
             )
             value_id = self.cursor.lastrowid
 
@@ -206,6 +279,16 @@ class Persistence:
                     (label, value_id, index),
                 )
 
+            if isinstance(value, valueModels.PluginValue):
+                self.cursor.execute(
+                    """
+                INSERT INTO plugin (kind, params, id)
+                VALUES (?, ?, ?)
+                """,
+                    (value.kind, value.serialize(), value_id),
+                )
+                return
+
             match value.kind:
                 case "static":
                     static = cast(valueModels.StaticValue, value)
@@ -258,10 +341,36 @@ class Persistence:
                     gaussian = cast(valueModels.GaussianValue, value)
                     self.cursor.execute(
                         """
-                    INSERT INTO gaussian (mean, sigma, id)
-                    VALUES (?, ?, ?)
+                    INSERT INTO gaussian (mean, sigma, seed, id)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                        (gaussian.mean, gaussian.sigma, gaussian.seed, value_id),
+                    )
+
+                case "histogram":
+                    histogram = cast(valueModels.HistogramValue, value)
+                    self.cursor.execute(
+                        """
+                    INSERT INTO histogram (rate, distribution, mean, sigma, id)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                        (
+                            histogram.rate,
+                            histogram.distribution,
+                            histogram.mean,
+                            histogram.sigma,
+                            value_id,
+                        ),
+                    )
+
+                case "replay":
+                    replay = cast(valueModels.ReplayValue, value)
+                    self.cursor.execute(
+                        """
+                    INSERT INTO replay (path, step, mode, interpolate, id)
+                    VALUES (?, ?, ?, ?, ?)
                     """,
-                        (gaussian.mean, gaussian.sigma, value_id),
+                        (replay.path, replay.step, replay.mode, replay.interpolate, value_id),
                     )
 
     def delete_metric_value(self, metric: Metric, value: valueModels.MetricValue):
@@ -301,10 +410,17 @@ class Persistence:
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE NOT NULL,
             documentation TEXT NOT NULL,
-            unit TEXT NOT NULL
+            unit TEXT NOT NULL,
+            type TEXT NOT NULL DEFAULT 'gauge',
+            buckets TEXT NOT NULL DEFAULT ''
         )
         """
         )
+        columns = [column[1] for column in self.cursor.execute("PRAGMA table_info(metrics)")]
+        if "type" not in columns:
+            logging.info('Adding columns "type" and "buckets" to table "metrics"')
+            self.cursor.execute("ALTER TABLE metrics ADD COLUMN type TEXT NOT NULL DEFAULT 'gauge'")
+            self.cursor.execute("ALTER TABLE metrics ADD COLUMN buckets TEXT NOT NULL DEFAULT ''")
 
         logging.info('Ensuring table "metric_labels"')
         self.cursor.execute(
@@ -324,19 +440,8 @@ class Persistence:
         )
 
         logging.info('Ensuring table "value_base"')
-        self.cursor.execute(
-            """
-        CREATE TABLE IF NOT EXISTS value_base (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            metric_id INT NOT NULL,
-            kind TEXT NOT NULL CHECK (kind IN ('static','ramp','square','sine','gaussian')),
-            FOREIGN KEY (metric_id)
-                REFERENCES metrics(id)
-                    ON DELETE CASCADE
-                    ON UPDATE CASCADE
-        )
-        """
-        )
+        self.cursor.execute(_value_base_schema())
+        self._ensure_value_kinds()
 
         logging.info('Ensuring table "value_labels"')
         self.cursor.execute(
@@ -409,12 +514,80 @@ class Persistence:
         CREATE TABLE IF NOT EXISTS gaussian (
             id INTEGER PRIMARY KEY REFERENCES value_base(id) ON DELETE CASCADE ON UPDATE CASCADE,
             mean INT NOT NULL,
+            sigma REAL NOT NULL,
+            seed INT
+        )
+        """
+        )
+        columns = [column[1] for column in self.cursor.execute("PRAGMA table_info(gaussian)")]
+        if "seed" not in columns:
+            logging.info('Adding column "seed" to table "gaussian"')
+            self.cursor.execute("ALTER TABLE gaussian ADD COLUMN seed INT")
+
+        logging.info('Ensuring table "replay"')
+        self.cursor.execute(
+            """
+        CREATE TABLE IF NOT EXISTS replay (
+            id INTEGER PRIMARY KEY REFERENCES value_base(id) ON DELETE CASCADE ON UPDATE CASCADE,
+            path TEXT NOT NULL,
+            step INT NOT NULL,
+            mode TEXT NOT NULL CHECK (mode IN ('loop','clamp')),
+            interpolate INTEGER NOT NULL CHECK (interpolate IN (0,1))
+        )
+        """
+        )
+
+        logging.info('Ensuring table "histogram"')
+        self.cursor.execute(
+            """
+        CREATE TABLE IF NOT EXISTS histogram (
+            id INTEGER PRIMARY KEY REFERENCES value_base(id) ON DELETE CASCADE ON UPDATE CASCADE,
+            rate REAL NOT NULL,
+            distribution TEXT NOT NULL,
+            mean REAL NOT NULL,
             sigma REAL NOT NULL
         )
         """
         )
 
+        logging.info('Ensuring table "plugin"')
+        self.cursor.execute(
+            """
+        CREATE TABLE IF NOT EXISTS plugin (
+            id INTEGER PRIMARY KEY REFERENCES value_base(id) ON DELETE CASCADE ON UPDATE CASCADE,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL
+        )
+        """
+        )
+
+        self._connection.commit()
+
+    def _ensure_value_kinds(self) -> None:
+        (schema,) = self.cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'value_base'"
+        ).fetchone()
+        if all(f"'{kind}'" in schema for kind in VALUE_KINDS):
+            return
+
+        # SQLite can not alter a CHECK constraint, rebuild the table without cascading the
+        # drop into the value tables referencing it.
+        logging.info('Migrating table "value_base" to the current value kinds')
         self._connection.commit()
+        self.cursor.execute("PRAGMA foreign_keys = OFF;")
+        try:
+            with self._connection:
+                self.cursor.execute(_value_base_schema("value_base_migration"))
+                self.cursor.execute(
+                    """
+                INSERT INTO value_base_migration (id, metric_id, kind)
+                SELECT id, metric_id, kind FROM value_base
+                """
+                )
+                self.cursor.execute("DROP TABLE value_base")
+                self.cursor.execute("ALTER TABLE value_base_migration RENAME TO value_base")
+        finally:
+            self.cursor.execute("PRAGMA foreign_keys = ON;")
 
     def _ensure_indicies(self) -> None:
         with self._connection:
@@ -0,0 +1,196 @@
+import math
+import struct
+from typing import Iterable
+
+from prometheus_client.metrics_core import Metric as MetricFamily
+
+PROTOBUF_CONTENT_TYPE = (
+    "application/vnd.google.protobuf; proto=io.prometheus.client.MetricFamily; encoding=delimited"
+)
+
+# io.prometheus.client.MetricType
+_COUNTER = 0
+_GAUGE = 1
+_SUMMARY = 2
+_UNTYPED = 3
+_HISTOGRAM = 4
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_BYTES = 2
+
+_double = struct.Struct("<d")
+
+
+def encode_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFFFFFFFFFF
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def varint_field(field: int, value: int) -> bytes:
+    return encode_varint(field << 3 | _WIRE_VARINT) + encode_varint(value)
+
+
+def double_field(field: int, value: float) -> bytes:
+    return encode_varint(field << 3 | _WIRE_FIXED64) + _double.pack(value)
+
+
+def bytes_field(field: int, value: bytes) -> bytes:
+    return encode_varint(field << 3 | _WIRE_BYTES) + encode_varint(len(value)) + value
+
+
+def string_field(field: int, value: str) -> bytes:
+    return bytes_field(field, value.encode("utf-8"))
+
+
+def _label_pairs(labels: dict[str, str]) -> bytes:
+    return b"".join(
+        bytes_field(1, string_field(1, name) + string_field(2, value))
+        for name, value in labels.items()
+    )
+
+
+def _timestamp(timestamp) -> bytes:
+    if timestamp is None:
+        return b""
+    return varint_field(6, int(float(timestamp) * 1000))
+
+
+def _gauge_metrics(family: MetricFamily) -> list[bytes]:
+    return [
+        _label_pairs(sample.labels)
+        + bytes_field(2, double_field(1, sample.value))
+        + _timestamp(sample.timestamp)
+        for sample in family.samples
+    ]
+
+
+def _counter_metrics(family: MetricFamily) -> list[bytes]:
+    return [
+        _label_pairs(sample.labels)
+        + bytes_field(3, double_field(1, sample.value))
+        + _timestamp(sample.timestamp)
+        for sample in family.samples
+        if sample.name.endswith("_total")
+    ]
+
+
+def _grouped(family: MetricFamily, exclude: str) -> dict[tuple, dict]:
+    groups: dict[tuple, dict] = {}
+    for sample in family.samples:
+        labels = {k: v for k, v in sample.labels.items() if k != exclude}
+        group = groups.setdefault(
+            tuple(labels.items()),
+            {"labels": labels, "count": 0.0, "sum": 0.0, "points": []},
+        )
+        if sample.name == family.name + "_count":
+            group["count"] = sample.value
+        elif sample.name == family.name + "_sum":
+            group["sum"] = sample.value
+        elif exclude in sample.labels:
+            group["points"].append((float(sample.labels[exclude]), sample.value))
+    return groups
+
+
+def _histogram_metrics(family: MetricFamily) -> list[bytes]:
+    result = []
+    for group in _grouped(family, "le").values():
+        # The +Inf bucket is implied by sample_count in the protobuf format.
+        buckets = b"".join(
+            bytes_field(3, varint_field(1, int(count)) + double_field(2, bound))
+            for bound, count in group["points"]
+            if not math.isinf(bound)
+        )
+        histogram = varint_field(1, int(group["count"])) + double_field(2, group["sum"]) + buckets
+        result.append(_label_pairs(group["labels"]) + bytes_field(7, histogram))
+    return result
+
+
+def _summary_metrics(family: MetricFamily) -> list[bytes]:
+    result = []
+    for group in _grouped(family, "quantile").values():
+        quantiles = b"".join(
+            bytes_field(3, double_field(1, quantile) + double_field(2, value))
+            for quantile, value in group["points"]
+        )
+        summary = varint_field(1, int(group["count"])) + double_field(2, group["sum"]) + quantiles
+        result.append(_label_pairs(group["labels"]) + bytes_field(4, summary))
+    return result
+
+
+def _encode_family(name: str, documentation: str, kind: int, metrics: list[bytes]) -> bytes:
+    family = (
+        string_field(1, name)
+        + string_field(2, documentation)
+        + varint_field(3, kind)
+        + b"".join(bytes_field(4, metric) for metric in metrics)
+    )
+    return encode_varint(len(family)) + family
+
+
+def encode_metric_families(families: Iterable[MetricFamily]) -> bytes:
+    """Encode collected metric families as length-delimited io.prometheus.client protobuf."""
+
+    output = []
+    for family in families:
+        match family.type:
+            case "gauge":
+                output.append(
+                    _encode_family(
+                        family.name, family.documentation, _GAUGE, _gauge_metrics(family)
+                    )
+                )
+            case "counter":
+                output.append(
+                    _encode_family(
+                        family.name + "_total",
+                        family.documentation,
+                        _COUNTER,
+                        _counter_metrics(family),
+                    )
+                )
+            case "histogram":
+                output.append(
+                    _encode_family(
+                        family.name, family.documentation, _HISTOGRAM, _histogram_metrics(family)
+                    )
+                )
+            case "summary":
+                output.append(
+                    _encode_family(
+                        family.name, family.documentation, _SUMMARY, _summary_metrics(family)
+                    )
+                )
+            case _:
+                by_name: dict[str, list[bytes]] = {}
+                for sample in family.samples:
+                    by_name.setdefault(sample.name, []).append(
+                        _label_pairs(sample.labels)
+                        + bytes_field(5, double_field(1, sample.value))
+                        + _timestamp(sample.timestamp)
+                    )
+                for name, metrics in by_name.items():
+                    output.append(_encode_family(name, family.documentation, _UNTYPED, metrics))
+    return b"".join(output)
+
+
+def encode_time_series(
+    labels: Iterable[tuple[str, str]], samples: Iterable[tuple[float, int]]
+) -> bytes:
+    """Encode a prometheus.TimeSeries, ``labels`` must be sorted by name."""
+    return b"".join(
+        bytes_field(1, string_field(1, name) + string_field(2, value)) for name, value in labels
+    ) + b"".join(
+        bytes_field(2, double_field(1, value) + varint_field(2, timestamp))
+        for value, timestamp in samples
+    )
+
+
+def encode_write_request(series: Iterable[bytes]) -> bytes:
+    """Encode a prometheus.WriteRequest from already encoded time series."""
+    return b"".join(bytes_field(1, time_series) for time_series in series)
@@ -0,0 +1,178 @@
+import http.client
+import logging
+import queue
+import threading
+import time
+import urllib.parse
+
+from mocktrics_exporter import clock, metaMetrics, protobuf
+from mocktrics_exporter.compression import snappy_compress
+from mocktrics_exporter.metricCollection import MetricsCollection
+
+_HEADERS = {
+    "Content-Encoding": "snappy",
+    "Content-Type": "application/x-protobuf",
+    "User-Agent": "mocktrics-exporter",
+    "X-Prometheus-Remote-Write-Version": "0.1.0",
+}
+
+
+class RemoteWriter:
+    """Pushes every series of the collection to a Prometheus remote write endpoint.
+
+    Samples are produced every ``interval`` seconds, split over ``shards`` by series and
+    sent in batches of at most ``batch_size`` series. Each shard owns a bounded queue of
+    ``queue_capacity`` batches and a keep-alive connection, batches are dropped when a
+    shard can not keep up.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        collection: MetricsCollection,
+        interval: float = 15.0,
+        shards: int = 1,
+        batch_size: int = 2000,
+        queue_capacity: int = 10,
+        retries: int = 3,
+        timeout: float = 10.0,
+    ) -> None:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Invalid remote write url: {url}")
+        if interval <= 0:
+            raise ValueError("Remote write interval must be positive")
+        if shards < 1 or batch_size < 1 or queue_capacity < 1:
+            raise ValueError("Remote write shards, batch size and queue capacity must be positive")
+        if retries < 0:
+            raise ValueError("Remote write retries can not be negative")
+
+        self._url = parsed
+        self._path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        self._collection = collection
+        self.interval = interval
+        self.batch_size = batch_size
+        self.retries = retries
+        self.timeout = timeout
+        self._queues: list[queue.Queue] = [
+            queue.Queue(maxsize=queue_capacity) for _ in range(shards)
+        ]
+        self._labels: dict[tuple, bytes] = {}
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _connect(self) -> http.client.HTTPConnection:
+        connection = (
+            http.client.HTTPSConnection
+            if self._url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection(self._url.hostname or "", self._url.port, timeout=self.timeout)
+
+    def collect(self, timestamp: int) -> list[list[bytes]]:
+        """Evaluate every series once and encode it as a time series per shard."""
+        shards: list[list[bytes]] = [[] for _ in self._queues]
+        labels_cache: dict[tuple, bytes] = {}
+        for metric in self._collection.get_metrics():
+            for family in metric.Collector(metric).collect():
+                for sample in family.samples:
+                    key = (sample.name, *sample.labels.items())
+                    labels = self._labels.get(key)
+                    if labels is None:
+                        labels = protobuf.encode_time_series(
+                            sorted({**sample.labels, "__name__": sample.name}.items()), []
+                        )
+                    labels_cache[key] = labels
+                    shards[hash(key) % len(shards)].append(
+                        labels + protobuf.encode_time_series([], [(sample.value, timestamp)])
+                    )
+        # Only keep the encoded labels of series that still exist
+        self._labels = labels_cache
+        return shards
+
+    def produce(self) -> None:
+        # Every series evaluated at the same virtual time, stamped with its unix time
+        with clock.clock.frozen() as now:
+            shards = self.collect(int(clock.clock.to_unix(now) * 1000))
+        for shard, series in enumerate(shards):
+            for start in range(0, len(series), self.batch_size):
+                end = start + self.batch_size
+                batch = series[start:end]
+                try:
+                    self._queues[shard].put_nowait(batch)
+                except queue.Full:
+                    metaMetrics.metrics.remote_write_samples_dropped.inc(len(batch))
+
+    def send(self, connection: http.client.HTTPConnection, batch: list[bytes]) -> bool:
+        body = snappy_compress(protobuf.encode_write_request(batch))
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                metaMetrics.metrics.remote_write_retries.inc()
+                if self._stop.wait(min(0.1 * 2**attempt, 5.0)):
+                    break
+            start = time.perf_counter()
+            try:
+                connection.request("POST", self._path, body, _HEADERS)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as e:
+                logging.debug(f"Remote write failed: {e}")
+                connection.close()
+                continue
+            finally:
+                metaMetrics.metrics.remote_write_duration.observe(time.perf_counter() - start)
+            if 200 <= response.status < 300:
+                metaMetrics.metrics.remote_write_samples_sent.inc(len(batch))
+                metaMetrics.metrics.remote_write_bytes_sent.inc(len(body))
+                return True
+            if response.status != 429 and response.status < 500:
+                logging.warning(f"Remote write rejected with status {response.status}")
+                break
+        metaMetrics.metrics.remote_write_samples_failed.inc(len(batch))
+        return False
+
+    def _run_sender(self, shard: int) -> None:
+        connection = self._connect()
+        while True:
+            batch = self._queues[shard].get()
+            if batch is None:
+                break
+            self.send(connection, batch)
+        connection.close()
+
+    def _run_producer(self) -> None:
+        deadline = time.monotonic()
+        while not self._stop.wait(max(0.0, deadline - time.monotonic())):
+            deadline += self.interval
+            try:
+                self.produce()
+            except Exception as e:
+                logging.error(f"Remote write failed to produce samples: {e}")
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run_sender, args=(shard,), daemon=True)
+            for shard in range(len(self._queues))
+        ]
+        self._threads.append(threading.Thread(target=self._run_producer, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for shard_queue in self._queues:
+            # A full queue of a slow or unreachable receiver makes room for the stop marker
+            while True:
+                try:
+                    shard_queue.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:
+                        batch = shard_queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    if batch is not None:
+                        metaMetrics.metrics.remote_write_samples_dropped.inc(len(batch))
+        for thread in self._threads:
+            thread.join(timeout=self.timeout)
@@ -0,0 +1,51 @@
+import hashlib
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from mocktrics_exporter.valueModels import MetricValue
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach), maps a 64 bit key onto one of the buckets."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def key_hash(*parts: str) -> int:
+    """Stable 64 bit key of a series, the same in every process and run."""
+    digest = hashlib.blake2b("\xff".join(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class Sharding:
+
+    def __init__(self, index: int, count: int, by: Literal["metric", "series"] = "series") -> None:
+        if count < 1:
+            raise ValueError("Shard count must be atleast 1")
+        if index < 0 or index >= count:
+            raise ValueError("Shard index must be between 0 and shard count - 1")
+        if by not in ("metric", "series"):
+            raise ValueError("Sharding must be by metric or series")
+        self.index = index
+        self.count = count
+        self.by = by
+
+    def shard(self, *parts: str) -> int:
+        return jump_hash(key_hash(*parts), self.count)
+
+    def owns_metric(self, name: str) -> bool:
+        if self.by == "series":
+            return True
+        return self.shard(name) == self.index
+
+    def owns_value(self, name: str, value: "MetricValue") -> bool:
+        if self.by == "metric":
+            return self.owns_metric(name)
+        return self.shard(name, *value.labels) == self.index
+
+    def owned_values(self, name: str, values: "list[MetricValue]") -> "list[MetricValue]":
+        return [value for value in values if self.owns_value(name, value)]
@@ -0,0 +1,128 @@
+import json
+import re
+import threading
+import time
+from typing import Callable
+
+from prometheus_client import CollectorRegistry
+
+from mocktrics_exporter import exposition
+from mocktrics_exporter.metricCollection import MetricsCollection
+from mocktrics_exporter.metrics import Metric
+
+
+class TargetCollector:
+
+    def __init__(
+        self, collection: MetricsCollection, labels: dict[str, str], offset: float = 0.0
+    ) -> None:
+        self._collection = collection
+        self._labels = labels
+        self._offset = offset
+        # Keyed on the metric id, a kept collector holds its metric so the id is not reused
+        self._collectors: dict[int, Metric.Collector] = {}
+
+    def collect(self):
+        collectors = {}
+        for metric in self._collection.get_metrics():
+            collector = self._collectors.get(id(metric))
+            if collector is None:
+                collector = metric.Collector(metric, self._labels, self._offset)
+            collectors[id(metric)] = collector
+        self._collectors = collectors
+        for collector in collectors.values():
+            yield from collector.collect()
+
+
+class VirtualTargets:
+    """A number of scrape targets sharing one definition set.
+
+    Target ``n`` is served on ``/targets/{n}/metrics`` with ``label_name="n"`` added to
+    every series and its value models shifted ``n * phase_offset`` seconds.
+    """
+
+    _path = re.compile(r"^/targets/(\d+)/metrics/?$")
+
+    def __init__(
+        self,
+        collection: MetricsCollection,
+        count: int,
+        label_name: str = "target",
+        phase_offset: float = 0.0,
+        cache_interval: float = 1.0,
+    ) -> None:
+        if count < 1:
+            raise ValueError("Virtual target count must be atleast 1")
+        self._collection = collection
+        self.count = count
+        self.label_name = label_name
+        self.phase_offset = phase_offset
+        self._cache_interval = cache_interval
+        self._caches: dict[int, exposition.ExpositionCache] = {}
+        self._swept = -1
+        self._lock = threading.Lock()
+
+    def registry(self, index: int) -> CollectorRegistry:
+        registry = CollectorRegistry(auto_describe=False)
+        registry.register(
+            TargetCollector(
+                self._collection,
+                {self.label_name: str(index)},
+                index * self.phase_offset,
+            )
+        )
+        return registry
+
+    def cache(self, index: int) -> exposition.ExpositionCache:
+        if index < 0 or index >= self.count:
+            raise IndexError("Virtual target does not exist")
+        with self._lock:
+            self._sweep()
+            if index not in self._caches:
+                self._caches[index] = exposition.ExpositionCache(
+                    self.registry(index), self._cache_interval
+                )
+            return self._caches[index]
+
+    def _sweep(self) -> None:
+        # Targets are scraped once per scrape interval but a payload is only reused within
+        # one cache interval, without this every target would hold its last payloads
+        bucket = int(time.monotonic() // max(self._cache_interval, 1.0))
+        if bucket == self._swept:
+            return
+        self._swept = bucket
+        for index, cache in list(self._caches.items()):
+            if not cache.evict():
+                del self._caches[index]
+
+    @staticmethod
+    def metrics_path(index: int) -> str:
+        return f"/targets/{index}/metrics"
+
+    def file_sd(self, address: str) -> list[dict]:
+        return [
+            {
+                "targets": [address],
+                "labels": {"__metrics_path__": self.metrics_path(index)},
+            }
+            for index in range(self.count)
+        ]
+
+    def write_file_sd(self, path: str, address: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.file_sd(address), file, indent=2)
+
+    def make_wsgi_app(self, fallback: Callable) -> Callable:
+
+        def app(environ, start_response):
+            match = self._path.match(environ.get("PATH_INFO", ""))
+            if match is None:
+                return fallback(environ, start_response)
+            try:
+                cache = self.cache(int(match.group(1)))
+            except IndexError:
+                start_response("404 Not Found", [("Content-Type", "text/plain")])
+                return [b"Virtual target does not exist\n"]
+            return exposition.make_wsgi_app(cache)(environ, start_response)
+
+        return app
@@ -1,11 +1,44 @@
+import abc
+import importlib.metadata
+import inspect
+import logging
 import math
-import random
+import os
 import re
-import time
-from typing import Annotated, Literal, Union
+import threading
+from dataclasses import dataclass
+from typing import Annotated, Any, ClassVar, Literal, Union, cast
 
+import numpy
 import pydantic
 
+from mocktrics_exporter import clock, interning
+from mocktrics_exporter.arguments import arguments
+from mocktrics_exporter.sharding import key_hash
+
+# Samples drawn at once by a gaussian value, consumed one per scrape
+GAUSSIAN_BUFFER_SIZE = 1024
+
+# Keyed by the recordings directory too, relative paths resolve differently in another one
+_recordings: dict[tuple[str | None, str], numpy.ndarray] = {}
+_recordings_lock = threading.Lock()
+_cumulatives: dict[tuple[str | None, str, str, bool], numpy.ndarray] = {}
+
+# Label values, interned so values of template-like metrics share their strings
+Labels = Annotated[list[str], pydantic.AfterValidator(interning.intern_labels)]
+
+
+def _restore(model: Any, runtime: Any, **fields: Any) -> Any:
+    """``model`` of a compiled ``runtime``, built again without validating it."""
+    value = model.model_construct(labels=runtime.labels, **fields)
+    value._start_time = runtime.start
+    value._runtime = runtime
+    return value
+
+
+# Entry point group of value kind plugins
+PLUGIN_GROUP = "mocktrics_exporter.value_models"
+
 
 def parse_duration(duration: str | int):
     if isinstance(duration, int):
@@ -38,18 +71,99 @@ def parse_size(size: str | int | float):
     return float(num) * multipliers[unit]
 
 
+@dataclass(slots=True, frozen=True)
+class StaticRuntime:
+    kind: ClassVar[str] = "static"
+    start: float
+    value: float
+    labels: list[str]
+
+    def model(self) -> "StaticValue":
+        return _restore(StaticValue, self, value=self.value)
+
+    def value_at(self, time: float) -> float:
+        return self.value
+
+    def integral_at(self, time: float) -> float:
+        return self.value * max(time - self.start, 0.0)
+
+
 class StaticValue(pydantic.BaseModel):
     kind: Literal["static"] = "static"
     value: float
-    labels: list[str]
+    labels: Labels
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+    _runtime: StaticRuntime | None = pydantic.PrivateAttr(default=None)
 
     @pydantic.field_validator("value", mode="before")
     def convert_value(cls, v):
         return parse_size(v)
 
-    def get_value(self) -> float:
+    def get_value(self, offset: float = 0.0) -> float:
         return self.value
 
+    def value_at(self, time: float) -> float:
+        return self.value
+
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        return numpy.full(elapsed.shape, self.value, dtype=numpy.float64)
+
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times)
+
+    def minimum(self) -> float:
+        return self.value
+
+    def compile(self) -> StaticRuntime:
+        if self._runtime is None:
+            self._runtime = StaticRuntime(self._start_time, self.value, self.labels)
+        return self._runtime
+
+    def integral_at(self, time: float) -> float:
+        return self.compile().integral_at(time)
+
+    def get_integrals(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        return self.value * numpy.maximum(elapsed, 0.0)
+
+    def integrals_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_integrals(times - self._start_time)
+
+
+@dataclass(slots=True, frozen=True)
+class RampRuntime:
+    kind: ClassVar[str] = "ramp"
+    start: float
+    period: float
+    peak: float
+    offset: float
+    invert: bool
+    slope: float
+    area: float
+    labels: list[str]
+
+    def model(self) -> "RampValue":
+        return _restore(
+            RampValue,
+            self,
+            period=self.period,
+            peak=self.peak,
+            offset=self.offset,
+            invert=self.invert,
+        )
+
+    def value_at(self, time: float) -> float:
+        value = (time - self.start) % self.period * self.slope
+        if self.invert:
+            value = self.peak - value
+        return value + self.offset
+
+    def integral_at(self, time: float) -> float:
+        periods, progress = divmod(max(time - self.start, 0.0), self.period)
+        partial = self.slope * progress * progress / 2
+        if self.invert:
+            partial = self.peak * progress - partial
+        return periods * self.area + partial + self.offset * progress
+
 
 class RampValue(pydantic.BaseModel):
     kind: Literal["ramp"] = "ramp"
@@ -57,8 +171,9 @@ class RampValue(pydantic.BaseModel):
     peak: int
     offset: int = 0
     invert: bool = False
-    labels: list[str]
-    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: time.monotonic())
+    labels: Labels
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+    _runtime: RampRuntime | None = pydantic.PrivateAttr(default=None)
 
     @pydantic.field_validator("period", mode="before")
     def convert_period(cls, v):
@@ -72,15 +187,95 @@ class RampValue(pydantic.BaseModel):
     def convert_offset(cls, v):
         return int(parse_size(v))
 
-    def get_value(self) -> float:
-        delta = time.monotonic() - self._start_time
-        progress = (delta % self.period) / self.period
-        value = progress * self.peak
+    def get_value(self, offset: float = 0.0) -> float:
+        return self.value_at(clock.clock.now() + offset)
+
+    def value_at(self, time: float) -> float:
+        return self.compile().value_at(time)
+
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        values = (elapsed % self.period) / self.period * self.peak
         if self.invert:
-            value = self.peak - value
+            values = self.peak - values
+        return values + self.offset
+
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times - self._start_time)
+
+    def minimum(self) -> float:
+        return self.offset + min(self.peak, 0)
+
+    def compile(self) -> RampRuntime:
+        if self._runtime is None:
+            self._runtime = RampRuntime(
+                self._start_time,
+                self.period,
+                self.peak,
+                self.offset,
+                self.invert,
+                self.peak / self.period,
+                (self.offset + self.peak / 2) * self.period,
+                self.labels,
+            )
+        return self._runtime
+
+    def integral_at(self, time: float) -> float:
+        return self.compile().integral_at(time)
+
+    def get_integrals(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        periods, progress = numpy.divmod(numpy.maximum(elapsed, 0.0), self.period)
+        partial = self.peak * progress * progress / (2 * self.period)
+        if self.invert:
+            partial = self.peak * progress - partial
+        return (
+            periods * (self.offset + self.peak / 2) * self.period + partial + self.offset * progress
+        )
+
+    def integrals_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_integrals(times - self._start_time)
+
+
+@dataclass(slots=True, frozen=True)
+class SquareRuntime:
+    kind: ClassVar[str] = "square"
+    start: float
+    period: float
+    magnitude: float
+    offset: float
+    invert: bool
+    threshold: float
+    high: float
+    duty_cycle: float
+    labels: list[str]
+
+    def model(self) -> "SquareValue":
+        return _restore(
+            SquareValue,
+            self,
+            period=self.period,
+            magnitude=self.magnitude,
+            offset=self.offset,
+            duty_cycle=self.duty_cycle,
+            invert=self.invert,
+        )
 
+    def value_at(self, time: float) -> float:
+        progress = (time - self.start) % self.period
+        if not self.invert:
+            value = self.magnitude if progress <= self.threshold else 0
+        else:
+            value = 0 if progress < self.threshold else self.magnitude
         return value + self.offset
 
+    def integral_at(self, time: float) -> float:
+        delta = max(time - self.start, 0.0)
+        periods, progress = divmod(delta, self.period)
+        if not self.invert:
+            partial = min(progress, self.threshold)
+        else:
+            partial = max(progress - self.threshold, 0.0)
+        return (periods * self.high + partial) * self.magnitude + self.offset * delta
+
 
 class SquareValue(pydantic.BaseModel):
     kind: Literal["square"] = "square"
@@ -89,8 +284,9 @@ class SquareValue(pydantic.BaseModel):
     offset: int = 0
     duty_cycle: float
     invert: bool = False
-    labels: list[str]
-    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: time.monotonic())
+    labels: Labels
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+    _runtime: SquareRuntime | None = pydantic.PrivateAttr(default=None)
 
     @pydantic.field_validator("period", mode="before")
     def convert_period(cls, v):
@@ -110,15 +306,84 @@ class SquareValue(pydantic.BaseModel):
             raise ValueError("Duty cycle must be between 0 and 100")
         return float(v) / 100
 
-    def get_value(self) -> float:
-        delta = time.monotonic() - self._start_time
-        progress = (delta % self.period) / self.period
+    def get_value(self, offset: float = 0.0) -> float:
+        return self.value_at(clock.clock.now() + offset)
+
+    def value_at(self, time: float) -> float:
+        return self.compile().value_at(time)
+
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        progress = elapsed % self.period
+        threshold = self.duty_cycle * self.period
         if not self.invert:
-            value = self.magnitude if progress <= self.duty_cycle else 0
+            values = numpy.where(progress <= threshold, self.magnitude, 0)
         else:
-            value = 0 if progress < self.duty_cycle else self.magnitude
+            values = numpy.where(progress < threshold, 0, self.magnitude)
+        return values.astype(numpy.float64) + self.offset
 
-        return value + self.offset
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times - self._start_time)
+
+    def minimum(self) -> float:
+        return self.offset + min(self.magnitude, 0)
+
+    def compile(self) -> SquareRuntime:
+        if self._runtime is None:
+            threshold = self.duty_cycle * self.period
+            self._runtime = SquareRuntime(
+                self._start_time,
+                self.period,
+                self.magnitude,
+                self.offset,
+                self.invert,
+                threshold,
+                self.period - threshold if self.invert else threshold,
+                self.duty_cycle,
+                self.labels,
+            )
+        return self._runtime
+
+    def integral_at(self, time: float) -> float:
+        return self.compile().integral_at(time)
+
+    def get_integrals(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        delta = numpy.maximum(elapsed, 0.0)
+        periods, progress = numpy.divmod(delta, self.period)
+        high = self.duty_cycle * self.period
+        if not self.invert:
+            partial = numpy.minimum(progress, high)
+        else:
+            high = self.period - high
+            partial = numpy.maximum(progress - self.duty_cycle * self.period, 0.0)
+        return (periods * high + partial) * self.magnitude + self.offset * delta
+
+    def integrals_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_integrals(times - self._start_time)
+
+
+@dataclass(slots=True, frozen=True)
+class SineRuntime:
+    kind: ClassVar[str] = "sine"
+    start: float
+    period: float
+    amplitude: float
+    offset: float
+    angular: float
+    labels: list[str]
+
+    def model(self) -> "SineValue":
+        return _restore(
+            SineValue, self, period=self.period, amplitude=self.amplitude, offset=self.offset
+        )
+
+    def value_at(self, time: float) -> float:
+        angle = (time - self.start) % self.period * self.angular
+        return math.sin(angle) * self.amplitude + self.offset
+
+    def integral_at(self, time: float) -> float:
+        delta = max(time - self.start, 0.0)
+        wave = 1 - math.cos(delta * self.angular)
+        return self.offset * delta + self.amplitude / self.angular * wave
 
 
 class SineValue(pydantic.BaseModel):
@@ -126,8 +391,9 @@ class SineValue(pydantic.BaseModel):
     period: int
     amplitude: int
     offset: int = 0
-    labels: list[str]
-    __start_time: float = pydantic.PrivateAttr(default_factory=lambda: time.monotonic())
+    labels: Labels
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+    _runtime: SineRuntime | None = pydantic.PrivateAttr(default=None)
 
     @pydantic.field_validator("period", mode="before")
     def convert_period(cls, v):
@@ -141,26 +407,662 @@ class SineValue(pydantic.BaseModel):
     def convert_offset(cls, v):
         return parse_size(v)
 
-    def get_value(self) -> float:
-        delta = time.monotonic() - self.__start_time
-        progress = (delta % self.period) / self.period
+    def get_value(self, offset: float = 0.0) -> float:
+        return self.value_at(clock.clock.now() + offset)
 
-        value = math.sin(progress * math.pi * 2) * self.amplitude
+    def value_at(self, time: float) -> float:
+        return self.compile().value_at(time)
 
-        return value + self.offset
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        progress = (elapsed % self.period) / self.period
+        return numpy.sin(progress * math.pi * 2) * self.amplitude + self.offset
+
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times - self._start_time)
+
+    def minimum(self) -> float:
+        return self.offset - abs(self.amplitude)
+
+    def compile(self) -> SineRuntime:
+        if self._runtime is None:
+            self._runtime = SineRuntime(
+                self._start_time,
+                self.period,
+                self.amplitude,
+                self.offset,
+                2 * math.pi / self.period,
+                self.labels,
+            )
+        return self._runtime
+
+    def integral_at(self, time: float) -> float:
+        return self.compile().integral_at(time)
+
+    def get_integrals(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        delta = numpy.maximum(elapsed, 0.0)
+        wave = 1 - numpy.cos(delta / self.period * math.pi * 2)
+        return self.offset * delta + self.amplitude * self.period / (2 * math.pi) * wave
+
+    def integrals_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_integrals(times - self._start_time)
+
+
+class GaussianStream:
+    """Buffered samples of a gaussian value, shared with its compiled runtime."""
+
+    __slots__ = ("mean", "sigma", "seed", "_rng", "_batch_rng", "_buffer", "_position")
+
+    def __init__(self, mean: float, sigma: float, seed: int | list[int] | None) -> None:
+        self.mean = mean
+        self.sigma = sigma
+        self.seed = seed
+        self._rng: numpy.random.Generator | None = None
+        self._batch_rng: numpy.random.Generator | None = None
+        self._buffer = numpy.empty(0)
+        self._position = 0
+
+    def generator(self) -> numpy.random.Generator:
+        if self._rng is None:
+            self._rng = numpy.random.default_rng(self.seed)
+        return self._rng
+
+    def batch_generator(self) -> numpy.random.Generator:
+        """Generator of batch evaluations, derived from the seed so they never move the
+        samples scrapes draw."""
+        if self._batch_rng is None:
+            self._batch_rng = numpy.random.default_rng(
+                numpy.random.SeedSequence(self.seed).spawn(1)[0]
+            )
+        return self._batch_rng
+
+    def next(self) -> float:
+        position = self._position
+        if position >= len(self._buffer):
+            self._buffer = self.generator().normal(self.mean, self.sigma, GAUSSIAN_BUFFER_SIZE)
+            position = 0
+        self._position = position + 1
+        return float(self._buffer[position])
+
+
+@dataclass(slots=True, frozen=True)
+class GaussianRuntime:
+    kind: ClassVar[str] = "gaussian"
+    start: float
+    mean: float
+    stream: GaussianStream
+    seed: int | None
+    labels: list[str]
+
+    def model(self) -> "GaussianValue":
+        value = _restore(
+            GaussianValue, self, mean=self.mean, sigma=self.stream.sigma, seed=self.seed
+        )
+        value._samples = self.stream
+        return value
+
+    def value_at(self, time: float) -> float:
+        return self.stream.next()
+
+    def integral_at(self, time: float) -> float:
+        return self.mean * max(time - self.start, 0.0)
 
 
 class GaussianValue(pydantic.BaseModel):
     kind: Literal["gaussian"] = "gaussian"
-    mean: int
+    mean: float
+    sigma: float
+    seed: int | None = None
+    labels: Labels
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+    _runtime: GaussianRuntime | None = pydantic.PrivateAttr(default=None)
+    _metric: str = pydantic.PrivateAttr(default="")
+    _samples: GaussianStream | None = pydantic.PrivateAttr(default=None)
+
+    def bind(self, metric: str) -> None:
+        """Draw from the scenario stream of the series ``labels`` of ``metric``."""
+        self._metric = metric
+
+    def samples(self) -> GaussianStream:
+        if self._samples is None:
+            seed: int | list[int] | None = self.seed
+            if seed is None and arguments.seed is not None:
+                # Values without a seed of their own get a stream of the scenario seed,
+                # keyed by their series so it does not depend on what was created before
+                seed = [arguments.seed, key_hash(self._metric, *self.labels)]
+            self._samples = GaussianStream(self.mean, self.sigma, seed)
+        return self._samples
+
+    def get_value(self, offset: float = 0.0) -> float:
+        return self.samples().next()
+
+    def value_at(self, time: float) -> float:
+        return self.get_value()
+
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        return self.samples().batch_generator().normal(self.mean, self.sigma, elapsed.shape)
+
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times)
+
+    # As a counter rate the noise averages out, the counter grows at the mean rate
+
+    def minimum(self) -> float:
+        return self.mean
+
+    def compile(self) -> GaussianRuntime:
+        if self._runtime is None:
+            self._runtime = GaussianRuntime(
+                self._start_time, self.mean, self.samples(), self.seed, self.labels
+            )
+        return self._runtime
+
+    def integral_at(self, time: float) -> float:
+        return self.compile().integral_at(time)
+
+    def get_integrals(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        return self.mean * numpy.maximum(elapsed, 0.0)
+
+    def integrals_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_integrals(times - self._start_time)
+
+
+def recording_path(path: str) -> str:
+    """``path`` resolved in the recordings directory, files outside of it are never opened."""
+    if arguments.recordings_dir is None:
+        raise ValueError("Replay values are disabled, no recordings directory is configured")
+    root = os.path.realpath(arguments.recordings_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Recording {path} is outside of the recordings directory")
+    return resolved
+
+
+def recording(path: str) -> numpy.ndarray:
+    """Memory map of a recorded series, shared by every value replaying ``path``."""
+    key = (arguments.recordings_dir, path)
+    samples = _recordings.get(key)
+    if samples is None:
+        with _recordings_lock:
+            samples = _recordings.get(key)
+            if samples is None:
+                resolved = recording_path(path)
+                try:
+                    samples = numpy.memmap(resolved, dtype="<f8", mode="r")
+                except (OSError, ValueError) as e:
+                    raise ValueError(f"Invalid recording {path}: {e}")
+                _recordings[key] = samples
+    return samples
+
+
+def save_recording(path: str, samples) -> None:
+    numpy.asarray(samples, dtype="<f8").tofile(path)
+
+
+def _following(samples: numpy.ndarray, loop: bool) -> numpy.ndarray:
+    if loop:
+        return numpy.roll(samples, -1)
+    return numpy.concatenate([samples[1:], samples[-1:]])
+
+
+def _cumulative(path: str, mode: str, interpolate: bool) -> numpy.ndarray:
+    # Integral up to every sample, only built when a replay is used as a counter rate
+    key = (arguments.recordings_dir, path, mode, interpolate)
+    cumulative = _cumulatives.get(key)
+    if cumulative is None:
+        samples = numpy.asarray(recording(path), dtype=numpy.float64)
+        if interpolate:
+            samples = (samples + _following(samples, mode == "loop")) / 2
+        cumulative = numpy.concatenate([[0.0], numpy.cumsum(samples)])
+        _cumulatives[key] = cumulative
+    return cumulative
+
+
+@dataclass(slots=True, frozen=True)
+class ReplayRuntime:
+    kind: ClassVar[str] = "replay"
+    start: float
+    path: str
+    samples: numpy.ndarray
+    step: float
+    loop: bool
+    interpolate: bool
+    labels: list[str]
+
+    def __reduce__(self):
+        # The receiver maps the recording again instead of getting a copy of it
+        return _replay_runtime, (
+            self.start,
+            self.path,
+            self.step,
+            self.loop,
+            self.interpolate,
+            self.labels,
+        )
+
+    def model(self) -> "ReplayValue":
+        return _restore(
+            ReplayValue,
+            self,
+            path=self.path,
+            step=self.step,
+            mode="loop" if self.loop else "clamp",
+            interpolate=self.interpolate,
+        )
+
+    def _position(self, delta: float) -> tuple[int, float]:
+        count = len(self.samples)
+        position = delta / self.step
+        if self.loop:
+            position %= count
+        else:
+            position = min(max(position, 0.0), count - 1)
+        # Wrapping tiny negative positions can round up to count
+        return min(int(position), count - 1), position
+
+    def _next(self, index: int) -> float:
+        count = len(self.samples)
+        return float(self.samples[(index + 1) % count if self.loop else min(index + 1, count - 1)])
+
+    def value_at(self, time: float) -> float:
+        index, position = self._position(time - self.start)
+        value = float(self.samples[index])
+        if self.interpolate:
+            value += (self._next(index) - value) * (position - index)
+        return value
+
+    def integral_at(self, time: float) -> float:
+        cumulative = _cumulative(self.path, "loop" if self.loop else "clamp", self.interpolate)
+        count = len(self.samples)
+        position = max(time - self.start, 0.0) / self.step
+        loops = 0.0
+        if self.loop:
+            loops, position = divmod(position, count)
+        index = min(int(position), count - 1)
+        progress = position - index
+        current = float(self.samples[index])
+        partial = current * progress
+        if self.interpolate:
+            partial += (self._next(index) - current) * progress * progress / 2
+        return (loops * cumulative[count] + cumulative[index] + partial) * self.step
+
+
+def _replay_runtime(
+    start: float, path: str, step: float, loop: bool, interpolate: bool, labels: list[str]
+) -> ReplayRuntime:
+    return ReplayRuntime(start, path, recording(path), step, loop, interpolate, labels)
+
+
+class ReplayValue(pydantic.BaseModel):
+    kind: Literal["replay"] = "replay"
+    path: str
+    step: int = 15
+    mode: Literal["loop", "clamp"] = "loop"
+    interpolate: bool = False
+    labels: Labels
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+    _runtime: ReplayRuntime | None = pydantic.PrivateAttr(default=None)
+
+    @pydantic.field_validator("path")
+    def check_path(cls, v):
+        recording(v)
+        return v
+
+    @pydantic.field_validator("step", mode="before")
+    def convert_step(cls, v):
+        return parse_duration(v)
+
+    def get_value(self, offset: float = 0.0) -> float:
+        return self.value_at(clock.clock.now() + offset)
+
+    def value_at(self, time: float) -> float:
+        return self.compile().value_at(time)
+
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        samples = recording(self.path)
+        count = len(samples)
+        position = elapsed / self.step
+        if self.mode == "loop":
+            position %= count
+        else:
+            position = numpy.clip(position, 0.0, count - 1)
+        index = numpy.minimum(position.astype(numpy.int64), count - 1)
+        values = samples[index].astype(numpy.float64)
+        if self.interpolate:
+            if self.mode == "loop":
+                following = (index + 1) % count
+            else:
+                following = numpy.minimum(index + 1, count - 1)
+            values += (samples[following] - values) * (position - index)
+        return values
+
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times - self._start_time)
+
+    def minimum(self) -> float:
+        return float(recording(self.path).min())
+
+    def compile(self) -> ReplayRuntime:
+        if self._runtime is None:
+            self._runtime = ReplayRuntime(
+                self._start_time,
+                self.path,
+                recording(self.path),
+                self.step,
+                self.mode == "loop",
+                self.interpolate,
+                self.labels,
+            )
+        return self._runtime
+
+    def integral_at(self, time: float) -> float:
+        return self.compile().integral_at(time)
+
+    def get_integrals(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        samples = recording(self.path)
+        cumulative = _cumulative(self.path, self.mode, self.interpolate)
+        count = len(samples)
+        position = numpy.maximum(elapsed, 0.0) / self.step
+        loops = numpy.zeros_like(position)
+        if self.mode == "loop":
+            loops, position = numpy.divmod(position, count)
+        index = numpy.minimum(position.astype(numpy.int64), count - 1)
+        progress = position - index
+        current = samples[index]
+        partial = current * progress
+        if self.interpolate:
+            following = _following(samples, self.mode == "loop")[index]
+            partial += (following - current) * progress * progress / 2
+        return (loops * cumulative[count] + cumulative[index] + partial) * self.step
+
+    def integrals_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_integrals(times - self._start_time)
+
+
+def normal_cdf(bounds: numpy.ndarray, mean: float, sigma: float) -> numpy.ndarray:
+    if sigma <= 0:
+        return (bounds >= mean).astype(numpy.float64)
+    scaled = (bounds - mean) / (sigma * math.sqrt(2))
+    return numpy.array([0.5 * (1 + math.erf(value)) for value in scaled.tolist()])
+
+
+@dataclass(slots=True, frozen=True)
+class HistogramRuntime:
+    kind: ClassVar[str] = "histogram"
+    start: float
+    rate: float
+    expected: float
+    distribution: str
+    mean: float
     sigma: float
     labels: list[str]
 
-    def get_value(self) -> float:
-        return random.gauss(self.mean, self.sigma)
+    def model(self) -> "HistogramValue":
+        return _restore(
+            HistogramValue,
+            self,
+            rate=self.rate,
+            distribution=self.distribution,
+            mean=self.mean,
+            sigma=self.sigma,
+        )
 
+    def value_at(self, time: float) -> float:
+        return math.floor(self.rate * max(time - self.start, 0.0))
 
-MetricValue = Annotated[
-    Union[RampValue, SineValue, SquareValue, StaticValue, GaussianValue],
+
+class HistogramValue(pydantic.BaseModel):
+    """Observations made at ``rate`` per second, distributed according to ``distribution``.
+
+    ``lognormal`` takes the ``mean`` and ``sigma`` of the logarithm of the observations,
+    ``exponential`` only uses ``mean``.
+    """
+
+    kind: Literal["histogram"] = "histogram"
+    rate: float
+    distribution: Literal["normal", "lognormal", "exponential"] = "normal"
+    mean: float
+    sigma: float = 0.0
+    labels: Labels
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+    _runtime: HistogramRuntime | None = pydantic.PrivateAttr(default=None)
+
+    @pydantic.field_validator("rate", mode="before")
+    def convert_rate(cls, v):
+        v = parse_size(v)
+        if v < 0:
+            raise ValueError("Histogram rate can not be negative")
+        return v
+
+    @pydantic.model_validator(mode="after")
+    def validate_distribution(self):
+        if self.sigma < 0:
+            raise ValueError("Histogram sigma can not be negative")
+        if self.distribution == "exponential" and self.mean <= 0:
+            raise ValueError("Exponential histogram mean must be positive")
+        return self
+
+    def get_value(self, offset: float = 0.0) -> float:
+        return self.value_at(clock.clock.now() + offset)
+
+    def value_at(self, time: float) -> float:
+        return self.compile().value_at(time)
+
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        return numpy.floor(self.rate * numpy.maximum(elapsed, 0.0))
+
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times - self._start_time)
+
+    def cdf(self, bounds: numpy.ndarray) -> numpy.ndarray:
+        """Share of the observations at or below each bucket bound."""
+        match self.distribution:
+            case "normal":
+                return normal_cdf(bounds, self.mean, self.sigma)
+            case "lognormal":
+                positive = numpy.where(bounds > 0, bounds, 1.0)
+                return numpy.where(
+                    bounds > 0, normal_cdf(numpy.log(positive), self.mean, self.sigma), 0.0
+                )
+            case "exponential":
+                return numpy.where(
+                    bounds > 0, 1 - numpy.exp(-numpy.maximum(bounds, 0.0) / self.mean), 0.0
+                )
+
+    def expected(self) -> float:
+        match self.distribution:
+            case "lognormal":
+                return math.exp(self.mean + self.sigma * self.sigma / 2)
+        return self.mean
+
+    def compile(self) -> HistogramRuntime:
+        if self._runtime is None:
+            self._runtime = HistogramRuntime(
+                self._start_time,
+                self.rate,
+                self.expected(),
+                self.distribution,
+                self.mean,
+                self.sigma,
+                self.labels,
+            )
+        return self._runtime
+
+
+class PluginValue(pydantic.BaseModel):
+    """Base of value kinds registered by plugins.
+
+    A plugin declares ``kind`` as a ``Literal`` with a default, its numeric fields in
+    ``params`` and implements ``evaluate_batch``. Values of one kind are evaluated in a
+    single ``evaluate_batch`` call, one row of ``params`` per value, and stored as their
+    json serialization.
+    """
+
+    kind: str
+    labels: Labels
+    params: ClassVar[tuple[str, ...]] = ()
+    _start_time: float = pydantic.PrivateAttr(default_factory=lambda: clock.clock.origin())
+
+    @pydantic.model_validator(mode="before")
+    @classmethod
+    def validate_kind(cls, data: Any) -> Any:
+        if cls is PluginValue:
+            kind = data.get("kind") if isinstance(data, dict) else None
+            raise ValueError(f"Unknown value kind: {kind}")
+        return data
+
+    @classmethod
+    @abc.abstractmethod
+    def evaluate_batch(cls, params: numpy.ndarray, t: numpy.ndarray) -> numpy.ndarray:
+        """Values at seconds ``t`` since the start, ``t`` has a row per row of ``params``."""
+
+    def parameters(self) -> list[float]:
+        return [float(getattr(self, name)) for name in self.params]
+
+    def get_value(self, offset: float = 0.0) -> float:
+        return self.value_at(clock.clock.now() + offset)
+
+    def value_at(self, time: float) -> float:
+        return float(self.get_values(numpy.array([time - self._start_time]))[0])
+
+    def get_values(self, elapsed: numpy.ndarray) -> numpy.ndarray:
+        return self.evaluate_batch(numpy.array([self.parameters()]), elapsed[None, :])[0]
+
+    def values_at(self, times: numpy.ndarray) -> numpy.ndarray:
+        return self.get_values(times - self._start_time)
+
+    def serialize(self) -> str:
+        return self.model_dump_json(exclude={"kind", "labels"})
+
+
+_plugins: dict[str, type[PluginValue]] = {}
+
+
+def register(model: type[PluginValue]) -> type[PluginValue]:
+    """Register a value kind, usable as a class decorator."""
+    if not (isinstance(model, type) and issubclass(model, PluginValue)):
+        raise TypeError(f"{model} is not a PluginValue")
+    if inspect.isabstract(model):
+        raise TypeError(f"{model.__name__} does not implement evaluate_batch")
+    kind = model.model_fields["kind"].default
+    if not isinstance(kind, str) or kind in BUILTIN_KINDS or kind == "plugin":
+        raise ValueError(f"Invalid value kind for {model.__name__}: {kind}")
+    registered = _plugins.get(kind)
+    if registered is not None and registered is not model:
+        raise ValueError(f"Value kind {kind} is already registered by {registered.__name__}")
+    _plugins[kind] = model
+    return model
+
+
+def plugin(kind: str) -> type[PluginValue] | None:
+    return _plugins.get(kind)
+
+
+def load_plugins() -> None:
+    """Register the value kinds of every installed plugin entry point."""
+    for entry_point in importlib.metadata.entry_points(group=PLUGIN_GROUP):
+        try:
+            register(entry_point.load())
+        except Exception as e:
+            logging.error(f"Failed to load value kind plugin {entry_point.name}: {e}")
+
+
+def _validate_value(value: Any, handler: pydantic.ValidatorFunctionWrapHandler) -> Any:
+    if isinstance(value, dict):
+        model = _plugins.get(value.get("kind"))  # type: ignore[arg-type]
+        if model is not None:
+            return model.model_validate(value)
+    return handler(value)
+
+
+BuiltinValue = Annotated[
+    Union[
+        RampValue,
+        SineValue,
+        SquareValue,
+        StaticValue,
+        GaussianValue,
+        ReplayValue,
+        HistogramValue,
+    ],
     pydantic.Field(discriminator="kind"),
 ]
+
+BUILTIN_KINDS = ("static", "ramp", "square", "sine", "gaussian", "replay", "histogram")
+
+MetricValue = Annotated[
+    Union[BuiltinValue, PluginValue],
+    pydantic.WrapValidator(_validate_value),
+]
+
+
+RateValue = Union[RampValue, SineValue, SquareValue, StaticValue, GaussianValue, ReplayValue]
+
+RateRuntime = Union[
+    RampRuntime, SineRuntime, SquareRuntime, StaticRuntime, GaussianRuntime, ReplayRuntime
+]
+
+# Plugin values are evaluated in batches and used as they are
+Runtime = Union[RateRuntime, HistogramRuntime, PluginValue]
+
+
+def bind(metric: str, values: list[MetricValue]) -> None:
+    for value in values:
+        if isinstance(value, GaussianValue):
+            value.bind(metric)
+
+
+def compile_values(values: list[MetricValue]) -> list[Runtime]:
+    """Validated values as runtime objects for repeated evaluation.
+
+    Metrics keep only the runtimes, values compile once and share them with their own
+    scalar evaluation.
+    """
+    return [value if isinstance(value, PluginValue) else value.compile() for value in values]
+
+
+def restore(runtimes: list[Runtime]) -> list[MetricValue]:
+    """Models of compiled values, built again for the API, persistence and validation."""
+    return [
+        runtime if isinstance(runtime, PluginValue) else runtime.model() for runtime in runtimes
+    ]
+
+
+def evaluate(
+    values: list[MetricValue], times: numpy.ndarray, integrate: bool = False
+) -> numpy.ndarray:
+    """Evaluate every value at every clock time, one row per value.
+
+    With ``integrate`` values are rates and their integral since the start is returned.
+    """
+    result = numpy.empty((len(values), len(times)), dtype=numpy.float64)
+    batches: dict[type[PluginValue], list[int]] = {}
+    for row, value in enumerate(values):
+        if isinstance(value, PluginValue):
+            batches.setdefault(type(value), []).append(row)
+        elif integrate and not isinstance(value, HistogramValue):
+            result[row] = value.integrals_at(times)
+        else:
+            result[row] = value.values_at(times)
+    for model, rows in batches.items():
+        batch = [cast(PluginValue, values[row]) for row in rows]
+        starts = numpy.array([value._start_time for value in batch])
+        params = numpy.array([value.parameters() for value in batch]).reshape(len(batch), -1)
+        result[rows] = model.evaluate_batch(params, times[None, :] - starts[:, None])
+    return result
+
+
+def evaluate_at(runtimes: list[Runtime], time: float) -> list[float]:
+    """Evaluate compiled values at one clock time, plugin kinds in one batch per kind."""
+    result = []
+    plugins: list[MetricValue] = []
+    for runtime in runtimes:
+        if isinstance(runtime, PluginValue):
+            plugins.append(runtime)
+            result.append(0.0)
+        else:
+            result.append(runtime.value_at(time))
+    if plugins:
+        rows = [row for row, runtime in enumerate(runtimes) if isinstance(runtime, PluginValue)]
+        for row, sample in zip(rows, evaluate(plugins, numpy.array([time]))[:, 0].tolist()):
+            result[row] = sample
+    return result
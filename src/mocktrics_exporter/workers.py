@@ -0,0 +1,130 @@
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+from typing import Any, Callable
+
+from mocktrics_exporter import clock, dependencies, exposition
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.valueModels import MetricValue
+
+# Workers are forked so they inherit the already loaded metrics, including the
+# start time of every value, and only need to follow changes made afterwards.
+_context = multiprocessing.get_context("fork")
+
+
+def apply(event: tuple[str, Any], collection=None) -> None:
+    if collection is None:
+        collection = dependencies.metrics_collection
+    action, payload = event
+    match action:
+        case "add_metric":
+            metric, read_only = payload
+            collection.add_metric(metric, read_only=read_only)
+        case "add_metrics":
+            metrics, read_only = payload
+            collection.add_metrics(metrics, read_only=read_only)
+        case "add_metric_value":
+            id, value = payload
+            collection.add_metric_value(id, value)
+        case "delete_metric":
+            # The API process already checked the metric may be removed
+            collection.delete_metric(payload, force=True)
+        case "delete_metric_value":
+            id, labels = payload
+            collection.delete_metric_value(id, labels)
+        case "replace_metric_values":
+            id, removed, added = payload
+            collection.replace_metric_values(id, removed, added)
+        case "set_clock":
+            clock.clock.set_state(payload)
+        case _:
+            raise ValueError(f"Unknown worker event: {action}")
+
+
+def _run(
+    index: int,
+    events: multiprocessing.Queue,
+    port: int,
+    app_factory: Callable[[], Callable],
+    parent: int,
+) -> None:
+
+    # The API process owns persistence and the change feed
+    dependencies.database = None
+    dependencies.workers = None
+
+    exposition.serve(app_factory(), port, reuse_port=True)
+    logging.info(f"Metrics worker {index} serving on port {port}")
+
+    while True:
+        try:
+            event = events.get(timeout=1.0)
+        except queue.Empty:
+            if os.getppid() != parent:
+                return
+            continue
+        if event is None:
+            return
+        try:
+            apply(pickle.loads(event))
+        except Exception as e:
+            logging.error(f"Metrics worker {index} failed to apply change: {e}")
+
+
+class WorkerPool:
+
+    def __init__(self, count: int, port: int, app_factory: Callable[[], Callable]) -> None:
+        if count < 1:
+            raise ValueError("Worker count must be atleast 1")
+        self._queues: list[multiprocessing.Queue] = [_context.Queue() for _ in range(count)]
+        self._processes = [
+            _context.Process(
+                target=_run,
+                args=(index, events, port, app_factory, os.getpid()),
+                name=f"mocktrics-worker-{index}",
+                daemon=True,
+            )
+            for index, events in enumerate(self._queues)
+        ]
+
+    def start(self) -> None:
+        for process in self._processes:
+            process.start()
+
+    def stop(self) -> None:
+        for events in self._queues:
+            events.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+
+    def _publish(self, event: tuple[str, Any]) -> None:
+        # Serialize right away, the queue feeder thread would otherwise pickle the
+        # metric later and could pick up changes made after this event.
+        payload = pickle.dumps(event)
+        for events in self._queues:
+            events.put(payload)
+
+    def add_metric(self, metric: Metric, read_only: bool = False) -> None:
+        self._publish(("add_metric", (metric, read_only)))
+
+    def add_metrics(self, metrics: list[Metric], read_only: bool = False) -> None:
+        self._publish(("add_metrics", (metrics, read_only)))
+
+    def add_metric_value(self, id: str, value: MetricValue) -> None:
+        self._publish(("add_metric_value", (id, value)))
+
+    def delete_metric(self, id: str) -> None:
+        self._publish(("delete_metric", id))
+
+    def delete_metric_value(self, id: str, labels: list[str]) -> None:
+        self._publish(("delete_metric_value", (id, labels)))
+
+    def replace_metric_values(
+        self, id: str, removed: list[list[str]], added: list[MetricValue]
+    ) -> None:
+        self._publish(("replace_metric_values", (id, removed, added)))
+
+    def set_clock(self, state: tuple[float, float, float | None]) -> None:
+        self._publish(("set_clock", state))
@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from mocktrics_exporter import api, metaMetrics
+
+
+@pytest.fixture
+def client():
+    with TestClient(api.create_app()) as client:
+        yield client
+
+
+def _count(method: str, route: str, status: str) -> float:
+    labels = {"method": method, "route": route, "status": status}
+    for family in metaMetrics.metrics.api_request_duration.collect():
+        for sample in family.samples:
+            if sample.name.endswith("_count") and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+def test_request_metrics(client: TestClient, base_metric):
+    base_metric["values"] = [{"kind": "static", "value": 1, "labels": ["a"]}]
+    assert client.post("/metric", json=base_metric).status_code == 201
+    value = {"kind": "static", "value": 2, "labels": ["b"]}
+    assert client.post("/metric/metric/value", json=value).status_code == 201
+    assert client.post("/metric/other/value", json=value).status_code == 404
+    assert client.get("/unknown").status_code == 404
+    assert client.request("BREW", "/metric").status_code == 405
+
+    meta = metaMetrics.metrics
+    assert _count("POST", "/metric", "201") == 1
+    assert _count("POST", "/metric/{id}/value", "201") == 1
+    assert _count("POST", "/metric/{id}/value", "404") == 1
+    assert _count("GET", "unmatched", "404") == 1
+    assert _count("other", "/metric", "405") == 1
+    assert meta.api_request_bytes.labels("POST", "/metric")._sum.get() == len(
+        client.build_request("POST", "/metric", json=base_metric).read()
+    )
+    assert meta.api_response_bytes.labels("POST", "/metric")._sum.get() > 0
+    assert metaMetrics.Metrics.get_value(meta.api_requests_in_flight) == 0
+
+
+def test_own_metrics(client: TestClient, base_metric):
+    base_metric["values"] = [{"kind": "static", "value": 1, "labels": ["a"]}]
+    assert client.post("/metric", json=base_metric).status_code == 201
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert "mocktrics_exporter_api_requests_in_flight 1.0" in lines
+    assert "mocktrics_exporter_metrics_created_total 1.0" in lines
+    assert any(line.startswith("mocktrics_exporter_api_request_duration_seconds") for line in lines)
+    # Served metrics are left to the metrics port
+    assert not any(line.startswith("metric") for line in lines)
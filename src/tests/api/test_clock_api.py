@@ -0,0 +1,61 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mocktrics_exporter import api, clock
+from mocktrics_exporter.clock import Clock
+
+
+@pytest.fixture(scope="function", autouse=True)
+def client(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(time, "monotonic", lambda: 100.0)
+    monkeypatch.setattr(clock, "clock", Clock(epoch=0))
+    with TestClient(api.create_app()) as client:
+        yield client
+
+
+def test_get_clock(client: TestClient):
+    response = client.get("/clock")
+    assert response.status_code == 200
+    assert response.json() == {"time": 0, "speed": 1, "paused": False, "epoch": 0}
+
+
+def test_pause_resume_clock(client: TestClient):
+    response = client.post("/clock/pause")
+    assert response.status_code == 200
+    assert response.json()["paused"] is True
+    response = client.post("/clock/resume")
+    assert response.json()["paused"] is False
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        ({"time": 3600}, 3600),
+        ({"time": "1970-01-02T00:00:00"}, 86400),
+        ({"advance": "1h"}, 3600),
+    ],
+)
+def test_seek_clock(client: TestClient, body: dict, expected: float):
+    response = client.post("/clock/seek", json=body)
+    assert response.status_code == 200
+    assert response.json()["time"] == expected
+
+
+@pytest.mark.parametrize(
+    "body",
+    [{}, {"time": 10, "advance": "1h"}, {"advance": "soon"}, {"time": "yesterday"}],
+)
+def test_seek_clock_invalid(client: TestClient, body: dict):
+    response = client.post("/clock/seek", json=body)
+    assert response.status_code == 400
+
+
+def test_set_clock_speed(client: TestClient):
+    response = client.post("/clock/speed", json={"speed": 3600})
+    assert response.status_code == 200
+    assert response.json()["speed"] == 3600
+
+    response = client.post("/clock/speed", json={"speed": 0})
+    assert response.status_code == 400
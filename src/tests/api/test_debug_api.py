@@ -0,0 +1,95 @@
+import marshal
+import threading
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mocktrics_exporter import api, valueModels
+
+
+@pytest.fixture
+def client():
+    with TestClient(api.create_app(debug=True)) as client:
+        yield client
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,))
+    thread.start()
+    yield
+    stop.set()
+    thread.join()
+
+
+def test_disabled():
+    with TestClient(api.create_app()) as client:
+        assert client.get("/debug/profile", params={"seconds": 0.01}).status_code == 404
+
+
+def test_profile_text(client: TestClient, busy):
+    response = client.get("/debug/profile", params={"seconds": 0.2})
+
+    assert response.status_code == 200
+    assert "busy_loop" in response.text
+    assert "cumulative" in response.text
+
+
+def test_profile_collapsed(client: TestClient, busy):
+    response = client.get("/debug/profile", params={"seconds": 0.2, "format": "collapsed"})
+
+    stacks = [line.rsplit(" ", 1) for line in response.text.splitlines()]
+    assert any("busy_loop (test_debug_api.py:" in stack for stack, _ in stacks)
+    assert all(int(count) > 0 for _, count in stacks)
+
+
+def test_profile_pstats(client: TestClient, busy):
+    response = client.get("/debug/profile", params={"seconds": 0.2, "format": "pstats"})
+
+    stats = marshal.loads(response.content)
+    assert any(name == "busy_loop" for _, _, name in stats)
+
+
+def test_profile_invalid(client: TestClient):
+    assert client.get("/debug/profile", params={"seconds": 0}).status_code == 422
+
+
+def test_heap(client: TestClient):
+    tracemalloc.start(5)
+    try:
+        values = [valueModels.StaticValue(value=n, labels=[str(n)]) for n in range(1000)]
+        response = client.get("/debug/heap", params={"limit": 100})
+    finally:
+        tracemalloc.stop()
+
+    heap = response.json()
+    assert heap["since_startup"]
+    assert heap["traced"] > 0
+    modules = {group["module"] for group in heap["modules"]}
+    assert "mocktrics_exporter.valueModels" in modules
+    assert len(values) == 1000
+
+
+def test_stats(client: TestClient, base_metric):
+    for name, count in (("first", 1), ("second", 3)):
+        base_metric["name"] = name
+        base_metric["values"] = [
+            {"kind": "static", "value": n, "labels": [str(n)]} for n in range(count)
+        ]
+        assert client.post("/metric", json=base_metric).status_code == 201
+
+    response = client.get("/debug/stats", params={"top": 1, "sort": "series"})
+
+    stats = response.json()
+    assert stats["totals"]["series"] == 4
+    assert stats["totals"]["metrics"] == 2
+    assert [entry["name"] for entry in stats["top"]] == ["second"]
+    assert {entry["name"] for entry in stats["metrics"]} == {"first", "second"}
+    assert all(entry["payload_bytes"] > 0 for entry in stats["metrics"])
@@ -14,7 +14,7 @@ def test_delete_metric():
 
     dependencies.metrics_collection.add_metric(metric)
 
-    client = TestClient(api.api)
+    client = TestClient(api.create_app())
     response = client.delete(
         "/metric/test",
         headers={
@@ -28,7 +28,7 @@ def test_delete_metric():
 
 def test_delete_metric_nonexisting():
 
-    client = TestClient(api.api)
+    client = TestClient(api.create_app())
     response = client.delete(
         "/metric/test",
         headers={
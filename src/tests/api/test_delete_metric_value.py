@@ -1,12 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from mocktrics_exporter import api, dependencies, metrics, valueModels
+from mocktrics_exporter import api, dependencies, metaMetrics, metrics, valueModels
 
 
 @pytest.fixture(scope="function", autouse=True)
 def client():
-    with TestClient(api.api) as client:
+    with TestClient(api.create_app()) as client:
         yield client
 
 
@@ -102,3 +102,30 @@ def test_delete_nonexisting_metric(client: TestClient):
 
     assert response.status_code == 404
     assert len(dependencies.metrics_collection.get_metrics()) == 0
+
+
+def test_delete_value_persisted(client: TestClient, monkeypatch, base_metric):
+
+    class Database:
+        def __init__(self):
+            self.deleted: list[tuple[str, list[str]]] = []
+
+        def get_metrics(self):
+            return []
+
+        def add_metric(self, metric):
+            pass
+
+        def delete_metric_value(self, metric, value):
+            self.deleted.append((metric.name, value.labels))
+
+    database = Database()
+    monkeypatch.setattr(dependencies, "database", database)
+    base_metric.update({"values": [valueModels.StaticValue(value=0, labels=["static"])]})
+    dependencies.metrics_collection.add_metric(metrics.Metric(**base_metric))
+
+    response = client.delete("/metric/metric/value?labels=static")
+
+    assert response.status_code == 200
+    assert database.deleted == [("metric", ["static"])]
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.shard_series) == 0
@@ -6,7 +6,7 @@ from mocktrics_exporter import api, dependencies, metrics, valueModels
 
 @pytest.fixture(scope="function", autouse=True)
 def client():
-    with TestClient(api.api) as client:
+    with TestClient(api.create_app()) as client:
         yield client
 
 
@@ -0,0 +1,85 @@
+import numpy
+import pytest
+from fastapi.testclient import TestClient
+
+from mocktrics_exporter import api, dependencies, metrics
+from mocktrics_exporter.valueModels import RampValue, StaticValue
+
+
+@pytest.fixture(scope="function", autouse=True)
+def client():
+    with TestClient(api.create_app()) as client:
+        yield client
+
+
+@pytest.fixture
+def metric() -> metrics.Metric:
+    metric = metrics.Metric(
+        name="test",
+        labels=["type"],
+        documentation="documentation for test metric",
+        values=[
+            StaticValue(value=5, labels=["static"]),
+            RampValue(period=60, peak=60, labels=["ramp"]),
+        ],
+    )
+    dependencies.metrics_collection.add_metric(metric)
+    return metric
+
+
+def test_get_metric_series(client: TestClient, metric: metrics.Metric):
+
+    response = client.get("/metric/test/series", params={"start": 1000, "end": 1060, "step": 15})
+    assert response.status_code == 200
+
+    content = response.json()
+    assert content["name"] == "test"
+    assert content["step"] == 15
+    assert content["timestamps"] == [1000, 1015, 1030, 1045, 1060]
+    assert [series["labels"] for series in content["series"]] == [
+        {"type": "static"},
+        {"type": "ramp"},
+    ]
+    assert content["series"][0]["values"] == [5, 5, 5, 5, 5]
+
+    ramp = content["series"][1]["values"]
+    assert all(0 <= value < 60 for value in ramp)
+    # One period of a ramp is evenly spaced, wrapping once
+    steps = numpy.diff(ramp) % 60
+    assert steps == pytest.approx([15, 15, 15, 15])
+
+
+def test_get_metric_series_binary(client: TestClient, metric: metrics.Metric):
+
+    response = client.get(
+        "/metric/test/series",
+        params={"start": 1000, "end": 1060, "step": "15s", "format": "binary"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-mocktrics-series"] == "2"
+    assert response.headers["x-mocktrics-points"] == "5"
+
+    values = numpy.frombuffer(response.content, dtype="<f8").reshape(2, 5)
+    assert values[0].tolist() == [5, 5, 5, 5, 5]
+
+
+def test_get_metric_series_nonexisting(client: TestClient):
+
+    response = client.get("/metric/test/series", params={"start": "-1h"})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"start": "yesterday"},
+        {"start": 1000, "end": 900},
+        {"start": 1000, "end": 2000, "step": "0"},
+        {"start": 0, "end": 10**9, "step": "1s"},
+    ],
+)
+def test_get_metric_series_invalid(client: TestClient, metric: metrics.Metric, params: dict):
+
+    response = client.get("/metric/test/series", params=params)
+    assert response.status_code == 400
@@ -2,11 +2,13 @@ import pytest
 from fastapi.testclient import TestClient
 
 from mocktrics_exporter import api, dependencies
+from mocktrics_exporter.arguments import arguments
+from mocktrics_exporter.sharding import Sharding
 
 
 @pytest.fixture(scope="function", autouse=True)
 def client():
-    with TestClient(api.api) as client:
+    with TestClient(api.create_app()) as client:
         yield client
 
 
@@ -113,3 +115,79 @@ def test_metric_duplicate_value(client: TestClient):
     )
     assert response.status_code == 409
     assert len(dependencies.metrics_collection.get_metrics()) == 1
+
+
+def test_metric_histogram(client: TestClient):
+
+    response = client.post(
+        "/metric",
+        json={
+            "name": "latency",
+            "documentation": "",
+            "labels": ["type"],
+            "type": "histogram",
+            "buckets": [0.1, 1],
+            "values": [{"kind": "histogram", "labels": ["a"], "rate": 10, "mean": 0.5}],
+        },
+    )
+    assert response.status_code == 201
+    metric = dependencies.metrics_collection.get_metric("latency")
+    assert metric.type == "histogram"
+    assert metric.buckets == [0.1, 1.0]
+
+
+def test_metric_type_mismatch(client: TestClient):
+
+    response = client.post(
+        "/metric",
+        json={
+            "name": "requests",
+            "documentation": "",
+            "labels": ["type"],
+            "type": "counter",
+            "values": [{"kind": "static", "labels": ["a"], "value": -1}],
+        },
+    )
+    assert response.status_code == 400
+    assert len(dependencies.metrics_collection.get_metrics()) == 0
+
+
+def test_metric_replay_outside_recordings_dir(client: TestClient, tmp_path, monkeypatch):
+
+    secret = tmp_path / "secret.txt"
+    secret.write_bytes(b"SECRET!!")
+    recordings = tmp_path / "recordings"
+    recordings.mkdir()
+    monkeypatch.setattr(arguments, "recordings_dir", str(recordings))
+
+    response = client.post(
+        "/metric",
+        json={
+            "name": "leak",
+            "documentation": "documentation for test metric",
+            "labels": ["type"],
+            "values": [{"kind": "replay", "labels": ["replay"], "path": str(secret)}],
+        },
+    )
+    assert response.status_code == 422
+    assert "SECRET" not in response.text
+    assert len(dependencies.metrics_collection.get_metrics()) == 0
+
+
+def test_metric_other_shard(client: TestClient, monkeypatch):
+
+    sharding = Sharding(0, 2, "metric")
+    monkeypatch.setattr(dependencies, "sharding", sharding)
+    name = next(f"metric_{index}" for index in range(20) if sharding.shard(f"metric_{index}"))
+    metric = {
+        "name": name,
+        "documentation": "documentation for test metric",
+        "labels": ["type"],
+        "values": [{"kind": "static", "labels": ["static"], "value": 0}],
+    }
+
+    for _ in range(2):
+        response = client.post("/metric", json=metric)
+        assert response.status_code == 421
+        assert "shard 1" in response.json()["error"]
+    assert client.get(f"/metric/{name}").status_code == 404
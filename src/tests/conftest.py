@@ -23,6 +23,7 @@ def registry_mock(monkeypatch: pytest.MonkeyPatch):
 @pytest.fixture(autouse=True, scope="function")
 def clear_metrics(monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setattr(mocktrics_exporter.dependencies.metrics_collection, "_metrics", [])
+    monkeypatch.setattr(mocktrics_exporter.dependencies.metrics_collection, "_series", 0)
 
 
 @pytest.fixture
@@ -0,0 +1,195 @@
+import io
+
+import pytest
+
+from mocktrics_exporter import backfill, configuration, valueModels
+from mocktrics_exporter.arguments import arguments
+from mocktrics_exporter.valueModels import HistogramValue, RampValue, StaticValue
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("now", 1000.0),
+        ("-10s", 990.0),
+        ("-1m", 940.0),
+        ("1700000000", 1700000000.0),
+        ("1700000000.5", 1700000000.5),
+        ("2023-11-14T22:13:20", 1700000000.0),
+        ("2023-11-14T22:13:20+01:00", 1699996400.0),
+        ("2023-11-14T22:13:20Z", 1700000000.0),
+    ],
+)
+def test_parse_timestamp(value, expected):
+    assert backfill.parse_timestamp(value, now=1000.0) == expected
+
+
+@pytest.mark.parametrize("value, expected", [("15", 15), ("15s", 15), ("2m", 120)])
+def test_parse_step(value, expected):
+    assert backfill.parse_step(value) == expected
+
+
+@pytest.fixture
+def families() -> list[backfill.Family]:
+    return [
+        backfill.Family(
+            "requests",
+            "documentation",
+            "",
+            ["type"],
+            [
+                StaticValue(value=1, labels=["static"]),
+                RampValue(period=40, peak=40, labels=['ra"mp']),
+            ],
+        ),
+        backfill.Family(
+            "latency", "documentation", "seconds", ["type"], [StaticValue(value=2, labels=["a"])]
+        ),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 10000])
+def test_generate(families, chunk_size):
+    output = io.StringIO()
+
+    backfill.write(output, families, 100, 130, 10, chunk_size=chunk_size)
+
+    assert output.getvalue() == (
+        "# HELP requests documentation\n"
+        "# TYPE requests gauge\n"
+        'requests{type="static"} 1.0 100.0\n'
+        'requests{type="static"} 1.0 110.0\n'
+        'requests{type="static"} 1.0 120.0\n'
+        'requests{type="static"} 1.0 130.0\n'
+        'requests{type="ra\\"mp"} 0.0 100.0\n'
+        'requests{type="ra\\"mp"} 10.0 110.0\n'
+        'requests{type="ra\\"mp"} 20.0 120.0\n'
+        'requests{type="ra\\"mp"} 30.0 130.0\n'
+        "# HELP latency_seconds documentation\n"
+        "# TYPE latency_seconds gauge\n"
+        "# UNIT latency_seconds seconds\n"
+        'latency_seconds{type="a"} 2.0 100.0\n'
+        'latency_seconds{type="a"} 2.0 110.0\n'
+        'latency_seconds{type="a"} 2.0 120.0\n'
+        'latency_seconds{type="a"} 2.0 130.0\n'
+        "# EOF\n"
+    )
+
+
+def test_generate_disable_units(monkeypatch, families):
+    monkeypatch.setattr(configuration.configuration, "disable_units", True)
+
+    output = "".join(backfill.generate(families[1:], 100, 100, 10))
+
+    assert "latency_seconds" not in output
+    assert "# UNIT" not in output
+
+
+@pytest.mark.parametrize("start, end, step", [(100, 90, 10), (100, 200, 0)])
+def test_generate_invalid_range(families, start, end, step):
+    with pytest.raises(ValueError):
+        list(backfill.generate(families, start, end, step))
+
+
+def test_main(monkeypatch, tmp_path, families):
+    monkeypatch.setattr(backfill, "families", lambda: families)
+    path = tmp_path / "backfill.om"
+
+    backfill.main(["--start", "100", "--end", "130", "--step", "10s", "-o", str(path)])
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2 + 4 + 4 + 3 + 4 + 1
+    assert lines[-1] == "# EOF"
+
+
+def test_main_config_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(configuration, "configuration", configuration.Configuration())
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "metrics:\n"
+        "  - name: temperature\n"
+        "    documentation: Room temperature\n"
+        "    labels: [room]\n"
+        "    values: [{kind: static, value: 21, labels: [kitchen]}]\n"
+    )
+    path = tmp_path / "backfill.om"
+
+    backfill.main(["-f", str(config), "--start", "100", "--end", "110", "-o", str(path)])
+
+    assert path.read_text().splitlines()[2:4] == [
+        'temperature{room="kitchen"} 21.0 100.0',
+        "# EOF",
+    ]
+
+
+def test_main_recordings_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(configuration, "configuration", configuration.Configuration())
+    monkeypatch.setattr(arguments, "recordings_dir", None)
+    monkeypatch.setattr(arguments, "seed", None)
+    valueModels.save_recording(str(tmp_path / "backfill-replay.f64"), [1.0, 4.0])
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "metrics:\n"
+        "  - name: replayed\n"
+        "    documentation: Replayed series\n"
+        "    labels: [source]\n"
+        "    values: [{kind: replay, path: backfill-replay.f64, step: 10, labels: [a]}]\n"
+    )
+    path = tmp_path / "backfill.om"
+
+    backfill.main(
+        ["-f", str(config), "--recordings-dir", str(tmp_path), "--seed", "7"]
+        + ["--start", "0", "--end", "10", "--step", "10s", "-o", str(path)]
+    )
+
+    assert (arguments.recordings_dir, arguments.seed) == (str(tmp_path), 7)
+    assert path.read_text().splitlines()[2:5] == [
+        'replayed{source="a"} 1.0 0.0',
+        'replayed{source="a"} 4.0 10.0',
+        "# EOF",
+    ]
+
+
+def test_generate_counter():
+    family = backfill.Family(
+        "requests_total", "", "", ["type"], [StaticValue(value=2, labels=["a"])], "counter"
+    )
+
+    output = "".join(backfill.generate([family], 100, 120, 10))
+
+    assert output == (
+        "# HELP requests \n"
+        "# TYPE requests counter\n"
+        'requests_total{type="a"} 0.0 100.0\n'
+        'requests_total{type="a"} 20.0 110.0\n'
+        'requests_total{type="a"} 40.0 120.0\n'
+        "# EOF\n"
+    )
+
+
+def test_generate_histogram():
+    family = backfill.Family(
+        "latency",
+        "",
+        "",
+        ["type"],
+        [HistogramValue(rate=10, mean=1, sigma=1, labels=["a"])],
+        "histogram",
+        [1.0],
+    )
+
+    output = "".join(backfill.generate([family], 100, 110, 10))
+
+    assert output == (
+        "# HELP latency \n"
+        "# TYPE latency histogram\n"
+        'latency_bucket{type="a",le="1.0"} 0.0 100.0\n'
+        'latency_bucket{type="a",le="1.0"} 50.0 110.0\n'
+        'latency_bucket{type="a",le="+Inf"} 0.0 100.0\n'
+        'latency_bucket{type="a",le="+Inf"} 100.0 110.0\n'
+        'latency_count{type="a"} 0.0 100.0\n'
+        'latency_count{type="a"} 100.0 110.0\n'
+        'latency_sum{type="a"} 0.0 100.0\n'
+        'latency_sum{type="a"} 100.0 110.0\n'
+        "# EOF\n"
+    )
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from mocktrics_exporter import benchScrape, exposition
+
+
+@pytest.fixture
+def config(tmp_path) -> str:
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "metrics:\n"
+        "  - name: bench\n"
+        "    documentation: bench\n"
+        "    labels: [series]\n"
+        "    values:\n"
+        "      - kind: static\n        value: 1\n        labels: [a]\n"
+        "      - kind: sine\n        period: 60\n        amplitude: 1\n        offset: 1\n"
+        "        labels: [b]\n"
+    )
+    return str(path)
+
+
+@pytest.fixture
+def url(config):
+    server = benchScrape.serve(config, 0.1)
+    yield f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    server.shutdown()
+    server.server_close()
+
+
+def test_count_samples():
+    payload = (
+        b"# HELP bench bench\n"
+        b"# TYPE bench gauge\n"
+        b'bench{series="a"} 1.0\n'
+        b'bench{series="b"} 2.0\n'
+        b"# TYPE mocktrics_exporter_scrape_series gauge\n"
+        b"mocktrics_exporter_scrape_series 2.0\n"
+    )
+    assert benchScrape.count_samples(payload) == 2
+    assert benchScrape.count_samples(payload + b"# EOF\n") == 2
+    assert benchScrape.count_samples(b'bench{series="a"} 1.0') == 1
+    assert benchScrape.count_samples(b"") == 0
+
+
+@pytest.mark.parametrize("format", [exposition.TEXT, exposition.OPENMETRICS])
+@pytest.mark.parametrize("compress", [False, True])
+def test_run(url, format, compress):
+    result = benchScrape.run(url, 3, 0.1, 0.5, format, compress)
+
+    assert result.failed == 0
+    assert result.expected_samples == 2
+    assert result.mismatched == 0
+    report = result.to_dict()
+    assert report["scrapes"] >= 3
+    assert 0 < report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert report["bytes_per_scrape"] > 0
+    if compress:
+        assert report["wire_bytes_per_scrape"] < report["bytes_per_scrape"]
+    else:
+        assert report["wire_bytes_per_scrape"] == report["bytes_per_scrape"]
+
+
+def test_run_mismatch(url):
+    result = benchScrape.run(url, 1, 0.1, 0.3, expected_samples=3)
+
+    assert result.mismatched == len(result.latencies) > 0
+
+
+def test_run_unreachable():
+    result = benchScrape.run("http://127.0.0.1:1/metrics", 2, 0.1, 0.3, timeout=0.5)
+
+    assert result.failed > 0
+    assert result.latencies == []
+    assert result.to_dict()["latency_ms"]["p99"] == 0
+
+
+def test_run_invalid():
+    with pytest.raises(ValueError):
+        benchScrape.run("localhost:8000", 1, 1, 1)
+    with pytest.raises(ValueError):
+        benchScrape.run("http://localhost:8000/metrics", 0, 1, 1)
+
+
+def test_main(config, capsys):
+    benchScrape.main(
+        ["-f", config, "-n", "2", "--interval", "0.1", "--duration", "0.3", "--gzip", "--json"]
+    )
+
+    result = json.loads(capsys.readouterr().out)
+    assert result["failed"] == 0
+    assert result["expected_samples"] == 2
+
+
+def test_main_exits_on_mismatch(config, capsys):
+    with pytest.raises(SystemExit) as exited:
+        benchScrape.main(
+            [
+                "-f",
+                config,
+                "-n",
+                "1",
+                "--interval",
+                "0.1",
+                "--duration",
+                "0.2",
+                "--expect-samples",
+                "3",
+            ]
+        )
+
+    assert exited.value.code == 1
+    assert "mismatched" in capsys.readouterr().out
@@ -0,0 +1,166 @@
+import time
+
+import numpy
+import pytest
+
+from mocktrics_exporter import clock, metrics
+from mocktrics_exporter.clock import Clock, parse_epoch
+from mocktrics_exporter.valueModels import RampValue
+
+
+class MonotonicMock:
+
+    def __init__(self):
+        self.time = 1000.0
+
+    def monotonic(self) -> float:
+        return self.time
+
+
+@pytest.fixture
+def monotonic(monkeypatch: pytest.MonkeyPatch) -> MonotonicMock:
+    mock = MonotonicMock()
+    monkeypatch.setattr(time, "monotonic", mock.monotonic)
+    return mock
+
+
+def test_clock_default(monotonic: MonotonicMock):
+    assert Clock().now() == monotonic.time
+
+
+def test_clock_speed(monotonic: MonotonicMock):
+    c = Clock(speed=3600, epoch=0)
+    assert c.now() == 0
+    monotonic.time += 2
+    assert c.now() == 7200
+
+
+def test_clock_to_unix(monkeypatch, monotonic: MonotonicMock):
+    monkeypatch.setattr(time, "time", lambda: 1_700_000_000.0)
+    c = Clock(speed=60, epoch=1_600_000_000)
+    assert c.to_unix(c.now()) == 1_700_000_000.0
+    assert c.to_unix(c.now() - 600) == 1_699_999_990.0
+    c.pause()
+    assert c.to_unix(c.now() - 600) == 1_700_000_000.0
+
+
+@pytest.mark.parametrize("speed, epoch", [(1, None), (60, None), (60, 1_600_000_000.0)])
+def test_clock_to_unix_round_trip(monkeypatch, monotonic: MonotonicMock, speed, epoch):
+    monkeypatch.setattr(time, "time", lambda: 1_700_000_000.0 + monotonic.time)
+    c = Clock(speed=speed, epoch=epoch)
+    monotonic.time += 3600
+    c.seek(c.now() + 86400)
+    moments = numpy.array([c.now() - 300, c.now()])
+
+    unix = numpy.array([c.to_unix(moment) for moment in moments])
+
+    assert c.from_unix(unix).tolist() == pytest.approx(moments.tolist())
+    assert unix[-1] == time.time()
+
+
+def test_clock_set_speed_is_continuous(monotonic: MonotonicMock):
+    c = Clock(epoch=0)
+    monotonic.time += 10
+    c.set_speed(60)
+    assert c.now() == 10
+    monotonic.time += 1
+    assert c.now() == 70
+
+
+def test_clock_pause_resume(monotonic: MonotonicMock):
+    c = Clock(speed=2, epoch=0)
+    monotonic.time += 5
+    c.pause()
+    assert c.paused
+    monotonic.time += 100
+    assert c.now() == 10
+    c.resume()
+    monotonic.time += 5
+    assert c.now() == 20
+
+
+def test_clock_seek_advance(monotonic: MonotonicMock):
+    c = Clock(epoch=0)
+    c.seek(500)
+    assert c.now() == 500
+    c.advance(100)
+    assert c.now() == 600
+    c.pause()
+    c.seek(10)
+    c.advance(5)
+    assert c.now() == 15
+
+
+def test_clock_frozen(monotonic: MonotonicMock):
+    c = Clock()
+    with c.frozen() as now:
+        monotonic.time += 10
+        assert c.now() == now
+        with c.frozen() as nested:
+            assert nested == now
+    assert c.now() == monotonic.time
+
+
+def test_clock_origin(monotonic: MonotonicMock):
+    assert Clock(epoch=1700000000).origin() == 1700000000
+    assert Clock().origin() == monotonic.time
+
+
+def test_clock_invalid_speed():
+    with pytest.raises(ValueError):
+        Clock(speed=0)
+    with pytest.raises(ValueError):
+        Clock().set_speed(-1)
+
+
+def test_clock_from_unix(monkeypatch: pytest.MonkeyPatch, monotonic: MonotonicMock):
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    c = Clock(speed=10, epoch=0)
+    assert c.from_unix(numpy.array([990.0, 1000.0])).tolist() == [-100, 0]
+    c.pause()
+    assert c.from_unix(numpy.array([990.0, 1000.0])).tolist() == [0, 0]
+
+
+def test_clock_state(monotonic: MonotonicMock):
+    c = Clock(speed=3, epoch=10)
+    other = Clock()
+    other.set_state(c.state())
+    assert other.now() == c.now()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1700000000", 1700000000),
+        (12.5, 12.5),
+        ("2024-01-01T00:00:00", 1704067200),
+        ("2024-01-01T01:00:00+01:00", 1704067200),
+    ],
+)
+def test_parse_epoch(value, expected):
+    assert parse_epoch(value) == expected
+
+
+def test_value_models_follow_clock(monkeypatch: pytest.MonkeyPatch, monotonic: MonotonicMock):
+    monkeypatch.setattr(clock, "clock", Clock(speed=60, epoch=0))
+    ramp = RampValue(period=3600, peak=3600, labels=[])
+    monotonic.time += 30
+    assert ramp.get_value() == 1800
+    clock.clock.pause()
+    monotonic.time += 30
+    assert ramp.get_value() == 1800
+
+
+def test_collector_reads_clock_once(monkeypatch: pytest.MonkeyPatch, monotonic: MonotonicMock):
+    calls: list[None] = []
+
+    def monotonic_counter() -> float:
+        calls.append(None)
+        return monotonic.time
+
+    metric = metrics.Metric(
+        "test", [RampValue(period=10, peak=10, labels=[str(i)]) for i in range(5)], "doc", ["n"]
+    )
+    monkeypatch.setattr(time, "monotonic", monotonic_counter)
+    list(metric.Collector(metric).collect())
+    assert len(calls) == 1
@@ -0,0 +1,111 @@
+import gzip
+import io
+
+import pytest
+
+from mocktrics_exporter import clone
+from mocktrics_exporter.valueModels import GaussianValue, StaticValue
+
+EXPOSITION = """\
+# HELP http_requests_total Total requests.
+# TYPE http_requests_total counter
+http_requests_total{method="GET",code="200"} 1027 1395066363000
+http_requests_total{method="POST",code="200"} 3
+http_requests_total{method="GET"} 5
+# HELP request_duration_seconds Request \\"duration\\".\\nIn seconds.
+# TYPE request_duration_seconds histogram
+# UNIT request_duration_seconds seconds
+request_duration_seconds_bucket{le="0.1"} 1 # {trace_id="abc"} 0.05 123
+request_duration_seconds_bucket{le="+Inf"} 2
+request_duration_seconds_sum 0.3
+request_duration_seconds_count 2
+process_start_time_seconds 1.7e9
+invalid:recording_rule{job="a"} 1
+weird_labels{path="/a,b=\\"c\\"}", empty=""} NaN
+# EOF
+"""
+
+
+def test_parse_sample():
+    assert clone.parse_sample('metric{a="1",b="x\\\\y"} 2.5 1000') == (
+        "metric",
+        (("a", "1"), ("b", "x\\y")),
+        2.5,
+    )
+    assert clone.parse_sample("metric +Inf") == ("metric", (), float("inf"))
+
+
+@pytest.mark.parametrize("line", ["{a=1} 1", 'metric{a="1" 1', "metric"])
+def test_parse_sample_invalid(line):
+    with pytest.raises((ValueError, IndexError)):
+        clone.parse_sample(line)
+
+
+def test_parse():
+    series = {s.name: s for s in clone.parse(io.StringIO(EXPOSITION))}
+
+    assert list(series) == [
+        "http_requests_total",
+        "request_duration_seconds_bucket",
+        "request_duration_seconds_sum",
+        "request_duration_seconds_count",
+        "process_start_time_seconds",
+        "invalid:recording_rule",
+        "weird_labels",
+    ]
+    assert series["http_requests_total"].documentation == "Total requests."
+    assert list(series["http_requests_total"].labels) == ["method", "code"]
+    assert series["request_duration_seconds_sum"].documentation == (
+        'Request "duration".\nIn seconds.'
+    )
+    assert series["request_duration_seconds_sum"].unit == "seconds"
+    assert series["process_start_time_seconds"].documentation == ""
+    assert series["weird_labels"].samples.keys() == {(("path", '/a,b="c"}'), ("empty", ""))}
+
+
+def test_load():
+    metrics = {metric.name: metric for metric in clone.load(io.StringIO(EXPOSITION))}
+
+    assert "invalid:recording_rule" not in metrics
+
+    requests = metrics["http_requests_total"]
+    assert requests.labels == ["method", "code"]
+    assert [value.labels for value in requests.values] == [
+        ["GET", "200"],
+        ["POST", "200"],
+        ["GET", ""],
+    ]
+    assert all(isinstance(value, StaticValue) for value in requests.values)
+    assert [value.get_value() for value in requests.values] == [1027, 3, 5]
+
+    assert metrics["request_duration_seconds_sum"].documentation == (
+        'Request "duration". In seconds.'
+    )
+    assert metrics["request_duration_seconds_sum"].unit == ""
+    assert metrics["process_start_time_seconds"].labels == [clone.EMPTY_LABEL]
+    assert metrics["process_start_time_seconds"].values[0].labels == [""]
+
+
+def test_load_noise():
+    metrics = {metric.name: metric for metric in clone.load(io.StringIO(EXPOSITION), 0.1)}
+
+    value = metrics["http_requests_total"].values[0]
+    assert isinstance(value, GaussianValue)
+    assert value.mean == 1027
+    assert value.sigma == pytest.approx(102.7)
+    # NaN has no scale for relative noise and stays static
+    assert isinstance(metrics["weird_labels"].values[0], StaticValue)
+
+
+def test_load_ungrouped():
+    exposition = 'a{x="1"} 1\nb{x="1"} 2\na{x="2"} 3\n'
+    assert [metric.name for metric in clone.load(io.StringIO(exposition))] == ["a", "b"]
+
+
+def test_open_exposition(tmp_path):
+    path = tmp_path / "metrics.txt.gz"
+    with gzip.open(path, "wt") as file:
+        file.write(EXPOSITION)
+
+    with clone.open_exposition(str(path)) as file:
+        assert len(list(clone.load(file))) == 6
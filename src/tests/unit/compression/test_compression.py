@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from mocktrics_exporter import compression
+
+
+@pytest.fixture(autouse=True)
+def pure_python(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(compression, "_snappy", None)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"a",
+        b"abcd" * 1000,
+        b"x" * 300000,
+        os.urandom(70000),
+        b"".join(b'metric{label="value_%d"} 1\n' % index for index in range(10000)),
+    ],
+)
+def test_snappy_roundtrip(data):
+    assert compression.snappy_decompress(compression.snappy_compress(data)) == data
+
+
+def test_snappy_compresses():
+    data = b"abcd" * 1000
+    assert len(compression.snappy_compress(data)) < len(data) / 10
+
+
+def test_snappy_known_encoding():
+    # Preamble with the length, a 4 byte literal and a 1 byte offset copy of 8 bytes
+    assert compression.snappy_compress(b"abcd" * 3) == b"\x0c\x0cabcd\x11\x04"
+    assert compression.snappy_decompress(b"\x0c\x0cabcd\x11\x04") == b"abcd" * 3
+
+
+def test_snappy_invalid_offset():
+    with pytest.raises(ValueError):
+        compression.snappy_decompress(b"\x08\x11\x04")
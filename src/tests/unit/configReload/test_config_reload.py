@@ -0,0 +1,171 @@
+import json
+import time
+
+import pytest
+
+from mocktrics_exporter import configuration, dependencies, metaMetrics
+from mocktrics_exporter.configReload import ConfigReloader
+from mocktrics_exporter.metrics import Metric
+
+
+def _metric(name: str, values: dict[str, float], **fields) -> dict:
+    return {
+        "name": name,
+        "documentation": f"{name} documentation",
+        "labels": ["type"],
+        "values": [
+            {"kind": "static", "value": value, "labels": [label]} for label, value in values.items()
+        ],
+        **fields,
+    }
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(configuration, "configuration", configuration.Configuration())
+    path = tmp_path / "config.json"
+
+    def write(*metrics: dict, **settings) -> str:
+        path.write_text(json.dumps({**settings, "metrics": list(metrics)}))
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def reloader(config) -> ConfigReloader:
+    path = config(_metric("first", {"a": 1, "b": 2}), _metric("second", {"a": 3}))
+    reloader = ConfigReloader(path, dependencies.metrics_collection)
+    reloader.load()
+    return reloader
+
+
+def _values(name: str) -> dict[str, float]:
+    metric = dependencies.metrics_collection.get_metric(name)
+    return {value.labels[0]: value.value for value in metric.values}  # type: ignore[union-attr]
+
+
+def _failures() -> float:
+    return metaMetrics.metrics.config_reloads.labels("failure")._value.get()
+
+
+def test_load(reloader):
+    assert [metric.name for metric in dependencies.metrics_collection.get_metrics()] == [
+        "first",
+        "second",
+    ]
+    assert all(entry.read_only for entry in dependencies.metrics_collection._metrics)
+    assert [metric.name for metric in configuration.configuration.metrics] == ["first", "second"]
+
+
+def test_reload_unchanged(reloader):
+    metric = dependencies.metrics_collection.get_metric("first")
+    runtimes = list(metric.runtimes())
+
+    assert reloader.reload()
+
+    assert dependencies.metrics_collection.get_metric("first") is metric
+    assert all(a is b for a, b in zip(metric.runtimes(), runtimes))
+
+
+def test_reload_values(config, reloader):
+    metric = dependencies.metrics_collection.get_metric("first")
+    kept = metric.runtimes()[0]
+
+    config(_metric("first", {"a": 1, "b": 5, "c": 6}), _metric("second", {"a": 3}))
+    assert reloader.reload()
+
+    assert dependencies.metrics_collection.get_metric("first") is metric
+    assert metric.runtimes()[0] is kept
+    assert _values("first") == {"a": 1, "b": 5, "c": 6}
+
+    config(_metric("first", {"c": 6}), _metric("second", {"a": 3}))
+    assert reloader.reload()
+
+    assert _values("first") == {"c": 6}
+
+
+def test_reload_metrics(config, reloader):
+    second = dependencies.metrics_collection.get_metric("second")
+
+    config(
+        _metric("first", {"a": 1, "b": 2}, documentation="changed"),
+        _metric("third", {"a": 4}),
+    )
+    assert reloader.reload()
+
+    assert [metric.name for metric in dependencies.metrics_collection.get_metrics()] == [
+        "first",
+        "third",
+    ]
+    assert dependencies.metrics_collection.get_metric("first").documentation == "changed"
+    assert second not in dependencies.metrics_collection.get_metrics()
+    assert [metric.name for metric in configuration.configuration.metrics] == ["first", "third"]
+    assert len(list(Metric._registry.collect())) == 2
+
+
+@pytest.mark.parametrize(
+    "metrics",
+    [
+        [_metric("first", {"a": 1, "b": 2}), {"name": "second", "values": []}],
+        [_metric("first", {"a": 1}), _metric("first", {"b": 1})],
+        [_metric("first", {"a": 1, "b": 2}), _metric("second", {"a": 1}, type="counter")]
+        + [_metric("first_total", {"a": -1}, type="counter")],
+        [_metric("first", {"a": 1, "b": 2}), _metric("api", {"a": 1})],
+    ],
+)
+def test_reload_invalid(config, reloader, base_metric, metrics):
+    base_metric.update({"name": "api", "labels": ["type"]})
+    dependencies.metrics_collection.add_metric(Metric(**base_metric))
+    before = {name: _values(name) for name in ("first", "second")}
+
+    config(*metrics)
+    assert not reloader.reload()
+
+    assert {name: _values(name) for name in ("first", "second")} == before
+    assert _failures() == 1
+
+
+def test_reload_interval(config, reloader):
+    reloader.interval = 0.01
+    reloader.start()
+    try:
+        config(_metric("first", {"a": 7}), _metric("second", {"a": 3}))
+        deadline = time.monotonic() + 5
+        while _values("first") != {"a": 7} and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        reloader.stop()
+
+    assert _values("first") == {"a": 7}
+
+
+def test_trigger(config, reloader):
+    reloader.start()
+    try:
+        config(_metric("first", {"a": 8}), _metric("second", {"a": 3}))
+        reloader.trigger()
+        deadline = time.monotonic() + 5
+        while _values("first") != {"a": 8} and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        reloader.stop()
+
+    assert _values("first") == {"a": 8}
+
+
+def test_reload_include(tmp_path, config, reloader):
+    config(_metric("first", {"a": 1, "b": 2}), _metric("second", {"a": 3}), include="*.yaml")
+    included = tmp_path / "more.yaml"
+    included.write_text(json.dumps({"metrics": [_metric("third", {"a": 4})]}))
+    assert reloader.reload()
+    stat = reloader._stat
+
+    assert _values("third") == {"a": 4}
+    assert configuration.configuration.include == ["*.yaml"]
+
+    included.write_text(json.dumps({"metrics": [_metric("third", {"a": 5, "b": 6})]}))
+    assert reloader._file_stat() != stat
+    assert reloader.reload()
+
+    assert _values("third") == {"a": 5, "b": 6}
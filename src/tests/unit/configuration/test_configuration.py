@@ -0,0 +1,188 @@
+import json
+
+import pytest
+
+from mocktrics_exporter import configuration, valueModels
+
+
+def test_load(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "disable_units: true\n"
+        "metrics:\n"
+        "  - name: temperature\n"
+        "    documentation: Room temperature\n"
+        "    labels: [room]\n"
+        "    values:\n"
+        "      - kind: static\n"
+        "        value: 21\n"
+        "        labels: [kitchen]\n"
+    )
+
+    loaded = configuration.load(str(path))
+
+    assert loaded.disable_units
+    assert [metric.name for metric in loaded.metrics] == ["temperature"]
+    assert isinstance(loaded.metrics[0].values[0], valueModels.StaticValue)
+
+
+def test_load_empty(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("")
+
+    assert configuration.load(str(path)) == configuration.Configuration()
+
+
+DOCUMENT = {
+    "metrics": [
+        {
+            "name": "temperature",
+            "documentation": "Room temperature",
+            "labels": ["room"],
+            "values": [{"kind": "sine", "period": "1m", "amplitude": 2, "labels": ["kitchen"]}],
+        }
+    ]
+}
+
+
+def test_load_json(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(DOCUMENT))
+
+    loaded = configuration.load(str(path))
+
+    assert loaded.metrics[0].values[0].period == 60  # type: ignore[union-attr]
+
+
+def test_load_msgpack(tmp_path):
+    msgpack = pytest.importorskip("msgpack")
+    path = tmp_path / "config.msgpack"
+    path.write_bytes(msgpack.packb(DOCUMENT))
+
+    loaded = configuration.load(str(path))
+
+    assert [metric.name for metric in loaded.metrics] == ["temperature"]
+
+
+def test_load_cache(monkeypatch, tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(DOCUMENT))
+    cache = tmp_path / "cache"
+    first = configuration.load(str(path), str(cache))
+
+    def parse(path, data):
+        raise AssertionError("Cached configuration parsed again")
+
+    monkeypatch.setattr(configuration, "parse", parse)
+    second = configuration.load(str(path), str(cache))
+
+    assert second.model_dump() == first.model_dump()
+    assert len(list(cache.iterdir())) == 1
+
+    path.write_text(json.dumps({"disable_units": True}))
+    with pytest.raises(AssertionError):
+        configuration.load(str(path), str(cache))
+
+
+def test_load_cache_unreadable(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(DOCUMENT))
+    cache = tmp_path / "cache"
+    configuration.load(str(path), str(cache))
+    for entry in cache.iterdir():
+        entry.write_bytes(b"garbage")
+
+    loaded = configuration.load(str(path), str(cache))
+
+    assert [metric.name for metric in loaded.metrics] == ["temperature"]
+
+
+def test_load_cache_not_json(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("metrics: []\n1: integer key\n")
+    cache = tmp_path / "cache"
+
+    assert configuration.read(str(path), str(cache)) == {"metrics": [], 1: "integer key"}
+    assert not cache.exists() or list(cache.iterdir()) == []
+
+
+def _metric(name):
+    return {"name": name, "documentation": name, "labels": [], "values": []}
+
+
+def _write(path, metrics, **settings):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({**settings, "metrics": [_metric(name) for name in metrics]}))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_load_include(tmp_path, processes):
+    _write(tmp_path / "config.json", ["main"], include=["metrics/*.json", "nested/**/*.json"])
+    _write(tmp_path / "metrics" / "b.json", ["b"])
+    _write(tmp_path / "metrics" / "a.json", ["a1", "a2"])
+    _write(tmp_path / "nested" / "deep" / "c.json", ["c"])
+
+    loaded = configuration.load(str(tmp_path / "config.json"), processes=processes)
+
+    assert [metric.name for metric in loaded.metrics] == ["main", "a1", "a2", "b", "c"]
+    assert loaded.include == ["metrics/*.json", "nested/**/*.json"]
+
+
+def test_load_include_spawns(monkeypatch, tmp_path):
+    contexts = []
+    executor = configuration.concurrent.futures.ProcessPoolExecutor
+
+    def spawned(*args, **kwargs):
+        contexts.append(kwargs["mp_context"].get_start_method())
+        return executor(*args, **kwargs)
+
+    monkeypatch.setattr(configuration.concurrent.futures, "ProcessPoolExecutor", spawned)
+    _write(tmp_path / "config.json", ["main"], include="metrics/*.json")
+    _write(tmp_path / "metrics" / "a.json", ["a"])
+    _write(tmp_path / "metrics" / "b.json", ["b"])
+
+    configuration.load(str(tmp_path / "config.json"), processes=2)
+
+    assert contexts == ["spawn"]
+
+
+def test_load_include_glob(tmp_path):
+    _write(tmp_path / "config.json", ["main"], include="*.json")
+    _write(tmp_path / "other.json", ["other"])
+
+    loaded = configuration.load(str(tmp_path / "config.json"))
+
+    assert [metric.name for metric in loaded.metrics] == ["main", "other"]
+
+
+def test_load_include_duplicate(tmp_path):
+    _write(tmp_path / "config.json", ["main"], include="metrics/*.json")
+    _write(tmp_path / "metrics" / "a.json", ["shared"])
+    _write(tmp_path / "metrics" / "b.json", ["shared"])
+
+    with pytest.raises(ValueError, match="shared is defined in both .*a.json and .*b.json"):
+        configuration.load(str(tmp_path / "config.json"), processes=1)
+
+
+def test_load_include_settings(tmp_path):
+    _write(tmp_path / "config.json", ["main"], include="metrics/*.json")
+    _write(tmp_path / "metrics" / "a.json", ["a"], disable_units=True)
+
+    with pytest.raises(ValueError, match="a.json can only define metrics"):
+        configuration.load(str(tmp_path / "config.json"))
+
+
+def test_load_include_cache(monkeypatch, tmp_path):
+    _write(tmp_path / "config.json", ["main"], include="metrics/*.json")
+    _write(tmp_path / "metrics" / "a.json", ["a"])
+    cache = tmp_path / "cache"
+    configuration.load(str(tmp_path / "config.json"), str(cache), processes=1)
+
+    def parse(path, data):
+        raise AssertionError("Cached configuration parsed again")
+
+    monkeypatch.setattr(configuration, "parse", parse)
+    loaded = configuration.load(str(tmp_path / "config.json"), str(cache), processes=1)
+
+    assert [metric.name for metric in loaded.metrics] == ["main", "a"]
+    assert len(list(cache.iterdir())) == 2
@@ -0,0 +1,193 @@
+import gzip
+
+import pytest
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Enum,
+    Gauge,
+    Histogram,
+    Info,
+    generate_latest,
+)
+
+from mocktrics_exporter import clock, exposition, metaMetrics
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.valueModels import HistogramValue, SineValue, StaticValue
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, exposition.TEXT),
+        ("", exposition.TEXT),
+        ("text/plain", exposition.TEXT),
+        ("application/json", exposition.TEXT),
+        ("application/openmetrics-text; version=1.0.0", exposition.OPENMETRICS),
+        (
+            "application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;"
+            "encoding=delimited;q=0.7,application/openmetrics-text;version=1.0.0;q=0.5,"
+            "text/plain;version=0.0.4;q=0.3,*/*;q=0.2",
+            exposition.PROTOBUF,
+        ),
+        (
+            "application/vnd.google.protobuf;proto=io.prometheus.client.MetricFamily;"
+            "encoding=text,text/plain;q=0.5",
+            exposition.TEXT,
+        ),
+        ("text/plain;q=0.9,application/openmetrics-text;q=1", exposition.OPENMETRICS),
+    ],
+)
+def test_negotiate(accept, expected):
+    assert exposition.negotiate(accept) == expected
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, False),
+        ("identity", False),
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("gzip;q=0", False),
+    ],
+)
+def test_gzip_accepted(accept_encoding, expected):
+    assert exposition.gzip_accepted(accept_encoding) == expected
+
+
+class CountingFormat:
+
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, registry):
+        self.renders += 1
+        return b"payload %d" % self.renders
+
+
+def test_cache_reuses_payload_within_bucket(monkeypatch):
+    counting = CountingFormat()
+    format = exposition.Format("counting", "text/plain", counting.render)
+    now = [100.0]
+    monkeypatch.setattr(exposition.time, "monotonic", lambda: now[0])
+
+    cache = exposition.ExpositionCache(CollectorRegistry(), interval=10)
+
+    assert cache.get(format) == b"payload 1"
+    assert cache.get(format) == b"payload 1"
+    assert gzip.decompress(cache.get(format, compress=True)) == b"payload 1"
+    assert counting.renders == 1
+
+    now[0] = 110.0
+    assert cache.get(format) == b"payload 2"
+    assert counting.renders == 2
+
+
+def test_cache_evict(monkeypatch):
+    format = exposition.Format("counting", "text/plain", CountingFormat().render)
+    now = [100.0]
+    monkeypatch.setattr(exposition.time, "monotonic", lambda: now[0])
+    cache = exposition.ExpositionCache(CollectorRegistry(), interval=10)
+    cache.get(format, compress=True)
+
+    assert cache.evict()
+    now[0] = 110.0
+    assert not cache.evict()
+    assert cache._entries == {}
+
+
+def test_cache_disabled(monkeypatch):
+    counting = CountingFormat()
+    format = exposition.Format("counting", "text/plain", counting.render)
+
+    cache = exposition.ExpositionCache(CollectorRegistry(), interval=0)
+    cache.get(format)
+    cache.get(format)
+
+    assert counting.renders == 2
+
+
+def test_wsgi_app():
+    registry = CollectorRegistry()
+    Gauge("test_gauge", "documentation", registry=registry).set(1)
+    app = exposition.make_wsgi_app(exposition.ExpositionCache(registry, interval=0))
+
+    responses = []
+    body = app(
+        {
+            "PATH_INFO": "/metrics",
+            "REQUEST_METHOD": "GET",
+            "HTTP_ACCEPT": "application/openmetrics-text",
+            "HTTP_ACCEPT_ENCODING": "gzip",
+        },
+        lambda status, headers: responses.append((status, dict(headers))),
+    )
+
+    status, headers = responses[0]
+    assert status == "200 OK"
+    assert headers["Content-Type"] == exposition.OPENMETRICS.content_type
+    assert headers["Content-Encoding"] == "gzip"
+    payload = gzip.decompress(b"".join(body)).decode()
+    assert "test_gauge 1.0" in payload
+    assert payload.endswith("# EOF\n")
+
+
+def test_generate_text_matches_prometheus_client():
+    registry = CollectorRegistry()
+    Gauge("plain", "no labels", registry=registry).set(1.5)
+    gauge = Gauge(
+        "labelled", 'help with \\ and\nnewline "quotes"', ["pod", "path"], registry=registry
+    )
+    gauge.labels("pod-1", 'C:\\temp\n"x"').set(2)
+    gauge.labels("pod-2", "").set(float("nan"))
+    Counter("requests", "counter", ["code"], registry=registry).labels("200").inc(3)
+    Histogram("latency", "histogram", registry=registry, buckets=[0.1, 1]).observe(0.5)
+    Info("build", "info", registry=registry).info({"version": "1.0"})
+    Enum("state", "stateset", states=["a", "b"], registry=registry).state("b")
+    metric = Metric(
+        "mocktrics",
+        [HistogramValue(rate=1, mean=1, labels=["a"])],
+        "documentation",
+        ["invalid-label"],
+        type="histogram",
+        registry=registry,
+    )
+    metric.register()
+
+    with clock.clock.frozen():
+        assert exposition.generate_text(registry) == generate_latest(registry)
+
+
+def test_cache_meta_metrics(monkeypatch):
+    registry = CollectorRegistry()
+    Metric(
+        "sines",
+        [SineValue(period=60, amplitude=1, labels=[str(n)]) for n in range(3)],
+        labels=["n"],
+        registry=registry,
+    ).register()
+    Metric(
+        "mixed",
+        [StaticValue(value=1, labels=["a"]), SineValue(period=60, amplitude=1, labels=["b"])],
+        labels=["n"],
+        registry=registry,
+    ).register()
+    monkeypatch.setattr(exposition.time, "monotonic", lambda: 100.0)
+    cache = exposition.ExpositionCache(registry, interval=10)
+
+    payload = cache.get(exposition.TEXT)
+    cache.get(exposition.TEXT)
+    cache.get(exposition.TEXT, compress=True)
+
+    meta = metaMetrics.metrics
+    assert meta.scrape_payload_bytes.labels("text")._sum.get() == len(payload)
+    assert meta.scrape_duration.labels("text")._sum.get() > 0
+    assert meta.scrape_evaluation_duration.labels("sine")._sum.get() > 0
+    assert meta.scrape_evaluation_duration.labels("mixed")._sum.get() > 0
+    assert metaMetrics.Metrics.get_value(meta.scrape_series) == 5
+    assert meta.scrape_kind_series.labels("sine")._value.get() == 3
+    assert meta.scrape_kind_series.labels("mixed")._value.get() == 2
+    assert meta.scrape_cache_requests.labels("hit")._value.get() == 1
+    assert meta.scrape_cache_requests.labels("miss")._value.get() == 2
+    assert metaMetrics.Metrics.get_value(meta.scrape_cache_hit_ratio) == pytest.approx(1 / 3)
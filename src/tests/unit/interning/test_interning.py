@@ -0,0 +1,79 @@
+import sys
+
+import pytest
+
+from mocktrics_exporter import interning
+from mocktrics_exporter.valueModels import StaticValue
+
+
+def fresh(value: str) -> str:
+    # Equal strings built at runtime are distinct objects
+    return "".join(list(value))
+
+
+def test_intern():
+    first = interning.intern(fresh("test-interning-pod"))
+    _, _, saved = interning.stats()
+
+    second = fresh("test-interning-pod")
+    assert second is not first
+    assert interning.intern(second) is first
+    assert interning.stats()[2] == saved + sys.getsizeof(second)
+
+
+def test_intern_interned():
+    first = interning.intern(fresh("test-interning-node"))
+    before = interning.stats()
+
+    for _ in range(5):
+        assert interning.intern(first) is first
+    assert interning.stats() == before
+
+
+def test_value_labels_interned():
+    first = StaticValue(value=1, labels=[fresh("test-interning-a"), fresh("test-interning-b")])
+    second = StaticValue(value=2, labels=[fresh("test-interning-a"), fresh("test-interning-b")])
+
+    assert all(a is b for a, b in zip(first.labels, second.labels))
+
+
+@pytest.mark.parametrize(
+    "name, value, expected",
+    [
+        ("pod", "pod-1", 'pod="pod-1"'),
+        ("path", 'C:\\temp\n"x"', 'path="C:\\\\temp\\n\\"x\\""'),
+        ("invalid-name", "a", 'invalid_name="a"'),
+    ],
+)
+def test_pair(name, value, expected):
+    assert interning.pair(name, value) == expected
+    assert interning.pair(name, value) is interning.pair(name, value)
+
+
+@pytest.mark.parametrize("name, expected", [("metric", "metric"), ("metric.dot", "metric_dot")])
+def test_metric_name(name, expected):
+    assert interning.metric_name(name) == expected
+
+
+def test_sweep():
+    kept = interning.intern(fresh("test-interning-kept"))
+    interning.intern(fresh("test-interning-dropped"))
+    interning.pair(kept, "test-interning-pair")
+    strings, size, _ = interning.stats()
+
+    assert interning.sweep() >= 2
+    assert interning.stats()[0] <= strings - 2
+    assert interning.stats()[1] < size
+    assert interning.intern(fresh("test-interning-kept")) is kept
+    assert interning._pairs == {}
+
+
+def test_sweep_when_grown(monkeypatch):
+    strings = interning.stats()[0]
+    monkeypatch.setattr(interning, "SWEEP_MINIMUM", strings + 10)
+    monkeypatch.setattr(interning, "_sweep_at", strings + 10)
+    for n in range(100):
+        interning.intern(fresh(f"test-interning-churn-{n}"))
+
+    assert interning.stats()[0] <= 2 * (strings + 10)
+    assert "test-interning-churn-0" not in interning._strings
@@ -0,0 +1,123 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from mocktrics_exporter import (
+    api,
+    arguments,
+    clock,
+    configReload,
+    dependencies,
+    main,
+    remoteWrite,
+    workers,
+)
+
+_SRC = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+
+@pytest.fixture
+def restore_arguments():
+    saved = vars(arguments.arguments).copy()
+    yield arguments.arguments
+    vars(arguments.arguments).clear()
+    vars(arguments.arguments).update(saved)
+
+
+def test_import_has_no_side_effects(tmp_path):
+    script = (
+        "import json, sys\n"
+        "import prometheus_client\n"
+        "from mocktrics_exporter import main\n"
+        "from mocktrics_exporter import clock, configuration, dependencies\n"
+        "print(json.dumps({\n"
+        "    'modules': [name for name in ('fastapi', 'uvicorn', 'yaml') if name in sys.modules],\n"
+        "    'persistence_path': main.arguments.persistence_path,\n"
+        "    'database': dependencies.database is not None,\n"
+        "    'metrics': len(configuration.configuration.metrics),\n"
+        "    'speed': clock.clock.speed,\n"
+        "    'registered': [name for name in prometheus_client.REGISTRY._names_to_collectors\n"
+        "                   if name.startswith('mocktrics_exporter')],\n"
+        "}))\n"
+    )
+    database = tmp_path / "database.db"
+    result = subprocess.run(
+        [sys.executable, "-c", script, "-p", str(database), "-f", "missing.yaml"]
+        + ["--clock-speed", "5"],
+        env={**os.environ, "PYTHONPATH": _SRC},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert json.loads(result.stdout) == {
+        "modules": [],
+        "persistence_path": None,
+        "database": False,
+        "metrics": 0,
+        "speed": 1.0,
+        "registered": [],
+    }
+    assert not database.exists()
+
+
+def test_parse_arguments(restore_arguments):
+    parsed = arguments.parse_arguments(["-p", "metrics.db", "--clock-speed", "60", "--unknown"])
+
+    assert parsed is arguments.arguments
+    assert parsed.persistence_path == "metrics.db"
+    assert parsed.clock_speed == 60
+    assert parsed.api_port == 8080
+
+
+def test_create_app():
+    first, second = api.create_app(), api.create_app()
+
+    assert first is not second
+    for app in (first, second):
+        with TestClient(app) as client:
+            assert client.get("/healthz").json() == {"status": "ok"}
+            assert client.get("/metric/all/").status_code == 404
+
+
+def test_workers_forked_before_threads(monkeypatch, restore_arguments, tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("metrics: []\n")
+    started: list[str] = []
+
+    class WorkerPool:
+        def __init__(self, *args):
+            pass
+
+        def start(self):
+            started.append("workers")
+
+    async def serve(self):
+        pass
+
+    for module, name in [(clock, "clock"), (dependencies, "sharding"), (dependencies, "workers")]:
+        monkeypatch.setattr(module, name, getattr(module, name))
+    monkeypatch.setattr(main.signal, "signal", lambda *args: None)
+    monkeypatch.setattr(workers, "WorkerPool", WorkerPool)
+    monkeypatch.setattr(
+        configReload.ConfigReloader, "start", lambda self: started.append("reloader")
+    )
+    monkeypatch.setattr(
+        remoteWrite.RemoteWriter, "start", lambda self: started.append("remote_write")
+    )
+    monkeypatch.setattr(uvicorn.Server, "serve", serve)
+    monkeypatch.setattr(
+        main.sys,
+        "argv",
+        ["mocktrics-exporter", "-f", str(config), "--workers", "1"]
+        + ["--remote-write-url", "http://127.0.0.1:1/api/v1/write"],
+    )
+
+    main.main()
+
+    assert started == ["workers", "reloader", "remote_write"]
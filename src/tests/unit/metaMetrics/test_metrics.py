@@ -60,3 +60,15 @@ def test_metric_deleted(base_metric):
     dependencies.metrics_collection.delete_metric(m.name)
 
     assert pytest.approx(metaMetrics.Metrics.get_value(metaMetrics.metrics.metric_deleted)) == 1.0
+
+
+def test_label_intern():
+    strings = metaMetrics.Metrics.get_value(metaMetrics.metrics.label_intern_strings)
+    saved = metaMetrics.Metrics.get_value(metaMetrics.metrics.label_intern_bytes_saved)
+
+    metrics.Metric("intern", [], labels=["".join(["intern", "_test_label"])])
+    metrics.Metric("intern", [], labels=["".join(["intern", "_test_label"])])
+
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.label_intern_strings) == strings + 1
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.label_intern_bytes_saved) > saved
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.label_intern_bytes) > 0
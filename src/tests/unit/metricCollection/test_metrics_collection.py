@@ -1,7 +1,9 @@
 import pytest
 
+from mocktrics_exporter import metaMetrics
 from mocktrics_exporter.metricCollection import MetricsCollection
 from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.valueModels import StaticValue
 
 
 def test_add_metric(base_metric):
@@ -71,6 +73,10 @@ def test_delete_metric_read_only(base_metric):
 
     assert len(collection._metrics) == 1
 
+    collection.delete_metric(metric.name, force=True)
+
+    assert collection._metrics == []
+
 
 def test_delete_unregister(monkeypatch, base_metric):
 
@@ -83,3 +89,92 @@ def test_delete_unregister(monkeypatch, base_metric):
 
     with pytest.raises(Exception):
         collection.delete_metric(metric.name)
+
+
+def test_add_metrics(base_metric):
+
+    metrics = []
+    for name in ["metric1", "metric2", "metric3"]:
+        base_metric.update({"name": name})
+        metrics.append(Metric(**base_metric))
+
+    collection = MetricsCollection()
+    assert collection.add_metrics(metrics, read_only=True) == ["metric1", "metric2", "metric3"]
+
+    assert collection.get_metrics() == metrics
+    assert all(metric.read_only for metric in collection._metrics)
+
+
+def test_add_metrics_duplicate(base_metric):
+
+    collection = MetricsCollection()
+    collection.add_metric(Metric(**base_metric))
+
+    with pytest.raises(KeyError):
+        collection.add_metrics([Metric(**base_metric)])
+
+    assert len(collection._metrics) == 1
+
+
+def test_replace_metric_values(base_metric):
+    base_metric.update(
+        {"values": [StaticValue(value=1, labels=["a"]), StaticValue(value=2, labels=["b"])]}
+    )
+    metric = Metric(**base_metric)
+    kept = metric.runtimes()[1]
+    collection = MetricsCollection()
+    collection.add_metric(metric, read_only=True)
+
+    collection.replace_metric_values(metric.name, [["a"]], [StaticValue(value=3, labels=["c"])])
+
+    assert [value.labels for value in metric.values] == [["b"], ["c"]]
+    assert metric.runtimes()[0] is kept
+
+    with pytest.raises(Metric.DuplicateValueLabelsetException):
+        collection.replace_metric_values(metric.name, [], [StaticValue(value=4, labels=["b"])])
+    assert [value.labels for value in metric.values] == [["b"], ["c"]]
+
+
+def test_runtimes_follow_replaced_values(base_metric):
+    base_metric.update({"values": [StaticValue(value=1, labels=["a"])]})
+    metric = Metric(**base_metric)
+    collection = MetricsCollection()
+    collection.add_metric(metric)
+
+    for value in range(10, 110):
+        metric.runtimes()
+        collection.delete_metric_value(metric.name, ["a"])
+        # A new value can reuse the id of the deleted one
+        collection.add_metric_value(metric.name, StaticValue(value=value, labels=["a"]))
+        assert [runtime.value_at(0) for runtime in metric.runtimes()] == [value]
+
+    collection.replace_metric_values(metric.name, [["a"]], [StaticValue(value=1, labels=["a"])])
+    assert [runtime.value_at(0) for runtime in metric.runtimes()] == [1]
+
+
+def test_series_count(base_metric):
+    base_metric.update({"values": [StaticValue(value=1, labels=["a"])]})
+    collection = MetricsCollection()
+
+    def series():
+        return metaMetrics.Metrics.get_value(metaMetrics.metrics.shard_series)
+
+    collection.add_metric(Metric(**base_metric))
+    collection.add_metrics([Metric(**{**base_metric, "name": "other"})])
+    assert series() == 2
+
+    collection.add_metric_value("metric", StaticValue(value=2, labels=["b"]))
+    assert series() == 3
+
+    collection.replace_metric_values(
+        "metric",
+        [["a"]],
+        [StaticValue(value=3, labels=["c"]), StaticValue(value=4, labels=["d"])],
+    )
+    assert series() == 4
+
+    collection.delete_metric_value("metric", ["b"])
+    assert series() == 3
+
+    collection.delete_metric("other")
+    assert series() == 2
@@ -0,0 +1,67 @@
+import pytest
+from prometheus_client import CollectorRegistry
+
+from mocktrics_exporter import dependencies, exposition, metricStats
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.valueModels import SineValue
+
+
+def _metric(name: str, count: int) -> Metric:
+    return Metric(
+        name,
+        [SineValue(period=60, amplitude=1, labels=[str(n)]) for n in range(count)],
+        "documentation",
+        ["n"],
+    )
+
+
+def test_measure():
+    small, large = _metric("small", 1), _metric("large", 100)
+
+    stats = metricStats.measure_all([small, large])
+
+    assert [entry.series for entry in stats] == [1, 100]
+    assert stats[1].bytes > stats[0].bytes > 0
+    assert stats[1].payload_bytes > stats[0].payload_bytes
+    assert stats[1].evaluations == 0
+    assert stats[1].evaluation_seconds == 0
+
+
+def test_measure_scrapes():
+    registry = CollectorRegistry(auto_describe=False)
+    metric = _metric("scraped", 10)
+    registry.register(metric._collector)  # type: ignore[arg-type]
+    cache = exposition.ExpositionCache(registry, interval=0)
+    cache.get(exposition.TEXT)
+    cache.get(exposition.TEXT)
+
+    stats = metricStats.measure(metric)
+
+    assert stats.evaluations == 2
+    assert stats.evaluation_seconds == pytest.approx(metric.evaluation_seconds / 2)
+    assert metric.evaluations == 2
+
+
+def test_top_and_totals():
+    stats = metricStats.measure_all([_metric("a", 1), _metric("b", 3), _metric("c", 2)])
+
+    assert [entry.name for entry in metricStats.top(stats, "series", 2)] == ["b", "c"]
+    assert metricStats.totals(stats)["series"] == 6
+    assert metricStats.totals(stats)["metrics"] == 3
+
+
+def test_top_metrics_collector(monkeypatch):
+    dependencies.metrics_collection.add_metric(_metric("a", 1))
+    dependencies.metrics_collection.add_metric(_metric("b", 3))
+    dependencies.metrics_collection.get_metric("b").evaluation_seconds = 1.0
+    dependencies.metrics_collection.get_metric("b").evaluations = 1
+    collector = metricStats.TopMetricsCollector(dependencies.metrics_collection, 1)
+
+    families = {family.name: family for family in collector.collect()}
+
+    series = families["mocktrics_exporter_metric_series"].samples
+    assert [(sample.labels, sample.value) for sample in series] == [({"metric": "b"}, 3)]
+    assert families["mocktrics_exporter_metric_evaluation_seconds"].samples[0].value == 1.0
+
+    dependencies.metrics_collection.add_metric(_metric("c", 5))
+    assert [entry.name for entry in collector.stats()] == ["b"]
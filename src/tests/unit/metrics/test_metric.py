@@ -1,8 +1,12 @@
+from typing import Literal
+
 import pytest
+from prometheus_client import CollectorRegistry
 
 import mocktrics_exporter
+from mocktrics_exporter import clock, valueModels
 from mocktrics_exporter.metrics import Metric
-from mocktrics_exporter.valueModels import StaticValue
+from mocktrics_exporter.valueModels import HistogramValue, SineValue, StaticValue
 
 
 @pytest.mark.parametrize(
@@ -170,6 +174,17 @@ def test_collector(metric_family_mock, base_metric):
     assert metric_family.collected_values == [{"labels": ["test"], "value": 100.0}]
 
 
+def test_collector_extra_labels(metric_family_mock, base_metric):
+    base_metric.update({"values": [StaticValue(value=100.0, labels=["test"])]})
+    metric = Metric(**base_metric)
+    collector = metric.Collector(metric, {"target": "1", "test_label": "ignored"})
+
+    metric_family = next(collector.collect())
+
+    assert metric_family.labels == base_metric["labels"] + ["target"]
+    assert metric_family.collected_values == [{"labels": ["test", "1"], "value": 100.0}]
+
+
 def is_registered(metric: Metric):
     return metric._collector in metric._registry._collector_to_names
 
@@ -185,3 +200,194 @@ def test_unregister(base_metric):
     metric.register()
     metric.unregister()
     assert not is_registered(metric)
+
+
+def test_register_custom_registry(base_metric):
+    registry = CollectorRegistry()
+    metric = Metric(**base_metric, registry=registry)
+    metric.register()
+    assert metric._registry is registry
+    assert is_registered(metric)
+    assert metric._collector not in Metric._registry._collector_to_names
+
+
+@pytest.fixture
+def paused_clock(monkeypatch: pytest.MonkeyPatch) -> clock.Clock:
+    paused = clock.Clock(epoch=1000.0)
+    paused.pause()
+    paused.seek(1000.0)
+    monkeypatch.setattr(clock, "clock", paused)
+    return paused
+
+
+def test_collector_counter(paused_clock, base_metric):
+    base_metric.update(
+        {"values": [StaticValue(value=2.0, labels=["test"])], "type": "counter", "unit": ""}
+    )
+    metric = Metric(**base_metric, registry=CollectorRegistry())
+    paused_clock.advance(10)
+
+    family = next(metric.Collector(metric).collect())
+
+    assert family.type == "counter"
+    assert [sample.name for sample in family.samples] == ["metric_total"]
+    assert family.samples[0].value == pytest.approx(20.0)
+
+
+def test_collector_histogram(paused_clock, base_metric):
+    base_metric.update(
+        {
+            "values": [HistogramValue(rate=10, mean=1, sigma=1, labels=["test"])],
+            "type": "histogram",
+            "buckets": [1.0, 2.0],
+            "unit": "",
+        }
+    )
+    metric = Metric(**base_metric, registry=CollectorRegistry())
+    paused_clock.advance(10)
+
+    family = next(metric.Collector(metric).collect())
+
+    assert family.type == "histogram"
+    assert {(sample.name, sample.labels.get("le")): sample.value for sample in family.samples} == {
+        ("metric_bucket", "1.0"): 50.0,
+        ("metric_bucket", "2.0"): 84.0,
+        ("metric_bucket", "+Inf"): 100.0,
+        ("metric_count", None): 100.0,
+        ("metric_sum", None): 100.0,
+    }
+
+
+def test_bucket_cdf_follows_replaced_values(base_metric):
+    base_metric.update(
+        {
+            "values": [HistogramValue(rate=1, mean=1, sigma=1, labels=["test"])],
+            "type": "histogram",
+            "buckets": [1.0],
+        }
+    )
+    metric = Metric(**base_metric, registry=CollectorRegistry())
+
+    for mean in range(2, 50):
+        metric.bucket_cdf()
+        metric.remove_value(metric.values[0])
+        # A new value can reuse the id of the removed one
+        metric.add_value(HistogramValue(rate=1, mean=mean, sigma=0, labels=["test"]))
+        assert metric.bucket_cdf().tolist() == [[0.0]]
+
+
+@pytest.mark.parametrize(
+    "type, values, buckets",
+    [
+        ("gauge", [HistogramValue(rate=1, mean=1, labels=["test"])], None),
+        ("counter", [HistogramValue(rate=1, mean=1, labels=["test"])], None),
+        ("histogram", [StaticValue(value=1, labels=["test"])], None),
+        ("counter", [StaticValue(value=-1, labels=["test"])], None),
+        ("histogram", [], [2.0, 1.0]),
+        ("histogram", [], [1.0, float("inf")]),
+    ],
+)
+def test_metric_type_validation(base_metric, type, values, buckets):
+    base_metric.update({"values": values, "type": type, "buckets": buckets})
+    with pytest.raises(ValueError):
+        Metric(**base_metric, registry=CollectorRegistry())
+
+
+def test_add_value_type_validation(base_metric):
+    metric = Metric(**{**base_metric, "type": "counter"}, registry=CollectorRegistry())
+
+    with pytest.raises(Metric.ValueTypeException):
+        metric.add_value(StaticValue(value=-1, labels=["test"]))
+
+
+class PluginValue(valueModels.PluginValue):
+    kind: Literal["metric_test"] = "metric_test"
+
+    @classmethod
+    def evaluate_batch(cls, params, t):
+        return t
+
+
+def test_counter_plugin_value(base_metric):
+    base_metric.update({"values": [PluginValue(labels=["a"])], "type": "counter"})
+    with pytest.raises(Metric.ValueTypeException):
+        Metric(**base_metric, registry=CollectorRegistry())
+
+
+def test_runtimes(base_metric):
+    base_metric.update({"values": [StaticValue(value=1, labels=["a"])]})
+    metric = Metric(**base_metric, registry=CollectorRegistry())
+
+    runtimes = metric.runtimes()
+    assert metric.runtimes() is runtimes
+
+    metric.add_value(StaticValue(value=2, labels=["b"]))
+    assert [runtime.value_at(0) for runtime in metric.runtimes()] == [1, 2]
+
+
+def test_values_rebuilt_from_runtimes(base_metric):
+    values: list[valueModels.MetricValue] = [
+        StaticValue(value=1, labels=["a"]),
+        SineValue(period=60, amplitude=1, labels=["b"]),
+    ]
+    base_metric.update({"values": values})
+    metric = Metric(**base_metric, registry=CollectorRegistry())
+
+    # Only the runtimes are kept, the models are built again when asked for
+    runtimes = valueModels.compile_values(values)
+    assert all(kept is runtime for kept, runtime in zip(metric.runtimes(), runtimes))
+    assert metric.values == values
+    assert metric.values[0] is not values[0]
+
+    metric.remove_value(metric.values[0])
+    assert metric.values == values[1:]
+    with pytest.raises(ValueError):
+        metric.remove_value(values[0])
+
+
+def test_kind(base_metric):
+    base_metric.update({"values": [StaticValue(value=1, labels=["a"])]})
+    metric = Metric(**base_metric, registry=CollectorRegistry())
+    assert metric.kind() == "static"
+
+    metric.add_value(SineValue(period=60, amplitude=1, labels=["b"]))
+    assert metric.kind() == "mixed"
+
+
+def test_collector_label_values(base_metric):
+    base_metric.update({"values": [StaticValue(value=1, labels=["a"])]})
+    metric = Metric(**base_metric, registry=CollectorRegistry())
+    collector = metric.Collector(metric, {"target": "1"})
+
+    label_values = collector.label_values()
+    assert label_values == [["a", "1"]]
+    assert collector.label_values() is label_values
+
+    metric.add_value(StaticValue(value=2, labels=["b"]))
+    assert collector.label_values() == [["a", "1"], ["b", "1"]]
+
+    for n in range(50):
+        metric.remove_value(metric.values[-1])
+        # A new value can reuse the id of the removed one
+        metric.add_value(StaticValue(value=2, labels=[f"c{n}"]))
+        assert collector.label_values()[-1] == [f"c{n}", "1"]
+
+
+@pytest.mark.parametrize(
+    "type, names",
+    [
+        ("gauge", {"metric_meter_per_seconds"}),
+        ("counter", {"metric_meter_per_seconds", "metric_meter_per_seconds_total"}),
+    ],
+)
+def test_register_describes(monkeypatch, base_metric, type, names):
+    base_metric.update({"values": [StaticValue(value=1, labels=["a"])], "type": type})
+    registry = CollectorRegistry(auto_describe=True)
+    metric = Metric(**base_metric, registry=registry)
+    monkeypatch.setattr(metric, "runtimes", lambda: pytest.fail("Evaluated on register"))
+
+    metric.register()
+
+    assert names <= set(registry._names_to_collectors)
+    with pytest.raises(ValueError):
+        Metric(**base_metric, registry=registry).register()
@@ -1,7 +1,12 @@
+import sqlite3
+from typing import Literal
+
 import pytest
 
 from mocktrics_exporter import valueModels
+from mocktrics_exporter.arguments import arguments
 from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.persistence import Persistence
 
 
 @pytest.mark.parametrize(
@@ -134,3 +139,119 @@ def test_cleanup(base_metric, table, expected_count, database):
 
     with database._connection:
         assert database.cursor.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0] == 0
+
+
+def test_add_replay_value(base_metric, database, tmp_path, monkeypatch):
+
+    monkeypatch.setattr(arguments, "recordings_dir", str(tmp_path))
+    path = str(tmp_path / "recording.f64")
+    valueModels.save_recording(path, [1.0, 2.0, 3.0])
+    value = valueModels.ReplayValue(path=path, step=30, mode="clamp", labels=["200"])
+
+    base_metric.update({"labels": ["response"], "values": [value]})
+    database.add_metric(Metric(**base_metric))
+
+    with database._connection:
+        assert database.cursor.execute(
+            "SELECT path, step, mode, interpolate FROM replay;"
+        ).fetchall() == [(path, 30, "clamp", 0)]
+
+
+def test_get_metrics_skips_unloadable_replay(base_metric, database, tmp_path, monkeypatch):
+
+    monkeypatch.setattr(arguments, "recordings_dir", str(tmp_path))
+    valueModels.save_recording(str(tmp_path / "recording.f64"), [1.0, 2.0, 3.0])
+    replay = valueModels.ReplayValue(path="recording.f64", step=30, labels=["200"])
+    static = valueModels.StaticValue(value=1, labels=["500"])
+    base_metric.update({"labels": ["response"], "values": [replay, static]})
+    database.add_metric(Metric(**base_metric))
+
+    monkeypatch.setattr(arguments, "recordings_dir", None)
+    [metric] = database.get_metrics()
+
+    assert [value.labels for value in metric.values] == [["500"]]
+
+
+def test_add_histogram_metric(base_metric, database):
+
+    value = valueModels.HistogramValue(
+        rate=5, distribution="lognormal", mean=0.5, sigma=0.25, labels=["200"]
+    )
+    base_metric.update(
+        {"labels": ["response"], "values": [value], "type": "histogram", "buckets": [0.5, 1.0]}
+    )
+    database.add_metric(Metric(**base_metric))
+
+    with database._connection:
+        assert database.cursor.execute("SELECT type, buckets FROM metrics;").fetchall() == [
+            ("histogram", "0.5, 1.0")
+        ]
+        assert database.cursor.execute(
+            "SELECT rate, distribution, mean, sigma FROM histogram;"
+        ).fetchall() == [(5.0, "lognormal", 0.5, 0.25)]
+
+
+def test_add_plugin_value(base_metric, database, monkeypatch):
+
+    class OffsetValue(valueModels.PluginValue):
+        kind: Literal["offset"] = "offset"
+        offset: float
+        params = ("offset",)
+
+        @classmethod
+        def evaluate_batch(cls, params, t):
+            return params[:, :1] + t
+
+    monkeypatch.setattr(valueModels, "_plugins", {})
+    valueModels.register(OffsetValue)
+
+    base_metric.update({"labels": ["type"], "values": [OffsetValue(offset=2, labels=["a"])]})
+    database.add_metric(Metric(**base_metric))
+
+    with database._connection:
+        assert database.cursor.execute("SELECT kind FROM value_base;").fetchall() == [("plugin",)]
+        assert database.cursor.execute("SELECT kind, params FROM plugin;").fetchall() == [
+            ("offset", '{"offset":2.0}')
+        ]
+
+
+def test_migrate_value_kinds(tmp_path):
+
+    path = str(tmp_path / "database.db")
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            documentation TEXT NOT NULL,
+            unit TEXT NOT NULL
+        );
+        CREATE TABLE value_base (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            metric_id INT NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ('static','ramp','square','sine','gaussian')),
+            FOREIGN KEY (metric_id) REFERENCES metrics(id) ON DELETE CASCADE ON UPDATE CASCADE
+        );
+        CREATE TABLE static (
+            id INTEGER PRIMARY KEY REFERENCES value_base(id) ON DELETE CASCADE ON UPDATE CASCADE,
+            value REAL NOT NULL
+        );
+        INSERT INTO metrics (name, documentation, unit) VALUES ('metric', 'doc', '');
+        INSERT INTO value_base (metric_id, kind) VALUES (1, 'static');
+        INSERT INTO static (id, value) VALUES (1, 5.0);
+        """
+    )
+    connection.close()
+
+    database = Persistence(path)
+
+    with database._connection:
+        assert database.cursor.execute("SELECT * FROM value_base;").fetchall() == [(1, 1, "static")]
+        assert database.cursor.execute("SELECT * FROM static;").fetchall() == [(1, 5.0)]
+        assert database.cursor.execute("SELECT type, buckets FROM metrics;").fetchall() == [
+            ("gauge", "")
+        ]
+        database.cursor.execute("INSERT INTO value_base (metric_id, kind) VALUES (1, 'replay');")
+        database.cursor.execute("DELETE FROM metrics;")
+        assert database.cursor.execute("SELECT COUNT(*) FROM static;").fetchone()[0] == 0
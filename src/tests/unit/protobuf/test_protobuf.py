@@ -0,0 +1,103 @@
+import struct
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from mocktrics_exporter import protobuf
+
+
+def read_varint(data: bytes, position: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, position
+
+
+def decode(data: bytes) -> dict[int, list]:
+    fields: dict[int, list] = {}
+    position = 0
+    while position < len(data):
+        key, position = read_varint(data, position)
+        field, wire = key >> 3, key & 0x7
+        value: int | float | bytes
+        if wire == 0:
+            value, position = read_varint(data, position)
+        elif wire == 1:
+            end = position + 8
+            value = struct.unpack("<d", data[position:end])[0]
+            position = end
+        else:
+            length, position = read_varint(data, position)
+            end = position + length
+            value = data[position:end]
+            position = end
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def families(data: bytes) -> list[dict[int, list]]:
+    result = []
+    position = 0
+    while position < len(data):
+        length, position = read_varint(data, position)
+        end = position + length
+        result.append(decode(data[position:end]))
+        position = end
+    return result
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2**63, -1])
+def test_varint_roundtrip(value):
+    assert read_varint(protobuf.encode_varint(value), 0)[0] == value & 0xFFFFFFFFFFFFFFFF
+
+
+def test_gauge_family():
+    registry = CollectorRegistry()
+    gauge = Gauge("test", "documentation", ["type"], registry=registry)
+    gauge.labels("a").set(1.5)
+    gauge.labels("b").set(0)
+
+    (family,) = families(protobuf.encode_metric_families(registry.collect()))
+
+    assert family[1] == [b"test"]
+    assert family[2] == [b"documentation"]
+    assert family[3] == [1]
+    metrics = [decode(metric) for metric in family[4]]
+    assert [decode(metric[1][0]) for metric in metrics] == [
+        {1: [b"type"], 2: [b"a"]},
+        {1: [b"type"], 2: [b"b"]},
+    ]
+    assert [decode(metric[2][0])[1] for metric in metrics] == [[1.5], [0.0]]
+
+
+def test_counter_family():
+    registry = CollectorRegistry()
+    Counter("requests", "documentation", registry=registry).inc(3)
+
+    (family,) = families(protobuf.encode_metric_families(registry.collect()))
+
+    assert family[1] == [b"requests_total"]
+    assert family[3] == [0]
+    (metric,) = [decode(metric) for metric in family[4]]
+    assert decode(metric[3][0])[1] == [3.0]
+
+
+def test_histogram_family():
+    registry = CollectorRegistry()
+    Histogram("latency", "documentation", buckets=[1, 2], registry=registry).observe(1.5)
+
+    (family,) = families(protobuf.encode_metric_families(registry.collect()))
+
+    assert family[3] == [4]
+    (metric,) = [decode(metric) for metric in family[4]]
+    histogram = decode(metric[7][0])
+    assert histogram[1] == [1]
+    assert histogram[2] == [1.5]
+    assert [decode(bucket) for bucket in histogram[3]] == [
+        {1: [0], 2: [1.0]},
+        {1: [1], 2: [2.0]},
+    ]
@@ -0,0 +1,243 @@
+import http.server
+import struct
+import threading
+import time
+import typing
+
+import pytest
+
+from mocktrics_exporter import clock, metaMetrics
+from mocktrics_exporter.compression import snappy_decompress
+from mocktrics_exporter.metricCollection import MetricsCollection
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.remoteWrite import RemoteWriter
+from mocktrics_exporter.valueModels import StaticValue
+
+
+def read_varint(data: bytes, position: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, position
+
+
+def decode(data: bytes) -> dict[int, list]:
+    fields: dict[int, list] = {}
+    position = 0
+    while position < len(data):
+        key, position = read_varint(data, position)
+        field, wire = key >> 3, key & 0x7
+        value: int | float | bytes
+        if wire == 0:
+            value, position = read_varint(data, position)
+        elif wire == 1:
+            end = position + 8
+            value = struct.unpack("<d", data[position:end])[0]
+            position = end
+        else:
+            length, position = read_varint(data, position)
+            end = position + length
+            value = data[position:end]
+            position = end
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def decode_write_request(body: bytes) -> list[tuple[dict[str, str], list[tuple[float, int]]]]:
+    result = []
+    for series in decode(body).get(1, []):
+        fields = decode(series)
+        labels = [decode(label) for label in fields[1]]
+        samples = [decode(sample) for sample in fields[2]]
+        result.append(
+            (
+                {label[1][0].decode(): label[2][0].decode() for label in labels},
+                [(sample[1][0], sample[2][0]) for sample in samples],
+            )
+        )
+    return result
+
+
+class Receiver(http.server.ThreadingHTTPServer):
+
+    def __init__(self, statuses: list[int]):
+        self.statuses = statuses
+        self.requests: list[tuple[dict, bytes]] = []
+        super().__init__(("127.0.0.1", 0), ReceiverHandler)
+
+
+class ReceiverHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    server: Receiver
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status = self.server.statuses.pop(0) if self.server.statuses else 204
+        if status == 204:
+            self.server.requests.append((dict(self.headers), body))
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def receiver() -> typing.Generator[Receiver, None, None]:
+    server = Receiver([])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def collection(base_metric) -> MetricsCollection:
+    collection = MetricsCollection()
+    collection.add_metric(
+        Metric(
+            **{
+                **base_metric,
+                "values": [StaticValue(value=index, labels=[str(index)]) for index in range(5)],
+            }
+        )
+    )
+    return collection
+
+
+def writer(receiver: Receiver, collection: MetricsCollection, **kwargs) -> RemoteWriter:
+    return RemoteWriter(
+        f"http://127.0.0.1:{receiver.server_address[1]}/api/v1/write", collection, **kwargs
+    )
+
+
+@pytest.mark.parametrize(
+    "url, kwargs",
+    [
+        ("ftp://localhost/write", {}),
+        ("http:///write", {}),
+        ("http://localhost/write", {"interval": 0}),
+        ("http://localhost/write", {"shards": 0}),
+        ("http://localhost/write", {"retries": -1}),
+    ],
+)
+def test_invalid_configuration(url, kwargs):
+    with pytest.raises(ValueError):
+        RemoteWriter(url, MetricsCollection(), **kwargs)
+
+
+def test_collect_shards_series(receiver, collection):
+    series = writer(receiver, collection, shards=3).collect(1000)
+
+    assert len(series) == 3
+    assert sum(len(shard) for shard in series) == 5
+
+
+def test_send(receiver, collection):
+    remote_writer = writer(receiver, collection)
+    (batch,) = remote_writer.collect(1000)
+    connection = remote_writer._connect()
+
+    assert remote_writer.send(connection, batch)
+    assert remote_writer.send(connection, batch)
+
+    headers, body = receiver.requests[0]
+    assert headers["Content-Encoding"] == "snappy"
+    assert headers["Content-Type"] == "application/x-protobuf"
+    assert headers["X-Prometheus-Remote-Write-Version"] == "0.1.0"
+    assert sorted(
+        decode_write_request(snappy_decompress(body)), key=lambda s: s[0]["test_label"]
+    ) == [
+        (
+            {"__name__": "metric_meter_per_seconds", "test_label": str(index)},
+            [(float(index), 1000)],
+        )
+        for index in range(5)
+    ]
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.remote_write_samples_sent) == 10
+
+
+def test_send_retries(receiver, collection):
+    receiver.statuses.extend([503, 429])
+    remote_writer = writer(receiver, collection, retries=2)
+    (batch,) = remote_writer.collect(1000)
+
+    assert remote_writer.send(remote_writer._connect(), batch)
+    assert len(receiver.requests) == 1
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.remote_write_retries) == 2
+
+
+def test_send_rejected(receiver, collection):
+    receiver.statuses.extend([400])
+    remote_writer = writer(receiver, collection, retries=2)
+    (batch,) = remote_writer.collect(1000)
+
+    assert not remote_writer.send(remote_writer._connect(), batch)
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.remote_write_retries) == 0
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.remote_write_samples_failed) == 5
+
+
+def test_produce_drops_when_full(receiver, collection):
+    remote_writer = writer(receiver, collection, batch_size=2, queue_capacity=1)
+
+    remote_writer.produce()
+
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.remote_write_samples_dropped) == 3
+
+
+def test_start_stop(receiver, collection):
+    remote_writer = writer(receiver, collection, interval=0.05)
+
+    remote_writer.start()
+    try:
+        for _ in range(100):
+            if len(receiver.requests) >= 2:
+                break
+            threading.Event().wait(0.05)
+    finally:
+        remote_writer.stop()
+
+    assert len(receiver.requests) >= 2
+
+
+def test_produce_wall_timestamps(monkeypatch, receiver, collection):
+    # Stamped when the virtual clock shows the values, not with the virtual time itself
+    monkeypatch.setattr(clock, "clock", clock.Clock(speed=60, epoch=1_000_000.0))
+    remote_writer = writer(receiver, collection)
+
+    before = time.time()
+    remote_writer.produce()
+    after = time.time()
+
+    batch = remote_writer._queues[0].get_nowait()
+    assert remote_writer.send(remote_writer._connect(), batch)
+    _, body = receiver.requests[0]
+    timestamps = {
+        timestamp
+        for _, samples in decode_write_request(snappy_decompress(body))
+        for _, timestamp in samples
+    }
+    [timestamp] = timestamps
+    assert before * 1000 - 1 <= timestamp <= after * 1000
+
+
+def test_stop_with_full_queue():
+    # Nothing listens there, every send fails after its retries
+    remote_writer = RemoteWriter(
+        "http://127.0.0.1:1/api/v1/write", MetricsCollection(), queue_capacity=2, timeout=1.0
+    )
+    remote_writer.start()
+    for _ in range(2):
+        remote_writer._queues[0].put([b""])
+
+    stopping = threading.Thread(target=remote_writer.stop)
+    stopping.start()
+    stopping.join(timeout=5)
+
+    assert not stopping.is_alive()
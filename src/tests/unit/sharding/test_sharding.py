@@ -0,0 +1,128 @@
+import pytest
+
+from mocktrics_exporter import dependencies, metaMetrics
+from mocktrics_exporter.metricCollection import MetricsCollection
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.sharding import Sharding, jump_hash, key_hash
+from mocktrics_exporter.valueModels import MetricValue, StaticValue
+
+
+def test_jump_hash_range():
+    for key in range(1000):
+        assert 0 <= jump_hash(key, 7) < 7
+
+
+def test_jump_hash_consistency():
+    # Growing from K to K + 1 buckets only moves keys into the new bucket
+    for key in range(1000):
+        before = jump_hash(key_hash(str(key)), 4)
+        after = jump_hash(key_hash(str(key)), 5)
+        assert after == before or after == 4
+
+
+def test_key_hash_stable():
+    assert key_hash("metric", "a") == key_hash("metric", "a")
+    assert key_hash("metric", "a") != key_hash("metrica")
+
+
+@pytest.mark.parametrize(
+    "index, count, by",
+    [
+        (0, 0, "series"),
+        (-1, 2, "series"),
+        (2, 2, "series"),
+        (0, 2, "labels"),
+    ],
+)
+def test_invalid_sharding(index, count, by):
+    with pytest.raises(ValueError):
+        Sharding(index, count, by)
+
+
+@pytest.mark.parametrize("by", ["metric", "series"])
+def test_shards_partition_values(by):
+    values: list[MetricValue] = [StaticValue(value=0, labels=[str(label)]) for label in range(200)]
+    shards = [Sharding(index, 3, by) for index in range(3)]
+
+    owned = [
+        [value.labels[0] for value in shard.owned_values(f"metric_{index}", values)]
+        for index in range(10)
+        for shard in shards
+    ]
+
+    assert sorted(label for labels in owned for label in labels) == sorted(
+        [value.labels[0] for value in values] * 10
+    )
+
+
+def test_collection_materializes_owned_series(monkeypatch, base_metric):
+    sharding = Sharding(1, 2, "series")
+    monkeypatch.setattr(dependencies, "sharding", sharding)
+    values = [StaticValue(value=0, labels=[str(label)]) for label in range(100)]
+    expected = [value for value in values if sharding.owns_value("metric", value)]
+
+    collection = MetricsCollection()
+    collection.add_metric(Metric(**{**base_metric, "values": list(values)}))
+
+    assert collection.get_metric("metric").values == expected
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.shard_series) == len(expected)
+    assert metaMetrics.Metrics.get_value(metaMetrics.metrics.shard_series_skipped) == len(
+        values
+    ) - len(expected)
+
+
+def test_collection_skips_foreign_value(monkeypatch, base_metric):
+    sharding = Sharding(0, 2, "series")
+    monkeypatch.setattr(dependencies, "sharding", sharding)
+    foreign = next(
+        StaticValue(value=0, labels=[str(label)])
+        for label in range(100)
+        if not sharding.owns_value("metric", StaticValue(value=0, labels=[str(label)]))
+    )
+
+    collection = MetricsCollection()
+    collection.add_metric(Metric(**base_metric))
+    collection.add_metric_value("metric", foreign)
+
+    assert collection.get_metric("metric").values == []
+    with pytest.raises(Metric.ValueLabelsetSizeException):
+        collection.add_metric_value("metric", StaticValue(value=0, labels=["a", "b"]))
+
+
+def test_collection_skips_foreign_metric(monkeypatch, base_metric):
+    sharding = Sharding(0, 2, "metric")
+    monkeypatch.setattr(dependencies, "sharding", sharding)
+    names = [f"metric_{index}" for index in range(20)]
+
+    collection = MetricsCollection()
+    collection.add_metrics([Metric(**{**base_metric, "name": name}) for name in names])
+
+    assert [metric.name for metric in collection.get_metrics()] == [
+        name for name in names if sharding.owns_metric(name)
+    ]
+
+
+def test_collection_rejects_foreign_metric(monkeypatch, base_metric, database):
+    sharding = Sharding(0, 2, "metric")
+    monkeypatch.setattr(dependencies, "sharding", sharding)
+    name = next(f"metric_{index}" for index in range(20) if sharding.shard(f"metric_{index}"))
+
+    collection = MetricsCollection()
+    with pytest.raises(MetricsCollection.NotOwnedException, match="served by shard 1"):
+        collection.add_metric(Metric(**{**base_metric, "name": name}))
+
+    assert collection.get_metrics() == []
+    assert database.cursor.execute("SELECT COUNT(*) FROM metrics;").fetchone()[0] == 0
+
+
+def test_collection_keeps_given_values(monkeypatch, base_metric):
+    sharding = Sharding(0, 2, "series")
+    monkeypatch.setattr(dependencies, "sharding", sharding)
+    values = [StaticValue(value=0, labels=[str(label)]) for label in range(20)]
+    metric = Metric(**{**base_metric, "values": values})
+
+    collection = MetricsCollection()
+    collection.add_metric(metric)
+
+    assert [value.labels for value in metric.values] == [value.labels for value in values]
+    assert len(collection.get_metric("metric").values) < 20
@@ -0,0 +1,132 @@
+import json
+import time
+
+import pytest
+from prometheus_client import generate_latest
+
+from mocktrics_exporter import exposition
+from mocktrics_exporter.metricCollection import MetricsCollection
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.targets import TargetCollector, VirtualTargets
+from mocktrics_exporter.valueModels import RampValue, StaticValue
+
+
+@pytest.fixture
+def collection(base_metric) -> MetricsCollection:
+    collection = MetricsCollection()
+    collection.add_metric(
+        Metric(**{**base_metric, "values": [StaticValue(value=1, labels=["static"])]})
+    )
+    return collection
+
+
+def test_target_label_injection(collection):
+    targets = VirtualTargets(collection, 3, label_name="instance_id")
+
+    payload = generate_latest(targets.registry(2)).decode()
+
+    assert 'test_label="static"' in payload
+    assert 'instance_id="2"' in payload
+
+
+def test_target_label_clash(collection):
+    targets = VirtualTargets(collection, 3, label_name="test_label")
+
+    payload = generate_latest(targets.registry(2)).decode()
+
+    assert 'test_label="static"' in payload
+    assert 'test_label="2"' not in payload
+
+
+def test_target_phase_offset(monkeypatch, base_metric):
+    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
+    collection = MetricsCollection()
+    collection.add_metric(
+        Metric(**{**base_metric, "values": [RampValue(period=10, peak=10, labels=["ramp"])]})
+    )
+    targets = VirtualTargets(collection, 4, phase_offset=2.5)
+
+    samples = [next(iter(targets.registry(index).collect())).samples[0].value for index in range(4)]
+
+    assert samples == [0.0, 2.5, 5.0, 7.5]
+
+
+def test_target_follows_collection(collection, base_metric):
+    targets = VirtualTargets(collection, 1)
+    registry = targets.registry(0)
+
+    collection.add_metric(Metric(**{**base_metric, "name": "added"}))
+
+    assert [family.name for family in registry.collect()] == [
+        "metric_meter_per_seconds",
+        "added_meter_per_seconds",
+    ]
+
+
+def test_target_collectors_kept(collection, base_metric):
+    collector = TargetCollector(collection, {"target": "0"})
+    list(collector.collect())
+    kept = list(collector._collectors.values())
+
+    collection.add_metric(Metric(**{**base_metric, "name": "added"}))
+    list(collector.collect())
+    assert list(collector._collectors.values())[0] is kept[0]
+
+    collection.delete_metric("metric")
+    list(collector.collect())
+    assert [c._metric.name for c in collector._collectors.values()] == ["added"]
+
+
+def test_target_caches_evicted(monkeypatch, collection):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    targets = VirtualTargets(collection, 100, cache_interval=1.0)
+    for index in range(100):
+        targets.cache(index).get(exposition.TEXT)
+
+    assert len(targets._caches) == 100
+    now[0] = 101.0
+    targets.cache(0).get(exposition.TEXT)
+    assert list(targets._caches) == [0]
+
+
+def test_target_count():
+    with pytest.raises(ValueError):
+        VirtualTargets(MetricsCollection(), 0)
+
+
+def test_file_sd(collection, tmp_path):
+    targets = VirtualTargets(collection, 2)
+    path = tmp_path / "targets.json"
+
+    targets.write_file_sd(str(path), "exporter:8000")
+
+    assert json.loads(path.read_text()) == [
+        {"targets": ["exporter:8000"], "labels": {"__metrics_path__": "/targets/0/metrics"}},
+        {"targets": ["exporter:8000"], "labels": {"__metrics_path__": "/targets/1/metrics"}},
+    ]
+
+
+@pytest.mark.parametrize(
+    "path, status",
+    [
+        ("/targets/0/metrics", "200 OK"),
+        ("/targets/1/metrics/", "200 OK"),
+        ("/targets/2/metrics", "404 Not Found"),
+        ("/metrics", "fallback"),
+    ],
+)
+def test_wsgi_routing(collection, path, status):
+    targets = VirtualTargets(collection, 2, cache_interval=0)
+
+    def fallback(environ, start_response):
+        start_response("fallback", [])
+        return [b""]
+
+    statuses = []
+    targets.make_wsgi_app(fallback)(
+        {"PATH_INFO": path, "REQUEST_METHOD": "GET"},
+        lambda status, headers: statuses.append(status),
+    )
+
+    assert statuses == [status]
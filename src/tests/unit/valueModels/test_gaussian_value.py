@@ -1,17 +1,67 @@
-import random
+import pickle
 
+import numpy
 import pydantic
 import pytest
+from prometheus_client import CollectorRegistry
 
+from mocktrics_exporter import valueModels
+from mocktrics_exporter.arguments import arguments
+from mocktrics_exporter.metrics import Metric
 from mocktrics_exporter.valueModels import GaussianValue
 
 
-def test_gaussian_value(monkeypatch):
+def test_gaussian_value():
 
-    monkeypatch.setattr(random, "gauss", lambda mean, sigma: 100.0)
-    gaussian_value = GaussianValue(mean=0, sigma=1.0, labels=[""])
+    gaussian_value = GaussianValue(mean=0, sigma=1.0, seed=1, labels=[""])
+    expected = numpy.random.default_rng(1).normal(0, 1.0, valueModels.GAUSSIAN_BUFFER_SIZE)
 
-    assert gaussian_value.get_value() == 100.0
+    values = [gaussian_value.get_value() for _ in range(valueModels.GAUSSIAN_BUFFER_SIZE + 1)]
+
+    assert values[:-1] == expected.tolist()
+    assert isinstance(values[-1], float)
+
+
+def test_gaussian_value_seeded():
+    first = GaussianValue(mean=10, sigma=2.0, seed=42, labels=[])
+    second = GaussianValue(mean=10, sigma=2.0, seed=42, labels=[])
+    assert [first.get_value() for _ in range(10)] == [second.get_value() for _ in range(10)]
+
+
+def test_gaussian_value_scenario_seed(monkeypatch):
+    monkeypatch.setattr(arguments, "seed", 7)
+
+    def scenario(created: int) -> list[list[float]]:
+        # Values created before, like validated API requests, do not shift the streams
+        for _ in range(created):
+            GaussianValue(mean=0, sigma=1.0, labels=["0"]).get_value()
+        values = [GaussianValue(mean=0, sigma=1.0, labels=[str(i)]) for i in range(2)]
+        return [[value.get_value() for _ in range(5)] for value in values]
+
+    first, second = scenario(0), scenario(3)
+    assert first == second
+    # Every value draws from its own stream
+    assert first[0] != first[1]
+
+
+def test_gaussian_value_scenario_seed_metric(monkeypatch, base_metric):
+    monkeypatch.setattr(arguments, "seed", 7)
+
+    def series(name: str) -> list[float]:
+        value = GaussianValue(mean=0, sigma=1.0, labels=["a"])
+        Metric(**{**base_metric, "name": name, "values": [value]}, registry=CollectorRegistry())
+        return [value.get_value() for _ in range(5)]
+
+    assert series("first") == series("first")
+    # The same labels of another metric are another series
+    assert series("first") != series("second")
+
+
+def test_gaussian_value_pickle():
+    gaussian_value = GaussianValue(mean=0, sigma=1.0, seed=3, labels=[])
+    gaussian_value.get_value()
+    copy = pickle.loads(pickle.dumps(gaussian_value))
+    assert copy.get_value() == gaussian_value.get_value()
 
 
 @pytest.mark.parametrize(
@@ -28,7 +78,29 @@ def test_gaussian_value_labels(labels):
     assert labels == gaussian_value.labels
 
 
+def test_gaussian_batches_keep_samples():
+    first = GaussianValue(mean=0, sigma=1, seed=3, labels=["a"])
+    second = GaussianValue(mean=0, sigma=1, seed=3, labels=["a"])
+
+    expected = [first.get_value() for _ in range(5)]
+    samples = []
+    for _ in range(5):
+        second.get_values(numpy.arange(100))
+        samples.append(second.get_value())
+
+    assert samples == expected
+    assert second.get_values(numpy.arange(5)).tolist() != expected
+
+
 def test_static_value_kind():
     GaussianValue(mean=0, sigma=1.0, labels=[], kind="gaussian")
     with pytest.raises(pydantic.ValidationError):
         GaussianValue(mean=0, sigma=1.0, labels=[], kind="test")  # type: ignore[arg-type]
+
+
+def test_gaussian_values():
+    gaussian_value = GaussianValue(mean=100, sigma=1.0, labels=[""])
+    values = gaussian_value.get_values(numpy.arange(10000))
+    assert values.shape == (10000,)
+    assert values.mean() == pytest.approx(100, abs=0.1)
+    assert values.std() == pytest.approx(1.0, abs=0.1)
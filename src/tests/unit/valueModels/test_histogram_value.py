@@ -0,0 +1,58 @@
+import math
+
+import numpy
+import pydantic
+import pytest
+
+from mocktrics_exporter.valueModels import HistogramValue
+
+
+def test_histogram_value_count():
+    histogram = HistogramValue(rate=2.5, mean=1, labels=["a"])
+
+    elapsed = numpy.array([-1.0, 0.0, 1.0, 2.0, 10.0])
+    assert histogram.get_values(elapsed).tolist() == [0.0, 0.0, 2.0, 5.0, 25.0]
+    assert histogram.value_at(histogram._start_time + 3) == 7
+
+
+@pytest.mark.parametrize(
+    "distribution, mean, sigma, bounds, expected",
+    [
+        ("normal", 1.0, 1.0, [1.0], [0.5]),
+        ("normal", 1.0, 0.0, [0.5, 1.0, 2.0], [0.0, 1.0, 1.0]),
+        ("lognormal", 0.0, 1.0, [-1.0, 0.0, 1.0], [0.0, 0.0, 0.5]),
+        ("exponential", 2.0, 0.0, [0.0, 2.0], [0.0, 1 - math.exp(-1)]),
+    ],
+)
+def test_histogram_value_cdf(distribution, mean, sigma, bounds, expected):
+    histogram = HistogramValue(
+        rate=1, distribution=distribution, mean=mean, sigma=sigma, labels=["a"]
+    )
+
+    assert histogram.cdf(numpy.array(bounds)).tolist() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "distribution, mean, sigma, expected",
+    [("normal", 3.0, 1.0, 3.0), ("lognormal", 0.0, 1.0, math.exp(0.5)), ("exponential", 2, 0, 2)],
+)
+def test_histogram_value_expected(distribution, mean, sigma, expected):
+    histogram = HistogramValue(
+        rate=1, distribution=distribution, mean=mean, sigma=sigma, labels=["a"]
+    )
+
+    assert histogram.expected() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"rate": -1, "mean": 1},
+        {"rate": 1, "mean": 1, "sigma": -1},
+        {"rate": 1, "mean": 0, "distribution": "exponential"},
+        {"rate": 1, "mean": 1, "distribution": "uniform"},
+    ],
+)
+def test_histogram_value_invalid(fields):
+    with pytest.raises(pydantic.ValidationError):
+        HistogramValue(**fields, labels=["a"])
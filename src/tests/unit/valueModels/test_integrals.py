@@ -0,0 +1,54 @@
+import numpy
+import pytest
+
+from mocktrics_exporter import valueModels
+from mocktrics_exporter.valueModels import (
+    RampValue,
+    SineValue,
+    SquareValue,
+    StaticValue,
+)
+
+STEP = 0.001
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        StaticValue(value=3, labels=["a"]),
+        RampValue(period=10, peak=5, offset=1, labels=["a"]),
+        RampValue(period=10, peak=5, invert=True, labels=["a"]),
+        SquareValue(period=10, magnitude=4, offset=1, duty_cycle=30, labels=["a"]),
+        SquareValue(period=10, magnitude=4, duty_cycle=30, invert=True, labels=["a"]),
+        SineValue(period=10, amplitude=2, offset=3, labels=["a"]),
+    ],
+)
+def test_integrals(value):
+    elapsed = numpy.arange(0, 25, STEP)
+    expected = numpy.concatenate(([0.0], numpy.cumsum(value.get_values(elapsed[:-1] + STEP / 2))))
+
+    integrals = value.get_integrals(elapsed) / STEP
+
+    assert integrals == pytest.approx(expected, abs=0.01)
+    assert value.integral_at(value._start_time + 12.5) == pytest.approx(
+        value.get_integrals(numpy.array([12.5]))[0]
+    )
+
+
+def test_integrals_before_start():
+    value = StaticValue(value=3, labels=["a"])
+
+    assert value.get_integrals(numpy.array([-5.0, 0.0, 5.0])).tolist() == [0.0, 0.0, 15.0]
+
+
+def test_minimum():
+    assert SineValue(period=10, amplitude=2, offset=-3, labels=["a"]).minimum() == -5
+    assert RampValue(period=10, peak=-5, offset=1, labels=["a"]).minimum() == -4
+
+
+def test_evaluate():
+    static = StaticValue(value=2, labels=["a"])
+    times = numpy.array([0.0, 1.0, 2.0]) + static._start_time
+
+    assert valueModels.evaluate([static], times).tolist() == [[2.0, 2.0, 2.0]]
+    assert valueModels.evaluate([static], times, integrate=True).tolist() == [[0.0, 2.0, 4.0]]
@@ -0,0 +1,128 @@
+import importlib.metadata
+from typing import ClassVar, Literal
+
+import numpy
+import pydantic
+import pytest
+
+from mocktrics_exporter import configuration, valueModels
+from mocktrics_exporter.valueModels import PluginValue, StaticValue
+
+
+class LinearValue(PluginValue):
+    kind: Literal["linear"] = "linear"
+    slope: float
+    offset: float = 0.0
+    params = ("slope", "offset")
+
+    batches: ClassVar[int] = 0
+
+    @classmethod
+    def evaluate_batch(cls, params: numpy.ndarray, t: numpy.ndarray) -> numpy.ndarray:
+        cls.batches += 1
+        return params[:, :1] * t + params[:, 1:2]
+
+
+@pytest.fixture(autouse=True)
+def plugins(monkeypatch):
+    monkeypatch.setattr(valueModels, "_plugins", {})
+    monkeypatch.setattr(LinearValue, "batches", 0)
+    valueModels.register(LinearValue)
+
+
+def test_validate_plugin_value():
+    metric = configuration.Metric.model_validate(
+        {
+            "name": "metric",
+            "documentation": "",
+            "labels": ["type"],
+            "values": [
+                {"kind": "linear", "slope": 2, "labels": ["linear"]},
+                {"kind": "static", "value": 1, "labels": ["static"]},
+            ],
+        }
+    )
+
+    assert isinstance(metric.values[0], LinearValue)
+    assert metric.values[0].slope == 2
+    assert isinstance(metric.values[1], StaticValue)
+
+
+def test_validate_unknown_kind():
+    with pytest.raises(pydantic.ValidationError, match="Unknown value kind: unknown"):
+        configuration.Metric.model_validate(
+            {
+                "name": "metric",
+                "documentation": "",
+                "labels": ["type"],
+                "values": [{"kind": "unknown", "labels": ["a"]}],
+            }
+        )
+
+
+def test_plugin_value():
+    value = LinearValue(slope=2, offset=1, labels=["a"])
+
+    assert value.get_values(numpy.array([0.0, 1.0, 2.0])).tolist() == [1.0, 3.0, 5.0]
+    assert value.value_at(value._start_time + 3) == 7.0
+    assert value.serialize() == '{"slope":2.0,"offset":1.0}'
+
+
+def test_evaluate_batches_plugin_kinds():
+    values: list[valueModels.MetricValue] = [
+        LinearValue(slope=1, labels=["a"]),
+        StaticValue(value=5, labels=["b"]),
+        LinearValue(slope=2, offset=1, labels=["c"]),
+    ]
+    start = values[0]._start_time
+    for value in values:
+        value._start_time = start
+
+    result = valueModels.evaluate(values, numpy.array([0.0, 1.0]) + start)
+
+    assert result.tolist() == [[0.0, 1.0], [5.0, 5.0], [1.0, 3.0]]
+    assert LinearValue.batches == 1
+    assert valueModels.evaluate_at(valueModels.compile_values(values), start + 2) == [2.0, 5.0, 5.0]
+    assert LinearValue.batches == 2
+
+
+class IncompleteValue(PluginValue):
+    kind: Literal["incomplete"] = "incomplete"
+
+
+class StaticPluginValue(LinearValue):
+    kind: Literal["static"] = "static"  # type: ignore[assignment]
+
+
+class OtherLinearValue(LinearValue):
+    pass
+
+
+@pytest.mark.parametrize(
+    "model, exception",
+    [
+        (StaticValue, TypeError),
+        (IncompleteValue, TypeError),
+        (StaticPluginValue, ValueError),
+        (OtherLinearValue, ValueError),
+    ],
+)
+def test_register_invalid(model, exception):
+    with pytest.raises(exception):
+        valueModels.register(model)
+
+
+def test_load_plugins(monkeypatch):
+    monkeypatch.setattr(valueModels, "_plugins", {})
+    entry_points = [
+        importlib.metadata.EntryPoint(
+            "linear", f"{__name__}:LinearValue", valueModels.PLUGIN_GROUP
+        ),
+        importlib.metadata.EntryPoint("broken", f"{__name__}:Missing", valueModels.PLUGIN_GROUP),
+    ]
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: entry_points)
+
+    valueModels.load_plugins()
+
+    assert valueModels.plugin("linear") is LinearValue
+    assert valueModels.plugin("broken") is None
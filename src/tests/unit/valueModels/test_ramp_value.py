@@ -1,5 +1,6 @@
 import time
 
+import numpy
 import pydantic
 import pytest
 
@@ -78,3 +79,26 @@ def test_static_value_kind():
     RampValue(period=10, peak=10, labels=[], kind="ramp")
     with pytest.raises(pydantic.ValidationError):
         RampValue(period=10, peak=10, labels=[], kind="test")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_ramp_values(monkeypatch, invert):
+    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
+    ramp_value = RampValue(period=10, peak=10, offset=5, invert=invert, labels=[""])
+    elapsed = numpy.arange(0, 30, 0.5)
+
+    expected = []
+    for delta in elapsed:
+        monkeypatch.setattr(time, "monotonic", lambda: float(delta))
+        expected.append(ramp_value.get_value())
+
+    assert ramp_value.get_values(elapsed) == pytest.approx(expected)
+
+
+def test_ramp_values_at(monkeypatch):
+    monkeypatch.setattr(time, "monotonic", lambda: 100.0)
+    ramp_value = RampValue(period=10, peak=10, offset=5, labels=[""])
+    times = numpy.arange(100, 130, 0.5)
+
+    assert ramp_value.values_at(times) == pytest.approx(ramp_value.get_values(times - 100))
+    assert [ramp_value.value_at(t) for t in times] == pytest.approx(ramp_value.values_at(times))
@@ -0,0 +1,98 @@
+import time
+
+import numpy
+import pydantic
+import pytest
+
+from mocktrics_exporter import valueModels
+from mocktrics_exporter.arguments import arguments
+from mocktrics_exporter.valueModels import ReplayValue
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch) -> str:
+    monkeypatch.setattr(arguments, "recordings_dir", str(tmp_path))
+    path = str(tmp_path / "recording.f64")
+    valueModels.save_recording(path, [0.0, 10.0, 20.0, 30.0])
+    return path
+
+
+@pytest.fixture(autouse=True)
+def monotonic(monkeypatch):
+    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
+
+
+@pytest.mark.parametrize(
+    "mode, interpolate, time_, expected",
+    [
+        ("loop", False, 0, 0),
+        ("loop", False, 14, 0),
+        ("loop", False, 15, 10),
+        ("loop", False, 60, 0),
+        ("loop", False, 75, 10),
+        ("loop", True, 7.5, 5),
+        ("loop", True, 52.5, 15),
+        ("clamp", False, 1000, 30),
+        ("clamp", False, -100, 0),
+        ("clamp", True, 52.5, 30),
+    ],
+)
+def test_replay_value(recording, mode, interpolate, time_, expected):
+    replay_value = ReplayValue(path=recording, mode=mode, interpolate=interpolate, labels=[""])
+    assert replay_value.value_at(time_) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("mode", ["loop", "clamp"])
+@pytest.mark.parametrize("interpolate", [False, True])
+def test_replay_values(recording, mode, interpolate):
+    replay_value = ReplayValue(
+        path=recording, step=60, mode=mode, interpolate=interpolate, labels=[""]
+    )
+    times = numpy.arange(-120, 600, 7.0)
+
+    expected = [replay_value.value_at(t) for t in times]
+    assert replay_value.values_at(times) == pytest.approx(expected)
+
+
+def test_replay_value_shares_recording(recording):
+    first = ReplayValue(path=recording, labels=["a"])
+    second = ReplayValue(path=recording, labels=["b"])
+    assert valueModels.recording(first.path) is valueModels.recording(second.path)
+    assert isinstance(valueModels.recording(recording), numpy.memmap)
+
+
+def test_replay_value_invalid(recording, tmp_path):
+    with pytest.raises(pydantic.ValidationError):
+        ReplayValue(path=str(tmp_path / "missing.f64"), labels=[])
+    empty = tmp_path / "empty.f64"
+    empty.write_bytes(b"")
+    with pytest.raises(pydantic.ValidationError):
+        ReplayValue(path=str(empty), labels=[])
+
+
+def test_replay_value_kind(recording):
+    ReplayValue(path=recording, labels=[], kind="replay")
+    with pytest.raises(pydantic.ValidationError):
+        ReplayValue(path=recording, labels=[], kind="test")  # type: ignore[arg-type]
+
+
+def test_replay_value_relative(recording):
+    value = ReplayValue(path="recording.f64", labels=[])
+    assert value.values_at(numpy.array([15.0])) == pytest.approx([10.0])
+
+
+def test_replay_value_outside_recordings_dir(recording, tmp_path):
+    directory = tmp_path / "recordings"
+    directory.mkdir()
+    (directory / "escape.f64").symlink_to(recording)
+    arguments.recordings_dir = str(directory)
+
+    for path in [recording, "../recording.f64", "escape.f64", "/etc/passwd"]:
+        with pytest.raises(pydantic.ValidationError, match="outside of the recordings directory"):
+            ReplayValue(path=path, labels=[])
+
+
+def test_replay_value_disabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(arguments, "recordings_dir", None)
+    with pytest.raises(pydantic.ValidationError, match="disabled"):
+        ReplayValue(path=str(tmp_path / "recording.f64"), labels=[])
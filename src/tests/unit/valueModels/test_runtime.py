@@ -0,0 +1,112 @@
+import dataclasses
+import pickle
+
+import numpy
+import pytest
+
+from mocktrics_exporter import valueModels
+from mocktrics_exporter.arguments import arguments
+from mocktrics_exporter.valueModels import (
+    GaussianValue,
+    HistogramValue,
+    RampValue,
+    ReplayValue,
+    SineValue,
+    SquareValue,
+    StaticValue,
+)
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch) -> str:
+    monkeypatch.setattr(arguments, "recordings_dir", str(tmp_path))
+    path = str(tmp_path / "recording.f64")
+    valueModels.save_recording(path, [1.0, 4.0, 2.0])
+    return path
+
+
+def rate_values(recording: str) -> list[valueModels.RateValue]:
+    return [
+        StaticValue(value=3, labels=["a"]),
+        RampValue(period=10, peak=5, offset=1, labels=["a"]),
+        RampValue(period=10, peak=5, invert=True, labels=["a"]),
+        SquareValue(period=10, magnitude=4, offset=1, duty_cycle=30, labels=["a"]),
+        SquareValue(period=10, magnitude=4, duty_cycle=30, invert=True, labels=["a"]),
+        SineValue(period=10, amplitude=2, offset=3, labels=["a"]),
+        ReplayValue(path=recording, step=2, labels=["a"]),
+        ReplayValue(path=recording, step=2, mode="clamp", interpolate=True, labels=["a"]),
+    ]
+
+
+def test_runtime_matches_values(recording):
+    times = numpy.arange(-5, 40, 0.25)
+    for value in rate_values(recording):
+        runtime = value.compile()
+        times_at = times + value._start_time
+
+        assert [runtime.value_at(t) for t in times_at] == pytest.approx(value.values_at(times_at))
+        assert [runtime.integral_at(t) for t in times_at] == pytest.approx(
+            value.integrals_at(times_at)
+        )
+
+
+def test_histogram_runtime():
+    value = HistogramValue(rate=2.5, distribution="lognormal", mean=0, sigma=1, labels=["a"])
+    runtime = value.compile()
+
+    assert runtime.value_at(value._start_time + 3) == 7
+    assert runtime.expected == value.expected()
+
+
+def test_gaussian_runtime_shares_samples():
+    value = GaussianValue(mean=0, sigma=1, seed=1, labels=["a"])
+    expected = numpy.random.default_rng(1).normal(0, 1, 4).tolist()
+
+    runtime = value.compile()
+    samples = [value.get_value(), runtime.value_at(0), value.get_value(), runtime.value_at(0)]
+
+    assert samples == expected
+
+
+def test_runtime_frozen():
+    runtime = StaticValue(value=1, labels=["a"]).compile()
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        runtime.value = 2  # type: ignore[misc]
+    assert not hasattr(runtime, "__dict__")
+
+
+def test_runtime_compiled_once(recording):
+    for value in rate_values(recording):
+        runtime = value.compile()
+        value.value_at(value._start_time + 1)
+        value.integral_at(value._start_time + 1)
+
+        assert value.compile() is runtime
+        assert valueModels.compile_values([value])[0] is runtime
+
+
+def test_runtime_restores_model(recording):
+    values: list[valueModels.MetricValue] = [
+        *rate_values(recording),
+        HistogramValue(rate=2.5, distribution="lognormal", mean=0, sigma=1, labels=["a"]),
+        GaussianValue(mean=1, sigma=2, seed=3, labels=["a"]),
+    ]
+    runtimes = valueModels.compile_values(values)
+    models = valueModels.restore(runtimes)
+
+    assert models == values
+    for value, runtime, model in zip(values, runtimes, models):
+        assert model is not value
+        assert model.model_dump() == value.model_dump()
+        assert model._start_time == value._start_time
+        assert valueModels.compile_values([model])[0] is runtime
+
+
+def test_replay_runtime_pickles_path(recording):
+    runtime = ReplayValue(path=recording, step=2, labels=["a"]).compile()
+
+    copied = pickle.loads(pickle.dumps(runtime))
+
+    assert copied.samples is runtime.samples
+    assert copied.model().model_dump() == runtime.model().model_dump()
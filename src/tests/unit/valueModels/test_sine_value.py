@@ -1,6 +1,7 @@
 import math
 import time
 
+import numpy
 import pydantic
 import pytest
 
@@ -76,3 +77,25 @@ def test_static_value_kind():
     SineValue(period=10, amplitude=10, labels=[], kind="sine")
     with pytest.raises(pydantic.ValidationError):
         SineValue(period=10, amplitude=10, labels=[], kind="test")  # type: ignore[arg-type]
+
+
+def test_sine_values(monkeypatch):
+    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
+    sine_value = SineValue(period=10, amplitude=10, offset=5, labels=[""])
+    elapsed = numpy.arange(0, 30, 0.5)
+
+    expected = []
+    for delta in elapsed:
+        monkeypatch.setattr(time, "monotonic", lambda: float(delta))
+        expected.append(sine_value.get_value())
+
+    assert sine_value.get_values(elapsed) == pytest.approx(expected)
+
+
+def test_sine_values_at(monkeypatch):
+    monkeypatch.setattr(time, "monotonic", lambda: 100.0)
+    sine_value = SineValue(period=10, amplitude=10, offset=5, labels=[""])
+    times = numpy.arange(100, 130, 0.5)
+
+    assert sine_value.values_at(times) == pytest.approx(sine_value.get_values(times - 100))
+    assert [sine_value.value_at(t) for t in times] == pytest.approx(sine_value.values_at(times))
@@ -1,5 +1,6 @@
 import time
 
+import numpy
 import pydantic
 import pytest
 
@@ -110,3 +111,28 @@ def test_static_value_kind():
     SquareValue(period=10, magnitude=10, duty_cycle=50.0, labels=[], kind="square")
     with pytest.raises(pydantic.ValidationError):
         SquareValue(period=10, magnitude=10, duty_cycle=50.0, labels=[], kind="test")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_square_values(monkeypatch, invert):
+    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
+    square_value = SquareValue(
+        period=10, magnitude=10, offset=5, duty_cycle=30.0, invert=invert, labels=[""]
+    )
+    elapsed = numpy.arange(0, 30, 0.5)
+
+    expected = []
+    for delta in elapsed:
+        monkeypatch.setattr(time, "monotonic", lambda: float(delta))
+        expected.append(square_value.get_value())
+
+    assert square_value.get_values(elapsed) == pytest.approx(expected)
+
+
+def test_square_values_at(monkeypatch):
+    monkeypatch.setattr(time, "monotonic", lambda: 100.0)
+    square_value = SquareValue(period=10, magnitude=10, offset=5, duty_cycle=50, labels=[""])
+    times = numpy.arange(100, 130, 0.5)
+
+    assert square_value.values_at(times) == pytest.approx(square_value.get_values(times - 100))
+    assert [square_value.value_at(t) for t in times] == pytest.approx(square_value.values_at(times))
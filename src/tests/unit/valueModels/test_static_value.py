@@ -1,3 +1,4 @@
+import numpy
 import pydantic
 import pytest
 
@@ -30,3 +31,8 @@ def test_static_value_kind():
     StaticValue(labels=[], value=0.0, kind="static")
     with pytest.raises(pydantic.ValidationError):
         StaticValue(labels=[], value=0.0, kind="test")  # type: ignore[arg-type]
+
+
+def test_static_values():
+    static_value = StaticValue(value=5.0, labels=[""])
+    assert static_value.get_values(numpy.arange(10)).tolist() == [5.0] * 10
@@ -0,0 +1,126 @@
+import pickle
+import socket
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from mocktrics_exporter import dependencies, exposition, workers
+from mocktrics_exporter.metricCollection import MetricsCollection
+from mocktrics_exporter.metrics import Metric
+from mocktrics_exporter.sharding import Sharding
+from mocktrics_exporter.valueModels import StaticValue
+
+
+class WorkerPoolMock:
+
+    def __init__(self):
+        self.events: list[tuple] = []
+
+    def _publish(self, event):
+        self.events.append(pickle.loads(pickle.dumps(event)))
+
+    def add_metric(self, metric, read_only=False):
+        self._publish(("add_metric", (metric, read_only)))
+
+    def add_metrics(self, metrics, read_only=False):
+        self._publish(("add_metrics", (metrics, read_only)))
+
+    def add_metric_value(self, id, value):
+        self._publish(("add_metric_value", (id, value)))
+
+    def delete_metric(self, id):
+        self._publish(("delete_metric", id))
+
+    def delete_metric_value(self, id, labels):
+        self._publish(("delete_metric_value", (id, labels)))
+
+    def replace_metric_values(self, id, removed, added):
+        self._publish(("replace_metric_values", (id, removed, added)))
+
+
+@pytest.fixture
+def worker_pool(monkeypatch: pytest.MonkeyPatch) -> WorkerPoolMock:
+    pool = WorkerPoolMock()
+    monkeypatch.setattr(dependencies, "workers", pool)
+    return pool
+
+
+def test_collection_publishes_changes(worker_pool, base_metric):
+    collection = MetricsCollection()
+    metric = Metric(**base_metric)
+    value = StaticValue(value=1, labels=["a"])
+
+    collection.add_metric(metric)
+    collection.add_metric_value(metric.name, value)
+    collection.delete_metric_value(metric.name, ["a"])
+    collection.delete_metric(metric.name)
+
+    assert [event[0] for event in worker_pool.events] == [
+        "add_metric",
+        "add_metric_value",
+        "delete_metric_value",
+        "delete_metric",
+    ]
+
+
+def test_apply_replays_changes(monkeypatch, worker_pool, base_metric):
+    source = MetricsCollection()
+    metric = Metric(**base_metric)
+    source.add_metric(metric)
+    source.add_metric_value(metric.name, StaticValue(value=1, labels=["a"]))
+    source.add_metric_value(metric.name, StaticValue(value=2, labels=["b"]))
+    source.delete_metric_value(metric.name, ["a"])
+    source.replace_metric_values(metric.name, [["b"]], [StaticValue(value=3, labels=["c"])])
+    events = list(worker_pool.events)
+
+    dependencies.workers = None
+    # A worker process has a registry of its own
+    monkeypatch.setattr(Metric, "_registry", CollectorRegistry())
+    replica = MetricsCollection()
+    for event in events:
+        workers.apply(event, replica)
+
+    assert [value.labels for value in replica.get_metric(metric.name).values] == [["c"]]
+
+    workers.apply(("delete_metric", metric.name), replica)
+    assert replica.get_metrics() == []
+
+
+def test_collection_publishes_sharded_metrics(monkeypatch, worker_pool, base_metric):
+    monkeypatch.setattr(dependencies, "sharding", Sharding(0, 2, "series"))
+    values = [StaticValue(value=0, labels=[str(label)]) for label in range(20)]
+    collection = MetricsCollection()
+
+    collection.add_metric(Metric(**{**base_metric, "values": list(values)}))
+    collection.add_metrics([Metric(**{**base_metric, "name": "other", "values": list(values)})])
+
+    [(_, (metric, _)), (_, ([other], _))] = worker_pool.events
+    assert 0 < len(metric.values) < 20
+    assert [value.labels for value in metric.values] == [
+        value.labels for value in collection.get_metric("metric").values
+    ]
+    assert 0 < len(other.values) < 20
+
+
+def test_apply_unknown_event():
+    with pytest.raises(ValueError):
+        workers.apply(("unknown", None), MetricsCollection())
+
+
+def test_worker_pool_count():
+    with pytest.raises(ValueError):
+        workers.WorkerPool(0, 8000, lambda: exposition.make_wsgi_app(exposition.ExpositionCache()))
+
+
+def test_reuse_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    first = exposition.start_http_server(port, "127.0.0.1", reuse_port=True)
+    second = exposition.start_http_server(port, "127.0.0.1", reuse_port=True)
+    try:
+        assert first.server_address == second.server_address
+    finally:
+        first.shutdown()
+        second.shutdown()